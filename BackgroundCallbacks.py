@@ -0,0 +1,52 @@
+import os
+
+# With OUTLOOK_BACKGROUND=1 the figure callbacks of many NOC Titles run as Dash background callbacks:
+# the request only starts a job in a process forked from the worker (a DiskcacheManager, no broker)
+# and the browser polls for its result every OUTLOOK_BACKGROUND_INTERVAL milliseconds, so a worker
+# thread is never held by a figure build. When the inputs change while a job runs, the browser sends
+# the old job with the new request and the worker kills its process, so rapid dropdown edits drop
+# the stale builds instead of queueing them.
+# The jobs are forked from the worker that got the request. A lock another thread holds at that moment
+# (the figure cache, the metrics, the data being loaded) stays held in the job, so gunicorn.conf.py runs
+# one thread per worker with OUTLOOK_BACKGROUND=1. Start it with OUTLOOK_PRELOAD=1 too, so the jobs
+# are forked with the data already loaded. The timings of the jobs are recorded in the job processes
+# and are missing from /metrics.
+enabled = os.environ.get('OUTLOOK_BACKGROUND') == '1'
+cache_dir = os.environ.get('OUTLOOK_BACKGROUND_DIR', "./data/cache/background")
+poll_interval = int(os.environ.get('OUTLOOK_BACKGROUND_INTERVAL', 100))
+
+# Seconds a result the browser never fetched is kept
+result_seconds = 300
+
+# The figures built in the job processes are lost with them unless they are written to disk,
+# the figure cache uses this directory when FIGURE_CACHE_DIR isn't set
+figure_dir = os.path.join(cache_dir, 'figures') if enabled else None
+
+if enabled:
+    import diskcache
+    import psutil
+    from dash import DiskcacheManager
+
+    # Dash waits up to a second for a cancelled job to exit, but only the worker that forked the job
+    # can reap it, so a cancel sent to another worker always waited the whole second. The job is killed
+    # without waiting, its worker reaps it when it starts its next job.
+    class JobManager(DiskcacheManager):
+        def terminate_job(self, job):
+            if job is None:
+                return
+            with self.handle.transact():
+                try:
+                    process = psutil.Process(int(job))
+                    for child in process.children(recursive=True):
+                        child.kill()
+                    process.kill()
+                except psutil.NoSuchProcess:
+                    pass
+
+    manager = JobManager(diskcache.Cache(os.path.join(cache_dir, 'jobs')), expire=result_seconds)
+
+# Keyword arguments of @callback that make a callback a background callback when they are enabled
+def background_options():
+    if not enabled:
+        return {}
+    return {'background': True, 'manager': manager, 'interval': poll_interval}
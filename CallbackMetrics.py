@@ -0,0 +1,220 @@
+import contextlib
+import cProfile
+import functools
+import os
+import threading
+import time
+
+import flask
+from dash.exceptions import PreventUpdate
+
+# Timings of the Dash callbacks, off unless the app is started with OUTLOOK_METRICS=1.
+# Every callback is wrapped by @instrumented, which records its wall time, its errors and the number
+# of items of its inputs (e.g. the selected NOC Titles). Inside a callback, `with stage('filter'):`
+# records the time of one step. The request hooks add the response bytes of each callback and the
+# time Dash spends serializing its output. Everything is served at /metrics in the Prometheus text
+# format, per worker process (the worker label is its pid).
+enabled = os.environ.get('OUTLOOK_METRICS') == '1'
+
+# With a directory, a callback request sent with the X-Outlook-Profile header is run under cProfile
+# and its stats are written there, to read with pstats or snakeviz
+profile_dir = os.environ.get('OUTLOOK_PROFILE_DIR')
+profile_header = 'X-Outlook-Profile'
+
+# Upper bounds in seconds of the callback latency histogram
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Counters of every instrumented callback of this process
+class CallbackMetrics:
+    def __init__(self):
+        self.calls = {}
+        self.stages = {}
+        self.responses = {}
+        self.lock = threading.Lock()
+        # Name of the callback running in each thread, for the stages
+        self.local = threading.local()
+
+    def record_call(self, name, seconds, items, failed):
+        with self.lock:
+            call = self.calls.get(name)
+            if call is None:
+                call = self.calls[name] = {'count': 0, 'seconds': 0.0, 'errors': 0, 'items': 0, 'buckets': [0] * len(latency_buckets)}
+            call['count'] += 1
+            call['seconds'] += seconds
+            call['errors'] += failed
+            call['items'] += items
+            for i, bound in enumerate(latency_buckets):
+                if seconds <= bound:
+                    call['buckets'][i] += 1
+                    break
+
+    def record_stage(self, name, stage_name, seconds):
+        with self.lock:
+            totals = self.stages.setdefault((name, stage_name), [0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+
+    def record_response(self, name, seconds, size):
+        with self.lock:
+            totals = self.responses.setdefault(name, [0, 0.0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += size
+
+    # Counters in the Prometheus text exposition format, with the stats of the figure cache
+    def prometheus_text(self, cache_stats):
+        worker = os.getpid()
+        lines = []
+
+        def sample(name, labels, value):
+            label_text = ','.join(f'{key}="{label}"' for key, label in {'worker': worker, **labels}.items())
+            lines.append(f"{name}{{{label_text}}} {value}")
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                sample(name, labels, value)
+
+        with self.lock:
+            calls = {name: dict(call, buckets=list(call['buckets'])) for name, call in self.calls.items()}
+            stages = {key: list(totals) for key, totals in self.stages.items()}
+            responses = {name: list(totals) for name, totals in self.responses.items()}
+
+        lines.append("# HELP outlook_callback_seconds Wall time of the callback functions")
+        lines.append("# TYPE outlook_callback_seconds histogram")
+        for name, call in sorted(calls.items()):
+            cumulative = 0
+            for bound, count in zip(latency_buckets, call['buckets']):
+                cumulative += count
+                sample('outlook_callback_seconds_bucket', {'callback': name, 'le': bound}, cumulative)
+            sample('outlook_callback_seconds_bucket', {'callback': name, 'le': '+Inf'}, call['count'])
+            sample('outlook_callback_seconds_sum', {'callback': name}, call['seconds'])
+            sample('outlook_callback_seconds_count', {'callback': name}, call['count'])
+
+        metric('outlook_callback_errors_total', 'counter', "Callbacks that raised an error",
+               [({'callback': name}, call['errors']) for name, call in sorted(calls.items())])
+        metric('outlook_callback_input_items_total', 'counter', "Items of the callback inputs, the length of list inputs and 1 for other values",
+               [({'callback': name}, call['items']) for name, call in sorted(calls.items())])
+        metric('outlook_callback_stage_seconds_total', 'counter', "Wall time of the stages of the callbacks, stages can nest",
+               [({'callback': name, 'stage': stage_name}, totals[1]) for (name, stage_name), totals in sorted(stages.items())])
+        metric('outlook_callback_stage_calls_total', 'counter', "Runs of the stages of the callbacks",
+               [({'callback': name, 'stage': stage_name}, totals[0]) for (name, stage_name), totals in sorted(stages.items())])
+        metric('outlook_callback_request_seconds_total', 'counter', "Wall time of the callback requests, with the serialization of the output",
+               [({'callback': name}, totals[1]) for name, totals in sorted(responses.items())])
+        metric('outlook_callback_response_bytes_total', 'counter', "Bytes of the callback responses before compression",
+               [({'callback': name}, totals[2]) for name, totals in sorted(responses.items())])
+        metric('outlook_callback_requests_total', 'counter', "Callback requests",
+               [({'callback': name}, totals[0]) for name, totals in sorted(responses.items())])
+        metric('outlook_figure_cache_entries', 'gauge', "Figures in the in-memory cache", [({}, cache_stats['size'])])
+        metric('outlook_figure_cache_requests_total', 'counter', "Figure cache lookups by result",
+               [({'result': result}, cache_stats[key]) for result, key in (('hit', 'hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses'))])
+        return '\n'.join(lines) + '\n'
+
+metrics = CallbackMetrics()
+
+# Items of the inputs of a callback: the length of lists and dicts, 0 for None and 1 for other values
+def input_items(args, kwargs):
+    items = 0
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (list, tuple, dict)):
+            items += len(value)
+        elif value is not None:
+            items += 1
+    return items
+
+# Record the calls of a callback function, put it below the @callback decorator.
+# When the metrics are off the wrapper only checks the flag.
+def instrumented(fn):
+    name = f"{fn.__module__}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return fn(*args, **kwargs)
+        local = metrics.local
+        outer = getattr(local, 'callback', None)
+        local.callback = name
+        failed = False
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except PreventUpdate:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            local.callback = outer
+            metrics.record_call(name, seconds, input_items(args, kwargs), failed)
+            if flask.has_request_context():
+                flask.g.outlook_callback = name
+                flask.g.outlook_callback_seconds = seconds
+
+    return wrapper
+
+# Time one step of the running callback
+class Stage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        callback_name = getattr(metrics.local, 'callback', None)
+        if callback_name is not None:
+            metrics.record_stage(callback_name, self.name, time.perf_counter() - self.start)
+
+no_stage = contextlib.nullcontext()
+
+def stage(name):
+    return Stage(name) if enabled else no_stage
+
+# Only one request is profiled at a time, cProfile can't run in two threads
+profile_lock = threading.Lock()
+
+def is_callback_request():
+    return flask.request.path.endswith('/_dash-update-component')
+
+def before_request():
+    if not is_callback_request():
+        return
+    flask.g.outlook_start = time.perf_counter()
+    if profile_dir and flask.request.headers.get(profile_header) and profile_lock.acquire(blocking=False):
+        flask.g.outlook_profile = cProfile.Profile()
+        flask.g.outlook_profile.enable()
+
+def after_request(response):
+    if not is_callback_request():
+        return response
+    seconds = time.perf_counter() - flask.g.pop('outlook_start', time.perf_counter())
+    name = flask.g.get('outlook_callback', 'unknown')
+    profile = flask.g.pop('outlook_profile', None)
+    if profile is not None:
+        profile.disable()
+        profile_lock.release()
+        path = os.path.join(profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.perf_counter_ns()}-{name}.prof")
+        profile.dump_stats(path)
+        response.headers['X-Outlook-Profile-File'] = os.path.basename(path)
+    if enabled:
+        size = response.calculate_content_length() or 0
+        metrics.record_response(name, seconds, size)
+        if 'outlook_callback_seconds' in flask.g:
+            metrics.record_stage(name, 'serialize', seconds - flask.g.outlook_callback_seconds)
+    return response
+
+# Add the request hooks and the /metrics endpoint to the Flask server of the app. Register them
+# after Compress so the response bytes are counted before compression.
+def register_metrics(server, cache):
+    if not enabled and not profile_dir:
+        return
+    if profile_dir:
+        os.makedirs(profile_dir, exist_ok=True)
+    server.before_request(before_request)
+    server.after_request(after_request)
+    if enabled:
+        server.add_url_rule('/metrics', 'metrics', lambda: flask.Response(
+            metrics.prometheus_text(cache.stats()), mimetype='text/plain; version=0.0.4'
+        ))
@@ -0,0 +1,47 @@
+import threading
+
+from bs4 import BeautifulSoup
+
+# Key of a row that doesn't depend on the language: NOC code and economic region code
+def row_keys(df):
+    return df['NOC_Code'].astype(str) + '-' + df['Economic Region Code'].astype(str)
+
+# Parse the Employment Trends HTML into ('p', text) and ('ul', [items]) blocks
+def parse_trends(html_content):
+    soup = BeautifulSoup(html_content if isinstance(html_content, str) else '', 'html.parser')
+    blocks = []
+    for element in soup.children:
+        if element.name == 'p':
+            blocks.append(('p', element.text))
+        elif element.name == 'ul':
+            blocks.append(('ul', [li.text for li in element.find_all('li')]))
+    return blocks
+
+# Row details of one language kept on the server, looked up by row key.
+# The Employment Trends HTML of a row is parsed the first time the row is selected and kept.
+class TrendStore:
+    def __init__(self, df):
+        self.positions = dict(zip(row_keys(df), range(len(df))))
+        self.region_names = df['Economic Region Name'].to_numpy()
+        self.outlooks = df['Outlook'].to_numpy()
+        # Keep the column's own array, the text stays in the Arrow buffers of the cache
+        self.html = df['Employment Trends'].array
+        self.parsed = {}
+        self.lock = threading.Lock()
+
+    # Region name, outlook and parsed trends of a row, or None for an unknown key
+    def details(self, key):
+        position = self.positions.get(key)
+        if position is None:
+            return None
+        with self.lock:
+            blocks = self.parsed.get(key)
+        if blocks is None:
+            blocks = parse_trends(self.html[position])
+            with self.lock:
+                self.parsed[key] = blocks
+        return {
+            'Economic Region Name': self.region_names[position],
+            'Outlook': self.outlooks[position],
+            'Employment Trends': blocks
+        }
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from CallbackMetrics import stage
+
+# Directory shared by the worker processes, the disk backend is off when it is not set
+shared_dir = os.environ.get('FIGURE_CACHE_DIR')
+
+# Cache key for a figure built from a NOC selection, the order of the selection doesn't matter
+def figure_key(name, language, selected_nocs, search_query=None):
+    return (name, language, tuple(sorted(selected_nocs or [])), search_query or '')
+
+# Serialized Plotly figures kept in memory with LRU eviction.
+# With a directory the figures are also written to disk so other worker processes can reuse them.
+# The version of the data is part of every key, it can be a function returning the version being served.
+class FigureCache:
+    def __init__(self, maxsize=256, directory=shared_dir, version='', disk_maxsize=4096):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.version = version
+        self.disk_maxsize = disk_maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_writes = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def versioned(self, key):
+        return (self.version() if callable(self.version) else self.version, key)
+
+    # File holding a figure in the disk backend, the key has the data version
+    def disk_path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def remember(self, key, figure_json):
+        with self.lock:
+            self.entries[key] = figure_json
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    # Serialized figure for a key, or None when it has not been built yet
+    def get(self, key):
+        key = self.versioned(key)
+        with self.lock:
+            figure_json = self.entries.get(key)
+            if figure_json is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return figure_json
+
+        if self.directory:
+            try:
+                with open(self.disk_path(key)) as f:
+                    figure_json = f.read()
+            except FileNotFoundError:
+                figure_json = None
+            if figure_json is not None:
+                self.remember(key, figure_json)
+                with self.lock:
+                    self.disk_hits += 1
+                return figure_json
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, figure_json):
+        key = self.versioned(key)
+        self.remember(key, figure_json)
+        if not self.directory:
+            return
+
+        # Write to a temporary file first so other workers never read a partial figure
+        path = self.disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(figure_json)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.disk_writes += 1
+            prune = self.disk_writes % 64 == 0
+        if prune:
+            self.prune_disk()
+
+    # Remove the least recently written figures once the directory holds more than disk_maxsize
+    def prune_disk(self):
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.json'):
+                try:
+                    files.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    pass
+        if len(files) <= self.disk_maxsize:
+            return
+        files.sort()
+        for _, path in files[:len(files) - self.disk_maxsize]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    # Cached figure for a key as a dict for dcc.Graph, build() returns a Plotly figure on a miss
+    def get_or_build(self, key, build):
+        figure_json = self.get(key)
+        if figure_json is None:
+            with stage('figure build'):
+                fig = build()
+            with stage('figure json'):
+                figure_json = fig.to_json()
+            self.put(key, figure_json)
+        with stage('figure decode'):
+            return json.loads(figure_json)
+
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.disk_hits + self.misses
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_ratio': (self.hits + self.disk_hits) / requests if requests else 0.0,
+            }
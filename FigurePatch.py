@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Trace properties holding one value per point, and the column of the rows each one comes from
+point_columns = {
+    'map': {'lat': 'lat', 'lon': 'lon', 'hovertext': 'Economic Region Name'},
+    'scatter': {'x': 'Economic Region Name', 'y': 'NOC Title'}
+}
+
+# Hover text of the points, as Plotly Express writes it
+hover_templates = {
+    'map': '<b>%{{hovertext}}</b><br><br>Outlook={outlook}<br>lat=%{{lat}}<br>lon=%{{lon}}<extra></extra>',
+    'scatter': 'Outlook={outlook}<br>Economic Region=%{{x}}<br>NOC Title=%{{y}}<extra></extra>'
+}
+
+# A delete operation in a Patch costs about as many bytes as sending this many point values
+delete_cost = 4
+
+# Outlook code and selection position of each row, -1 for unknown outlooks and titles outside the selection
+def row_codes(rows, selected_nocs):
+    outlook_codes = rows['Outlook'].cat.codes.to_numpy()
+    noc_codes = pd.Categorical(rows['NOC Title'], categories=selected_nocs).codes
+    return outlook_codes, noc_codes
+
+# Number of points of each selected NOC Title in each outlook, kept with a figure so the points
+# of one NOC Title can be found again when it is removed
+def selection_counts(rows, selected_nocs, outlook_order):
+    outlook_codes, noc_codes = row_codes(rows, selected_nocs)
+    counts = np.zeros((len(selected_nocs), len(outlook_order)), dtype=int)
+    valid = (outlook_codes >= 0) & (noc_codes >= 0)
+    np.add.at(counts, (noc_codes[valid], outlook_codes[valid]), 1)
+    return {noc: counts[i].tolist() for i, noc in enumerate(selected_nocs)}
+
+# Points of the selected NOC Titles split by outlook, one entry per outlook of the order even when
+# it has no points. Within an outlook the points are grouped by NOC Title in selection order.
+def selection_points(rows, selected_nocs, outlook_order, kind):
+    outlook_codes, noc_codes = row_codes(rows, selected_nocs)
+    values = {prop: rows[column].to_numpy() for prop, column in point_columns[kind].items()}
+    points = []
+    for code in range(len(outlook_order)):
+        positions = np.flatnonzero((outlook_codes == code) & (noc_codes >= 0))
+        positions = positions[np.argsort(noc_codes[positions], kind='stable')]
+        points.append({prop: column[positions].tolist() for prop, column in values.items()})
+    return points
+
+# Trace type of each figure
+trace_types = {'map': 'scattermapbox', 'scatter': 'scatter'}
+
+# Figure with one trace per outlook of the order, empty ones included, so a change of the
+# selection only adds points to or removes points from traces that are already in the browser.
+# The traces are given as dicts with numpy arrays: Plotly validates an array at once but a list
+# value by value, and trace objects would be validated again by go.Figure.
+def outlook_figure(kind, points, outlook_order, outlook_colors, **layout):
+    traces = [
+        dict(
+            type=trace_types[kind], name=outlook, legendgroup=outlook, showlegend=True, mode='markers',
+            marker={'color': outlook_colors[outlook]},
+            hovertemplate=hover_templates[kind].format(outlook=outlook),
+            **{prop: np.asarray(values) for prop, values in trace_points.items()}
+        )
+        for outlook, trace_points in zip(outlook_order, points)
+    ]
+    fig = go.Figure(traces)
+    fig.update_layout(legend_title_text='Outlook', legend_tracegroupgap=0, **layout)
+    return fig
+
+# Add operations to a Patch of an outlook figure that turn the points of the old selection into the
+# points of the new one, and return the new selection order and point counts.
+# rows_for(nocs) returns the rows of the given NOC Titles.
+def patch_selection(figure_patch, rows_for, outlook_order, kind, old_nocs, old_counts, selected_nocs):
+    selected = set(selected_nocs)
+    kept = [noc for noc in old_nocs if noc in selected]
+    removed = [noc for noc in old_nocs if noc not in selected]
+    added = [noc for noc in selected_nocs if noc not in old_counts]
+
+    if removed:
+        kept_points = None
+        for code in range(len(outlook_order)):
+            removed_count = sum(old_counts[noc][code] for noc in removed)
+            if removed_count == 0:
+                continue
+            trace = figure_patch['data'][code]
+            props = list(point_columns[kind])
+            if removed_count * delete_cost < sum(old_counts[noc][code] for noc in kept):
+                # Delete the points of the removed NOC Titles, the last ones first so the offsets stay valid
+                for noc in reversed(removed):
+                    offset = sum(old_counts[other][code] for other in old_nocs[:old_nocs.index(noc)])
+                    for prop in props:
+                        for _ in range(old_counts[noc][code]):
+                            del trace[prop][offset]
+            else:
+                # Fewer bytes to send the points that are kept
+                if kept_points is None:
+                    kept_points = selection_points(rows_for(kept), kept, outlook_order, kind)
+                for prop in props:
+                    trace[prop] = kept_points[code][prop]
+
+    counts = {noc: old_counts[noc] for noc in kept}
+    if added:
+        added_rows = rows_for(added)
+        added_points = selection_points(added_rows, added, outlook_order, kind)
+        for code, trace_points in enumerate(added_points):
+            for prop, values in trace_points.items():
+                if values:
+                    figure_patch['data'][code][prop].extend(values)
+        counts.update(selection_counts(added_rows, added, outlook_order))
+    return kept + added, counts
@@ -1,10 +1,19 @@
 import dash
 import dash_table
-import pandas as pd
-from dash import dcc, html
-from dash.dependencies import Input, Output
+import flask
+from dash import dcc, html, ctx, callback
+from dash.dependencies import Input, Output, State
 import plotly.express as px
-from bs4 import BeautifulSoup
+import plotly.graph_objects as go
+from OutlookData import DataRegistry, file_paths
+from OutlookCore import outlook_colors, outlook_frames, outlook_store
+from OutlookSummary import OutlookSummary
+from OutlookApi import cached_by_release, json_response, request_language
+from OutlookIndex import build_index
+from NocSearch import TitleSearch
+from OutlookQuery import outlook_ranks, page_size, query_page
+from EmploymentTrends import TrendStore, row_keys
+from CallbackMetrics import instrumented, stage
 
 # TODO: [DONE] Have df_region_filtered be filtered by the user's input
 # TODO: [DONE] Have search for economic region be a dropdown menu
@@ -16,41 +25,48 @@ from bs4 import BeautifulSoup
 # TODO: Make it look prettier
 # TODO: Make web app that I can host online for the download or host it on a website somewhere? ideally for free for me
 # TODO: Add a map of Canada with the economic regions and their outlooks
-# TODO: Add some kind of chart of the outlooks for the selected region 
-
-# File paths for English and French Excel files
-file_paths = {
-    'English': "./data/20242026_outlook_n21_en_250117.xlsx",
-    'French': "./data/20242026_outlook_n21_fr_250117.xlsx"
-}
-
-# Outlook order mappings for English and French
-outlook_orders = {
-    'English': ['very good', 'good', 'fair', 'limited', 'undetermined'],
-    'French': ['très bonnes', 'bonnes', 'modérées', 'indéterminées', 'limitées', 'très limitées']
-}
-
-# Load the initial Excel files and store them in a global variable
-data_frames = {
-    'English': pd.read_excel(file_paths['English'], sheet_name=0),
-    'French': pd.read_excel(file_paths['French'], sheet_name=0)
-}
-
-# Get unique economic regions for the dropdown options and sort them alphabetically
-economic_regions = sorted(data_frames['English']['Economic Region Name'].unique())
-
-# Add "All Regions" option to the dropdown
+# TODO: [DONE] Add some kind of chart of the outlooks for the selected region 
+
+# Data of each language from the columnar cache, shared with the other pages and loaded on the first request for that language
+data_frames = outlook_frames
+
+# Title and region index for each language
+indexes = DataRegistry(lambda language: build_index(data_frames[language]))
+
+# Search engine over the unique NOC Titles for each language
+title_searches = DataRegistry(lambda language: TitleSearch(data_frames[language]['NOC Title'].cat.categories))
+
+# Rank of every row on the outlook scale, used to sort the table by outlook
+ranks = DataRegistry(lambda language: outlook_ranks(data_frames[language]))
+
+# Details of every row kept on the server, the table only carries the row key
+trend_stores = DataRegistry(lambda language: TrendStore(data_frames[language]))
+
+# Outlook counts of the regions and broad categories and the regions of each NOC ranked by outlook,
+# computed once from the rows of the language so the summaries are lookups
+def build_summary(language):
+    data_frames[language]
+    return OutlookSummary(outlook_store(), language)
+
+summaries = DataRegistry(build_summary)
+
+# Regions listed with the details of a row, best outlook first
+best_region_count = 5
+
+# Columns not shown in the DataTable
+hidden_columns = ['NOC_Code', 'Economic Region Code', 'Economic Region Name', 'LANG', 'Employment Trends']
+
+# "All Regions" option of the dropdown, the regions of the selected language are added by update_table.
+# The other options have the region code as value, so the selected region is kept when the language changes.
 all_regions_option = [{'label': 'All Regions', 'value': 'All Regions'}]
-region_options = all_regions_option + [{'label': region, 'value': region} for region in economic_regions]
 
-# Simple Dash app to display the DataFrame
-app = dash.Dash(__name__)
-app.layout = html.Div([
+# Page to display the DataFrame
+layout = html.Div([
     html.H1("Economic Region Outlook Data", style={'text-align': 'center'}),
     
     # Dropdown menu for selecting language
     dcc.Dropdown(
-        id='language-dropdown',
+        id='table-language-dropdown',
         options=[{'label': lang, 'value': lang} for lang in file_paths.keys()],
         value='English',  # Default value
         style={'width': '50%', 'margin': 'auto'}
@@ -59,7 +75,7 @@ app.layout = html.Div([
     # Dropdown menu for selecting economic region
     dcc.Dropdown(
         id='region-dropdown',
-        options=region_options,
+        options=all_regions_option,
         value='All Regions',  # Default value
         style={'width': '50%', 'margin': 'auto'}
     ),
@@ -72,11 +88,17 @@ app.layout = html.Div([
         style={'width': '50%', 'margin': 'auto', 'margin-top': '20px'}
     ),
     
-    # DataTable to display the DataFrame
+    # DataTable to display the DataFrame, only the visible page is sent by the server
     dash_table.DataTable(
         id='datatable',
-        columns=[{'name': col, 'id': col} for col in data_frames['English'].columns if col not in ['NOC_Code', 'Economic Region Code', 'Economic Region Name', 'LANG', 'Employment Trends']],
-        data=data_frames['English'].to_dict('records'),  # Initial data
+        columns=[],  # Filled by update_table for the selected language
+        data=[],  # Filled by update_table
+        page_action='custom',
+        page_current=0,
+        page_size=page_size,
+        sort_action='custom',
+        sort_mode='single',
+        sort_by=[],
         style_table={'height': '400px', 'overflowY': 'auto'},
         style_cell={'textAlign': 'center', 'padding': '10px'},
         style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'},
@@ -84,6 +106,9 @@ app.layout = html.Div([
         selected_rows=[],
     ),
     
+    # Outlooks of each broad occupational category in the selected region
+    dcc.Graph(id='region-summary-chart'),
+    
     # Store to hold the selected row data
     dcc.Store(id='selected-row-data'),
     
@@ -97,90 +122,161 @@ app.layout = html.Div([
     ], style={'text-align': 'center', 'margin-top': '20px'})
 ])
 
-# Callback to update the DataTable based on the selected language, region, and search input
-@app.callback(
+# Callback to update the DataTable page based on the selected language, region, search input, page and sort order
+@callback(
     Output('datatable', 'data'),
     Output('datatable', 'columns'),
+    Output('datatable', 'page_count'),
+    Output('datatable', 'page_current'),
+    Output('datatable', 'selected_rows'),
     Output('region-dropdown', 'options'),
     Output('region-dropdown', 'value'),
-    Input('language-dropdown', 'value'),
+    Input('table-language-dropdown', 'value'),
     Input('region-dropdown', 'value'),
-    Input('search-input', 'value')
+    Input('search-input', 'value'),
+    Input('datatable', 'page_current'),
+    Input('datatable', 'sort_by'),
+    State('datatable', 'page_size')
 )
-def update_table(selected_language, selected_region, search_value):
+@instrumented
+def update_table(selected_language, selected_region, search_value, page_current, sort_by, size):
     # Get the preloaded DataFrame based on the selected language
     df = data_frames[selected_language]
     
-    # Get unique economic regions for the dropdown options and sort them alphabetically
-    economic_regions = sorted(df['Economic Region Name'].unique())
+    # Names of the economic regions in the selected language by region code, sorted alphabetically
+    economic_regions = outlook_store().labels(selected_language, 'Economic Region Name').dropna().sort_values()
     
     # Update the region dropdown options
-    region_options = all_regions_option + [{'label': region, 'value': region} for region in economic_regions]
+    region_options = all_regions_option + [{'label': name, 'value': code} for code, name in economic_regions.items()]
     
     # If the selected region is not in the new options, default to "All Regions"
-    if selected_region not in economic_regions and selected_region != 'All Regions':
+    if selected_region not in economic_regions.index and selected_region != 'All Regions':
         selected_region = 'All Regions'
     
-    # Filter the DataFrame based on the selected region
-    if selected_region != 'All Regions':
-        df_region_filtered = df.loc[df['Economic Region Name'] == selected_region]
-    else:
-        df_region_filtered = df
+    # Find the NOC Titles matching the search input
+    with stage('search'):
+        matching_titles = title_searches[selected_language].matching_titles(search_value) if search_value else None
     
-    # Filter the DataFrame based on the search input
-    if search_value:
-        df_region_filtered = df_region_filtered[df_region_filtered['NOC Title'].str.contains(search_value, case=False, na=False)]
+    # Go back to the first page unless the user moved to another page
+    if 'datatable.page_current' not in ctx.triggered_prop_ids or page_current is None:
+        page_current = 0
     
-    # Sort the DataFrame based on the outlook order
-    df_region_filtered['Outlook'] = pd.Categorical(
-        df_region_filtered['Outlook'], 
-        categories=outlook_orders[selected_language], 
-        ordered=True
-    )
-    df_sorted_by_outlook = df_region_filtered.sort_values('Outlook')
+    # Filter the DataFrame based on the selected region and the matching titles, sort it
+    # (by outlook order unless a column header was clicked) and keep only the visible page
+    region = selected_region if selected_region != 'All Regions' else None
+    with stage('filter'):
+        df_page, page_count = query_page(
+            df, indexes[selected_language], ranks[selected_language],
+            titles=matching_titles, region=region, sort_by=sort_by,
+            page_current=page_current, size=size or page_size
+        )
     
     # Update the DataTable columns based on the selected language
-    columns = [{'name': col, 'id': col} for col in df.columns if col not in ['NOC_Code', 'Economic Region Code', 'Economic Region Name', 'LANG', 'Employment Trends']]
+    columns = [{'name': col, 'id': col} for col in df.columns if col not in hidden_columns]
+    
+    # Send the visible columns and the row key, the details stay on the server
+    with stage('records'):
+        records = df_page[[column['id'] for column in columns]].assign(row_key=row_keys(df_page)).to_dict('records')
     
-    return df_sorted_by_outlook.to_dict('records'), columns, region_options, selected_region
+    return records, columns, page_count, page_current, [], region_options, selected_region
+
+# Stacked bars of the outlook counts of each broad category of a region summary
+def summary_figure(summary, language):
+    categories = summary['categories']
+    names = [category['name'] for category in categories]
+    traces = [
+        {'type': 'bar', 'orientation': 'h', 'name': outlook, 'y': names, 'marker': {'color': color},
+         'x': [category['outlooks'].get(outlook, 0) for category in categories]}
+        for outlook, color in outlook_colors[language].items()
+    ]
+    return go.Figure({'data': traces, 'layout': {
+        'barmode': 'stack',
+        'title': {'text': f"{summary['name'] or 'All Regions'}: {summary['rows']} outlooks"},
+        'yaxis': {'autorange': 'reversed', 'automargin': True},
+        'height': 150 + 30 * len(categories),
+    }})
+
+# Callback to update the chart of the outlooks in the selected region
+@callback(
+    Output('region-summary-chart', 'figure'),
+    Input('table-language-dropdown', 'value'),
+    Input('region-dropdown', 'value')
+)
+@instrumented
+def update_region_summary(selected_language, selected_region):
+    summary = summaries[selected_language]
+    region = selected_region if selected_region != 'All Regions' else None
+    # A region of the previous language's options that update_table is resetting
+    result = summary.region_summary(region) or summary.region_summary()
+    return summary_figure(result, selected_language)
 
 # Callback to update the selected row data
-@app.callback(
+@callback(
     Output('selected-row-data', 'data'),
     Input('datatable', 'selected_rows'),
     Input('datatable', 'data')
 )
+@instrumented
 def update_selected_row_data(selected_rows, data):
     if selected_rows:
         return data[selected_rows[0]]
     return {}
 
-# Helper function to parse HTML content and convert it to Dash HTML components
-def parse_html_content(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+# Helper function to convert the parsed Employment Trends to Dash HTML components
+def render_trends(blocks):
     children = []
-    for element in soup.children:
-        if element.name == 'p':
-            children.append(html.P(element.text))
-        elif element.name == 'ul':
-            children.append(html.Ul([html.Li(li.text) for li in element.find_all('li')]))
+    for tag, content in blocks:
+        if tag == 'p':
+            children.append(html.P(content))
+        elif tag == 'ul':
+            children.append(html.Ul([html.Li(item) for item in content]))
     return children
 
 # Callback to display the detailed information of the selected row
-@app.callback(
+@callback(
     Output('row-details', 'children'),
-    Input('selected-row-data', 'data')
+    Input('selected-row-data', 'data'),
+    State('table-language-dropdown', 'value')
 )
-def display_row_details(row_data):
-    if row_data:
-        employment_trends = row_data.get('Employment Trends', '')
+@instrumented
+def display_row_details(row_data, selected_language):
+    details = trend_stores[selected_language].details(row_data.get('row_key')) if row_data else None
+    if details:
+        # The row key starts with the NOC code
+        ranked = summaries[selected_language].noc_regions(row_data['row_key'].split('-')[0], limit=best_region_count)
         return html.Div([
             html.H3("Detailed Information"),
-            html.P(f"Economic Region Name: {row_data.get('Economic Region Name', '')}"),
-            html.P(f"Outlook: {row_data.get('Outlook', '')}"),
-            html.Div(parse_html_content(employment_trends))
+            html.P(f"Economic Region Name: {details['Economic Region Name']}"),
+            html.P(f"Outlook: {details['Outlook']}"),
+            html.Div(render_trends(details['Employment Trends'])),
+            html.H4("Regions with the best outlook for this NOC"),
+            html.Ol([html.Li(f"{region['name']}: {region['outlook']}") for region in ranked['regions']] if ranked else [])
         ])
     return html.Div()
 
+# JSON of a summary, with the ETag of the data release like the rest of the API (OutlookApi.py)
+def summary_response(summary):
+    if summary is None:
+        flask.abort(404)
+    return json_response(summary)
+
+# Outlook counts of a region and of each broad category in it, or of every region without a code.
+# Registered on the Flask server by OutlookApp.py.
+@cached_by_release
+def region_summary(region_code=None):
+    return summary_response(summaries[request_language()].region_summary(region_code))
+
+# Regions of a NOC from the best outlook to the worst, ?limit=5 keeps the first five
+@cached_by_release
+def noc_summary(noc_code):
+    limit = flask.request.args.get('limit', type=int)
+    return summary_response(summaries[request_language()].noc_regions(noc_code, limit))
+
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == '__main__':
+    app = dash.Dash(__name__)
+    app.layout = layout
+    app.server.add_url_rule('/api/summary/regions', view_func=region_summary)
+    app.server.add_url_rule('/api/summary/regions/<region_code>', view_func=region_summary)
+    app.server.add_url_rule('/api/summary/nocs/<noc_code>', view_func=noc_summary)
     app.run_server(debug=True)
\ No newline at end of file
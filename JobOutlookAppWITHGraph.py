@@ -1,62 +1,74 @@
-import geopandas as gpd
 import pandas as pd
 import dash
-from dash import dcc, html
+from dash import dcc, html, callback
 from dash.dependencies import Input, Output
 import plotly.express as px
 import json
+from OutlookData import DataRegistry
+from OutlookIndex import build_index, select_rows
+from OutlookCore import outlook_frames, figure_cache
+from FigureCache import figure_key
+from RegionGeometry import load_region_table
+from CallbackMetrics import instrumented
 
-# Load the shapefile of Canada
-canada_shapefile = gpd.read_file('./data/ler_000b16a_e.shp')
+# Merge the job outlook data with the regions on the region code and index the merged rows
+# by NOC Title and region, built on the first visit
+def build_merged_data(language):
+    regions = load_region_table('medium').copy()
 
-# Simplify the geometries to reduce complexity
-canada_shapefile['geometry'] = canada_shapefile['geometry'].simplify(tolerance=0.01)
+    # Ensure the ERUID is an integer for merging
+    regions['ERUID'] = regions['ERUID'].astype(int)
 
-# Load the job outlook data
-job_outlook_data = pd.read_excel('./data/20242026_outlook_n21_en_250117.xlsx')
+    merged_data = regions.merge(outlook_frames[language], left_on='ERUID', right_on='Economic Region Code')
+    return merged_data, build_index(merged_data)
 
-# Ensure the ERUID is an integer for merging
-canada_shapefile['ERUID'] = canada_shapefile['ERUID'].astype(int)
-
-# Merge the data on the region code
-merged_data = canada_shapefile.merge(job_outlook_data, left_on='ERUID', right_on='Economic Region Code')
-
-# Print the merged data to check
-print(merged_data.head())
+merged_data = DataRegistry(build_merged_data, languages=('English',))
 
 # Create a simple Plotly scatter plot to visualize the data
-fig = px.scatter(merged_data, x='ERUID', y='Outlook', hover_name='Economic Region Name', title='Job Outlook by Region in Canada')
-
-# Initialize the Dash app
-app = dash.Dash(__name__)
-
-# Define the layout of the app
-app.layout = html.Div([
-    dcc.Tabs([
-        dcc.Tab(label='Map', children=[
-            dcc.Graph(figure=fig)
-        ]),
-        dcc.Tab(label='Job Specific Plot', children=[
-            dcc.Dropdown(
-                id='job-dropdown',
-                options=[{'label': job, 'value': job} for job in job_outlook_data['NOC Title'].unique()],
-                value=job_outlook_data['NOC Title'].unique()[0]
-            ),
-            dcc.Graph(id='job-specific-plot')
+def build_overview_plot():
+    return px.scatter(merged_data['English'][0], x='ERUID', y='Outlook', hover_name='Economic Region Name', title='Job Outlook by Region in Canada')
+
+# Define the layout of the page
+def layout(**kwargs):
+    job_titles = outlook_frames['English']['NOC Title'].unique()
+    fig = figure_cache.get_or_build(figure_key('JobOutlookAppWITHGraph.all', 'English', []), build_overview_plot)
+    return html.Div([
+        dcc.Tabs([
+            dcc.Tab(label='Map', children=[
+                dcc.Graph(figure=fig)
+            ]),
+            dcc.Tab(label='Job Specific Plot', children=[
+                dcc.Dropdown(
+                    id='job-dropdown',
+                    options=[{'label': job, 'value': job} for job in job_titles],
+                    value=job_titles[0]
+                ),
+                dcc.Graph(id='job-specific-plot')
+            ])
         ])
     ])
-])
 
 # Callback to update the job-specific plot
-@app.callback(
+@callback(
     Output('job-specific-plot', 'figure'),
     [Input('job-dropdown', 'value')]
 )
+@instrumented
 def update_job_specific_plot(selected_job):
-    filtered_data = merged_data[merged_data['NOC Title'] == selected_job]
+    return figure_cache.get_or_build(
+        figure_key('JobOutlookAppWITHGraph.job', 'English', [selected_job]),
+        lambda: build_job_specific_plot(selected_job)
+    )
+
+# Build the plot of the outlooks of one job by region
+def build_job_specific_plot(selected_job):
+    merged_rows, merged_index = merged_data['English']
+    filtered_data = select_rows(merged_rows, merged_index, titles=[selected_job])
     fig = px.scatter(filtered_data, x='ERUID', y='Outlook', hover_name='Economic Region Name', title=f'Job Outlook for {selected_job} by Region in Canada')
     return fig
 
-# Run the app
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app = dash.Dash(__name__)
+    app.layout = layout
+    app.run_server(debug=True)
@@ -1,88 +1,76 @@
 import dash
-from dash import dcc, html, Input, Output
-import plotly.express as px
-import pandas as pd
-import geopandas as gpd
+from dash import dcc, html, callback, Input, Output, State, Patch
+from OutlookIndex import select_rows
+from OutlookCore import data, map_data, figure_cache
+from FigureCache import figure_key
+from CallbackMetrics import instrumented, stage
+from BackgroundCallbacks import background_options
+from FigurePatch import outlook_figure, patch_selection, selection_counts, selection_points
 
-# Load the Excel file
-file_paths = {
-    'English': "./data/20242026_outlook_n21_en_250117.xlsx",
-    'French': "./data/20242026_outlook_n21_fr_250117.xlsx"
-}
+# Page layout, the NOC Title options come from the English data loaded on the first visit.
+def layout(**kwargs):
+    sorted_df = data['English'][0]
+    return html.Div([
+        dcc.Dropdown(
+            id='mapplot-noc-dropdown',
+            options=[{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()],
+            value=[sorted_df['NOC Title'].iloc[0]],  # Default value
+            multi=True,  # Allow multiple selections
+            clearable=False
+        ),
+        dcc.Graph(id='mapplot-map-plot', style={"width": "100vw", "height": "100vh"}),
 
-# Open the English xlsx file
-english_df = pd.read_excel(file_paths['English'])
+        # NOC Titles of the map in the order of its points, for the patches
+        dcc.Store(id='mapplot-selection')
+    ], style={"width": "100vw", "height": "100vh", "margin": "0", "padding": "0"})
 
-# Define the custom order and color scale for the 'Outlook' column
-outlook_order = ['very good', 'good', 'moderate', 'limited', 'undetermined']
-outlook_colors = {
-    'very good': 'green',
-    'good': 'blue',
-    'moderate': 'yellow',
-    'limited': 'orange',
-    'undetermined': 'red'
-}
+# Rows of the joined table for the given NOC Titles
+def select_map_rows(selected_nocs):
+    merged_df, merged_index = map_data['English']
+    return select_rows(merged_df, merged_index, titles=selected_nocs)
 
-# Sort the DataFrame based on the custom order
-english_df['Outlook'] = pd.Categorical(english_df['Outlook'], categories=outlook_order, ordered=True)
-sorted_df = english_df.sort_values(by=['NOC Title', 'Economic Region Name', 'Outlook'])
-
-# Load the shapefile
-gdf = gpd.read_file("./data/ler_000b16a_e.shp")
-gdf = gdf.to_crs(epsg=4326)  # Ensure the coordinate reference system is WGS84
-
-# Simplify geometries to improve performance
-gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.01, preserve_topology=True)
-
-# Calculate centroids for each region
-gdf['centroid'] = gdf.geometry.centroid
-
-# Merge the job outlook data with the shapefile
-merged_df = gdf[['ERNAME', 'centroid']].merge(sorted_df, left_on='ERNAME', right_on='Economic Region Name')
-
-# Extract latitude and longitude from centroids
-merged_df['lat'] = merged_df['centroid'].apply(lambda point: point.y)
-merged_df['lon'] = merged_df['centroid'].apply(lambda point: point.x)
-
-# Initialize the Dash app
-app = dash.Dash(__name__)
+# Callback to update the map plot based on dropdown selection. The first map is sent whole, after
+# that adding or removing NOC Titles sends a Patch with only the points that changed.
+@callback(
+    Output('mapplot-map-plot', 'figure'),
+    Output('mapplot-selection', 'data'),
+    Input('mapplot-noc-dropdown', 'value'),
+    State('mapplot-selection', 'data'),
+    **background_options()
+)
+@instrumented
+def update_map(selected_nocs, selection=None):
+    _, outlook_order, _ = data['English']
+    if selection:
+        fig = Patch()
+        with stage('patch'):
+            nocs, counts = patch_selection(
+                fig, select_map_rows, outlook_order, 'map', selection['nocs'], selection['counts'], selected_nocs
+            )
+        return fig, {'nocs': nocs, 'counts': counts}
 
-# App layout
-app.layout = html.Div([
-    dcc.Dropdown(
-        id='noc-dropdown',
-        options=[{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()],
-        value=[sorted_df['NOC Title'].iloc[0]],  # Default value
-        multi=True,  # Allow multiple selections
-        clearable=False
-    ),
-    dcc.Graph(id='map-plot', style={"width": "100vw", "height": "100vh"})
-], style={"width": "100vw", "height": "100vh", "margin": "0", "padding": "0"})
+    nocs = sorted(selected_nocs)
+    with stage('filter'):
+        rows = select_map_rows(nocs)
+    fig = figure_cache.get_or_build(
+        figure_key('MapPlot.map.points', 'English', nocs),
+        lambda: build_map(rows, nocs)
+    )
+    return fig, {'nocs': nocs, 'counts': selection_counts(rows, nocs, outlook_order)}
 
-# Callback to update the map plot based on dropdown selection
-@app.callback(
-    Output('map-plot', 'figure'),
-    Input('noc-dropdown', 'value')
-)
-def update_map(selected_nocs):
-    filtered_df = merged_df[merged_df['NOC Title'].isin(selected_nocs)]
-    
-    fig = px.scatter_mapbox(
-        filtered_df, lat='lat', lon='lon', color='Outlook', size_max=15, zoom=3,
-        mapbox_style="carto-positron", center={"lat": 56.1304, "lon": -106.3468},
+# Build the map plot for the rows of the selected NOC Titles, one trace per outlook
+def build_map(filtered_df, selected_nocs):
+    _, outlook_order, outlook_colors = data['English']
+    return outlook_figure(
+        'map', selection_points(filtered_df, selected_nocs, outlook_order, 'map'), outlook_order, outlook_colors,
+        mapbox=dict(style="carto-positron", center={"lat": 56.1304, "lon": -106.3468}, zoom=3),
         title='Career Outlook for Canadian Economic Regions 2024-2026',
-        category_orders={'Outlook': outlook_order},
-        color_discrete_map=outlook_colors,
-        hover_name='Economic Region Name'
-    )
-    
-    fig.update_layout(
         autosize=True,
         margin={"r":0,"t":0,"l":0,"b":0}
     )
-    
-    return fig
 
-# Run the app
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app = dash.Dash(__name__)
+    app.layout = layout
+    app.run_server(debug=True)
@@ -0,0 +1,54 @@
+import threading
+import unicodedata
+from collections import OrderedDict
+
+# Lowercase and strip accents so "ingenieur" matches "ingénieur"
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', str(text).casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+# Substring search over the unique NOC Titles of one language.
+# Titles are indexed by their accent-folded trigrams, so a query only checks the titles
+# sharing all of its trigrams instead of scanning every row of the DataFrame.
+class TitleSearch:
+    def __init__(self, titles, cache_size=512):
+        self.titles = list(titles)
+        self.folded = [fold(title) for title in self.titles]
+        self.trigrams = {}
+        for title_id, text in enumerate(self.folded):
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                self.trigrams.setdefault(gram, set()).add(title_id)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.lock = threading.Lock()
+
+    # Title ids worth checking for a query: the result of the longest cached prefix,
+    # otherwise the titles sharing every trigram of the query
+    def candidates(self, query):
+        for end in range(len(query) - 1, 0, -1):
+            previous = self.cache.get(query[:end])
+            if previous is not None:
+                return previous
+        if len(query) < 3:
+            return range(len(self.titles))
+        postings = sorted((self.trigrams.get(query[i:i + 3], set()) for i in range(len(query) - 2)), key=len)
+        return sorted(set.intersection(*postings))
+
+    # Ids of the titles containing the query, ignoring case and accents
+    def search(self, query):
+        query = fold(query)
+        with self.lock:
+            result = self.cache.get(query)
+            if result is not None:
+                self.cache.move_to_end(query)
+                return result
+
+            result = [title_id for title_id in self.candidates(query) if query in self.folded[title_id]]
+            self.cache[query] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return result
+
+    # Titles containing the query, ignoring case and accents
+    def matching_titles(self, query):
+        return [self.titles[title_id] for title_id in self.search(query)]
@@ -0,0 +1,147 @@
+import functools
+import json
+
+import flask
+import numpy as np
+import pandas as pd
+
+from OutlookData import DataRegistry, data_version, file_paths, language_tags
+from OutlookCore import outlook_frames, outlook_store
+from OutlookIndex import build_lookup, lookup_positions
+
+try:
+    import orjson
+except ImportError:  # the API falls back to the json module, 1,000 rows then take twice as long
+    orjson = None
+
+# Read-only JSON API over the loaded outlook data for other services, registered on the Flask
+# server of the app by OutlookApp.py, so it reads the same frames as the pages without going
+# through the Dash callbacks:
+#   /api/outlook?noc=21231&region=3530&lang=fr  rows of some NOCs and regions, both repeatable
+#                                               or comma-separated, with &offset= and &limit=
+#   /api/nocs?lang=en, /api/regions?lang=en     codes with their titles and names
+# Every response has the ETag of the data release, a client sending it back in If-None-Match
+# gets a 304 without the rows being read until a new release is served.
+
+api = flask.Blueprint('outlook_api', __name__, url_prefix='/api')
+
+# Rows returned when the request has no limit, and the largest limit allowed
+default_limit = 100
+max_limit = 1000
+
+# Columns of the returned rows
+api_columns = ['NOC_Code', 'NOC Title', 'Outlook', 'Economic Region Code', 'Economic Region Name', 'Province', 'Employment Trends']
+
+# Seconds a client or proxy may reuse a response before revalidating it
+max_age = 300
+
+# Changes whenever the response format does, so the cached responses of the old format don't match
+api_version = 1
+
+# Row positions of each NOC code and region code of a language
+code_indexes = DataRegistry(lambda language: {
+    column: build_lookup(outlook_frames[language], column) for column in ('NOC_Code', 'Economic Region Code')
+})
+
+# JSON response, serialized with orjson when it is installed
+def json_response(content):
+    body = orjson.dumps(content) if orjson else json.dumps(content, ensure_ascii=False)
+    return flask.Response(body, mimetype='application/json')
+
+# Answer with 304 Not Modified when the client has the response of the release being served,
+# and add its ETag and cache headers to the response. The ETag is weak, the same data is sent
+# with each content encoding. The language is checked first, an unknown one is a 404 even with the ETag.
+def cached_by_release(view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        request_language()
+        etag = f"{api_version}-{data_version()}"
+        if flask.request.if_none_match.contains_weak(etag):
+            response = flask.Response(status=304)
+        else:
+            response = view(*args, **kwargs)
+        response.set_etag(etag, weak=True)
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+        return response
+
+    return wrapper
+
+# Language of a request from ?lang=en or ?lang=French (or ?language=), English by default
+def request_language():
+    value = flask.request.args.get('lang') or flask.request.args.get('language') or 'English'
+    languages = {tag: language for language, tag in language_tags.items()}
+    language = languages.get(value.lower(), value)
+    if language not in file_paths:
+        flask.abort(404)
+    return language
+
+# Codes of a repeatable, comma-separated query parameter in the type of a key column, None without it
+def query_codes(name, codes):
+    values = [value for arg in flask.request.args.getlist(name) for value in arg.split(',') if value]
+    if not values:
+        return None
+    try:
+        return [codes.dtype.type(value) for value in values]
+    except (ValueError, OverflowError):
+        flask.abort(400)
+
+# Integer query parameter between low and high
+def query_int(name, default, low, high):
+    value = flask.request.args.get(name, default, type=int)
+    return min(max(value, low), high)
+
+# Rows of a frame at some positions as dicts, missing values as None. Each column is taken on its
+# own, a DataFrame.take and to_dict of a few rows cost milliseconds of pandas overhead.
+def records(df, positions, columns):
+    values = []
+    for column in columns:
+        taken = df[column].array.take(positions)
+        values.append([None if missing else value for value, missing in zip(np.asarray(taken).tolist(), pd.isna(taken))])
+    return [dict(zip(columns, row)) for row in zip(*values)]
+
+@api.route('/outlook')
+@cached_by_release
+def outlook():
+    language = request_language()
+    df = outlook_frames[language]
+    index = code_indexes[language]
+    rows = outlook_store().rows
+
+    positions = None
+    for column, name, codes in (('NOC_Code', 'noc', rows['noc_codes']), ('Economic Region Code', 'region', rows['region_codes'])):
+        values = query_codes(name, codes)
+        if values is not None:
+            found = lookup_positions(index, column, values)
+            positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+    if positions is None:
+        positions = np.arange(len(df))
+
+    offset = query_int('offset', 0, 0, len(positions))
+    limit = query_int('limit', default_limit, 0, max_limit)
+    columns = [column for column in api_columns if column in df.columns]
+    return json_response({
+        'release': data_version(),
+        'language': language,
+        'total': len(positions),
+        'offset': offset,
+        'limit': limit,
+        'rows': records(df, positions[offset:offset + limit], columns),
+    })
+
+# Codes with their text in a language, e.g. every NOC code with its title
+def code_labels(column, key):
+    language = request_language()
+    outlook_frames[language]
+    labels = outlook_store().labels(language, column)
+    return json_response([{key: code, 'name': name} for code, name in zip(labels.index.tolist(), labels.tolist())])
+
+@api.route('/nocs')
+@cached_by_release
+def nocs():
+    return code_labels('NOC Title', 'noc')
+
+@api.route('/regions')
+@cached_by_release
+def regions():
+    return code_labels('Economic Region Name', 'region')
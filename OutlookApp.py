@@ -0,0 +1,92 @@
+import os
+import dash
+from dash import dcc, html
+from flask_compress import Compress
+from CallbackMetrics import register_metrics
+from OutlookCore import figure_cache
+from OutlookApi import api
+from OutlookData import pin_release, unpin_release
+from OutlookRelease import start_watcher, watch_releases
+
+# Debug mode turns on the dev tools and the reloader, only for local development:
+# OUTLOOK_DEBUG=1 python OutlookApp.py
+debug = os.environ.get('OUTLOOK_DEBUG') == '1'
+
+# One Dash app serving every view as a page. The pages share the data of OutlookCore.py,
+# so a worker loads each language once whichever pages it serves.
+app = dash.Dash(__name__, use_pages=True, pages_folder='', suppress_callback_exceptions=True)
+
+# WSGI entry point for gunicorn or waitress
+server = app.server
+
+# Compress the callback responses, the figure JSON shrinks more than 10x. Brotli when the browser
+# supports it, at a level that stays fast for figures of a few MB.
+server.config.update(
+    COMPRESS_ALGORITHM=['br', 'gzip'],
+    COMPRESS_BR_LEVEL=4,
+    COMPRESS_LEVEL=6,
+    COMPRESS_MIMETYPES=['text/html', 'text/css', 'application/javascript', 'application/json', 'application/geo+json']
+)
+Compress(server)
+
+# Dash adds the modification time of each asset to its URL, so the browser can keep them
+# for a year. The component bundles under /_dash-component-suites/ are fingerprinted by Dash.
+if not debug:
+    server.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 3600
+
+# The page modules register their callbacks on import
+import app as overview
+import JobOutlookApp
+import MapPlot
+import VisualizeOutlook
+import OutlookPlot
+import JobOutlookAppWITHGraph
+
+# URL and name of each page. The layouts that are functions take **kwargs, Dash pages pass them
+# the query string parameters as keyword arguments.
+dash.register_page('app', path='/', name='Overview', layout=overview.layout)
+dash.register_page('JobOutlookApp', path='/table', name='Job Outlook Table', layout=JobOutlookApp.layout)
+dash.register_page('MapPlot', path='/map', name='Map', layout=MapPlot.layout)
+dash.register_page('VisualizeOutlook', path='/scatter', name='Scatter Plot', layout=VisualizeOutlook.layout)
+dash.register_page('OutlookPlot', path='/leaflet', name='Region Map', layout=OutlookPlot.layout)
+dash.register_page('JobOutlookAppWITHGraph', path='/jobs', name='Jobs by Region', layout=JobOutlookAppWITHGraph.layout)
+
+# Serve the region boundaries for the choropleth of the overview page
+server.add_url_rule('/regions/<level>.geojson', view_func=overview.region_boundaries)
+
+# JSON API over the outlook data for other services, see OutlookApi.py
+server.register_blueprint(api)
+
+# Outlook summaries of the regions and NOCs as JSON, see OutlookSummary.py
+server.add_url_rule('/api/summary/regions', view_func=JobOutlookApp.region_summary)
+server.add_url_rule('/api/summary/regions/<region_code>', view_func=JobOutlookApp.region_summary)
+server.add_url_rule('/api/summary/nocs/<noc_code>', view_func=JobOutlookApp.noc_summary)
+
+# Each request reads the data release served when it started, even if a new one replaces it meanwhile
+server.before_request(pin_release)
+server.teardown_request(unpin_release)
+
+# Callback timings at /metrics with OUTLOOK_METRICS=1, see CallbackMetrics.py
+register_metrics(server, figure_cache)
+
+# Links to every page above the current page
+app.layout = html.Div([
+    html.Nav([
+        dcc.Link(page['name'], href=page['relative_path'], style={'margin-right': '15px'})
+        for page in dash.page_registry.values()
+    ], style={'padding': '5px 10px'}),
+    dash.page_container
+])
+
+# Dash finishes its setup (moving the callbacks of the pages into the app) on the first request, and
+# marks it done before it is, so with several threads a first callback request can fail with
+# "Callback function not found". Send one request here so the setup is complete before any worker
+# is forked or serves traffic.
+server.test_client().get('/_dash-dependencies')
+
+# Run the app with the Flask development server, use gunicorn (see gunicorn.conf.py) in production
+if __name__ == '__main__':
+    # New releases in data/releases with OUTLOOK_WATCH_RELEASES=1, see OutlookRelease.py
+    if watch_releases:
+        start_watcher()
+    app.run_server(debug=debug, threaded=True)
@@ -0,0 +1,58 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Outlook scale from best to worst. The code of an outlook is its position, the same in both
+# languages, so sorting and filtering by outlook are operations on small integers.
+outlook_orders = {
+    'English': ['very good', 'good', 'moderate', 'limited', 'very limited', 'undetermined'],
+    'French': ['très bonnes', 'bonnes', 'modérées', 'limitées', 'très limitées', 'indéterminées']
+}
+
+# Code of the rows whose outlook is not on the scale
+unknown_code = -1
+
+# Other spellings of the outlooks found in older releases of the workbooks
+outlook_aliases = {
+    'fair': 2
+}
+
+# Lowercase and collapse the spaces (including non-breaking ones) of an outlook label
+def clean_label(label):
+    return ' '.join(str(label).replace('\xa0', ' ').split()).lower()
+
+# Code of every known label in either language
+label_codes = {clean_label(label): code for order in outlook_orders.values() for code, label in enumerate(order)}
+label_codes.update(outlook_aliases)
+
+# Raised by normalize_outlooks(strict=True) when some rows have an outlook that is not on the scale
+class UnknownOutlookError(ValueError):
+    def __init__(self, unknown):
+        self.unknown = unknown
+        super().__init__(f"Unknown outlook values: {unknown}")
+
+# int8 code of every value, unknown_code for values that are not on the scale. Only the distinct
+# values are looked up, so a categorical column costs one lookup per category.
+def outlook_codes(values):
+    values = pd.Categorical(values)
+    category_codes = [label_codes.get(clean_label(label), unknown_code) for label in values.categories]
+    # Missing values have the category code -1, which picks the last entry
+    category_codes = np.array(category_codes + [unknown_code], dtype=np.int8)
+    return category_codes[values.codes]
+
+# Number of rows of each value that is not on the scale, missing values included
+def unknown_outlooks(values, codes):
+    unknown = pd.Series(values)[codes == unknown_code]
+    return unknown.astype(object).fillna('<missing>').value_counts().to_dict()
+
+# Outlook column as an ordered categorical of the scale labels of the language, its codes are the outlook codes.
+# Rows with an outlook that is not on the scale are reported and left missing, or raise with strict=True.
+def normalize_outlooks(values, language, strict=False):
+    codes = outlook_codes(values)
+    if (codes == unknown_code).any():
+        unknown = unknown_outlooks(values, codes)
+        if strict:
+            raise UnknownOutlookError(unknown)
+        warnings.warn(f"{language} outlook data has values that are not on the outlook scale: {unknown}")
+    return pd.Categorical.from_codes(codes, categories=outlook_orders[language], ordered=True)
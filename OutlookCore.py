@@ -0,0 +1,70 @@
+from OutlookData import DataRegistry, data_version, load_outlook
+from OutlookCategories import outlook_orders
+from OutlookStore import OutlookStore
+from OutlookIndex import build_index
+from FigureCache import FigureCache, shared_dir
+from BackgroundCallbacks import figure_dir
+from RegionGeometry import load_region_table
+from CallbackMetrics import stage
+
+# Data shared by every view of the app. Each entry is built once per process, on the first
+# request for its language, whichever page asks for it first.
+
+# Rows shared by the languages with the text of each language, see OutlookStore.py.
+# Each release has its own store, outlook_store() is the one of the release being read.
+# Its rows come from the English data, whichever language is loaded first.
+outlook_stores = DataRegistry(lambda name: OutlookStore(load=load_outlook), languages=('shared',))
+
+def outlook_store():
+    return outlook_stores['shared']
+
+# Outlook data of each language, the rows of the columnar cache relabeled from the store
+outlook_frames = DataRegistry(lambda language: outlook_store().add_language(language, load_outlook(language)))
+
+# Color of each outlook on the plots
+outlook_colors = {
+    'English': {
+        'very good': 'green',
+        'good': 'blue',
+        'moderate': 'yellow',
+        'limited': 'orange',
+        'very limited': 'purple',
+        'undetermined': 'red'
+    },
+    'French': {
+        'très bonnes': 'green',
+        'bonnes': 'blue',
+        'modérées': 'yellow',
+        'limitées': 'orange',
+        'très limitées': 'purple',
+        'indéterminées': 'red'
+    }
+}
+
+# Function to load and process data. The outlooks are already coded in the outlook order, see OutlookCategories.py.
+def load_data(language):
+    # The Employment Trends text isn't shown on the plots, drop it so the sort below doesn't copy it
+    df = outlook_frames[language].drop(columns=['Employment Trends'])
+    sorted_df = df.sort_values(by=['NOC Title', 'Economic Region Name', 'Outlook'])
+    return sorted_df, outlook_orders[language], outlook_colors[language]
+
+# Sorted data with the outlook order and colors of each language, used by the plots
+data = DataRegistry(load_data)
+
+# Title and region index of the sorted data for each language
+indexes = DataRegistry(lambda language: build_index(data[language][0]))
+
+# Join the outlook rows with the region centroid coordinates by region code and index the joined rows
+def build_map_data(sorted_df):
+    with stage('merge'):
+        region_coords = load_region_table('medium')[['ERUID', 'lat', 'lon']]
+        region_coords = region_coords.assign(ERUID=region_coords['ERUID'].astype(int))
+        merged_df = region_coords.merge(sorted_df, left_on='ERUID', right_on='Economic Region Code')
+        return merged_df, build_index(merged_df)
+
+# The join only depends on the language, so build it once per language
+map_data = DataRegistry(lambda language: build_map_data(data[language][0]))
+
+# Cache of the built figures of every page, the keys start with the name of the page module.
+# The figures of each release are kept apart by its version. The background jobs write theirs to disk.
+figure_cache = FigureCache(version=data_version, directory=shared_dir or figure_dir)
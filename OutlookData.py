@@ -0,0 +1,233 @@
+import contextlib
+import gc
+import hashlib
+import glob
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+from OutlookCategories import normalize_outlooks
+
+# File paths for English and French Excel files of the release served by the process
+file_paths = {
+    'English': "./data/20242026_outlook_n21_en_250117.xlsx",
+    'French': "./data/20242026_outlook_n21_fr_250117.xlsx"
+}
+
+# Language tag of the workbook names and of the API requests
+language_tags = {'English': 'en', 'French': 'fr'}
+
+# Directory holding the columnar copies of the Excel files
+cache_dir = "./data/cache"
+
+# Directory watched for new releases, see OutlookRelease.py. The workbooks of the last release that
+# passed validation are recorded in current.json there and served after a restart.
+release_dir = os.environ.get('OUTLOOK_RELEASE_DIR', "./data/releases")
+current_release_file = os.path.join(release_dir, 'current.json')
+
+# Columns stored as categoricals, they only have a few hundred distinct values
+categorical_columns = ['Outlook', 'NOC Title', 'Economic Region Name']
+
+# Text columns are kept in Arrow buffers instead of Python str objects. Read from a memory-mapped
+# cache file they stay in the page cache shared by every worker process, and forked workers
+# don't copy them when the garbage collector touches the object headers.
+string_dtype = pd.StringDtype('pyarrow')
+
+# Hash the workbook contents so a new download of the same file name invalidates the cache
+def source_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+# Path of the cache file for a given workbook
+def cache_path(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{source_digest(path)}.arrow")
+
+# Read a workbook through openpyxl and apply the categorical dtypes
+def read_workbook(path):
+    df = pd.read_excel(path, sheet_name=0)
+    for col in categorical_columns:
+        df[col] = df[col].astype('category')
+    return df
+
+# Write a frame as uncompressed Arrow IPC so the file can be memory-mapped and read without copying
+def write_cache(df, target):
+    write_table(pa.Table.from_pandas(df, preserve_index=False), target)
+
+# Write an Arrow table to the cache, text is stored as large_string, the type pandas wraps without a cast
+def write_table(table, target):
+    for i, field in enumerate(table.schema):
+        if pa.types.is_string(field.type):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.large_string()))
+
+    # Write to a temporary file first so concurrent workers never read a partial cache
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, target)
+
+# Convert the workbook for a language to the Arrow IPC cache if it has not been done yet and return the cache path
+def build_cache(language):
+    path = active_release().file_paths[language]
+    target = cache_path(path)
+    if os.path.exists(target):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    write_cache(read_workbook(path), target)
+
+    # Remove caches left over from older versions of the same workbook, or from the Parquet cache
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for pattern in (f"{stem}-*.arrow", f"{stem}-*.parquet"):
+        for stale in glob.glob(os.path.join(cache_dir, pattern)):
+            if stale != target:
+                os.remove(stale)
+    return target
+
+# Identifier of the data release served, it changes whenever one of the workbooks changes
+def data_version():
+    return active_release().version
+
+# Load the outlook data for a language from the memory-mapped cache. Categoricals and numbers are
+# copied into numpy arrays (a few bytes per row), the text columns point into the mapped file.
+# The outlooks become the ordered outlook scale of OutlookCategories.py, coded in one byte per row.
+def load_outlook(language):
+    return read_cache(build_cache(language), language)
+
+def read_cache(path, language):
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(types_mapper={pa.large_string(): string_dtype}.get)
+    df['Outlook'] = normalize_outlooks(df['Outlook'], language)
+    return df
+
+# One data release: the workbook of each language and the entries every DataRegistry built from them.
+# A new release is built while the requests keep using the current one and then replaces it at once,
+# a request pins the release it started with so all the data it reads comes from the same workbooks.
+class DataRelease:
+    def __init__(self, paths):
+        self.file_paths = dict(paths)
+        self.entries = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+        self.digest = None
+
+    # Hashed on first use, the benchmarks on generated data never read the workbooks
+    @property
+    def version(self):
+        if self.digest is None:
+            self.digest = '-'.join(source_digest(path)[:8] for path in self.file_paths.values())
+        return self.digest
+
+    # Entries and build lock of a registry in this release
+    def registry_state(self, registry):
+        loaded = self.entries.get(registry)
+        if loaded is not None:
+            return loaded, self.locks[registry]
+        with self.lock:
+            if registry not in self.entries:
+                self.locks[registry] = threading.Lock()
+                self.entries[registry] = {}
+            return self.entries[registry], self.locks[registry]
+
+    # Read the registries from this release in the current thread, e.g. during a request or a build
+    @contextlib.contextmanager
+    def pinned(self):
+        previous = getattr(pinned_release, 'release', None)
+        pinned_release.release = self
+        try:
+            yield self
+        finally:
+            pinned_release.release = previous
+
+# The workbooks of the last validated release, or None when no release was recorded
+def recorded_release():
+    try:
+        with open(current_release_file) as f:
+            paths = json.load(f)['file_paths']
+    except FileNotFoundError:
+        return None
+    if set(paths) != set(file_paths) or not all(os.path.exists(path) for path in paths.values()):
+        return None
+    return paths
+
+file_paths.update(recorded_release() or {})
+
+current_release = DataRelease(file_paths)
+pinned_release = threading.local()
+
+# Release read by the current thread: the one it pinned, otherwise the one being served
+def active_release():
+    return getattr(pinned_release, 'release', None) or current_release
+
+# Pin the release served now for the rest of a request, called by the request hooks of OutlookApp.py
+def pin_release():
+    pinned_release.release = current_release
+
+def unpin_release(exception=None):
+    pinned_release.release = None
+
+# Rebuild what the process loaded from new workbooks and serve them from now on. The requests running
+# during the build keep their release, the process holds both releases until they are done.
+def activate_release(paths):
+    global current_release
+    release = DataRelease(paths)
+    with release.pinned():
+        for registry in DataRegistry.instances:
+            registry.preload(list(current_release.entries.get(registry, ())))
+    current_release = release
+    file_paths.update(paths)
+    return release
+
+# Per-language data built on first use, so a worker that only serves English never loads French.
+# registry[language] builds the entry once per release, concurrent requests wait for the same build.
+class DataRegistry:
+    instances = []
+
+    def __init__(self, build, languages=tuple(file_paths)):
+        self.build = build
+        self.languages = languages
+        DataRegistry.instances.append(self)
+
+    # Entries built in the active release
+    @property
+    def loaded(self):
+        return active_release().registry_state(self)[0]
+
+    def __getitem__(self, language):
+        release = active_release()
+        loaded, lock = release.registry_state(self)
+        entry = loaded.get(language)
+        if entry is None:
+            with lock:
+                entry = loaded.get(language)
+                if entry is None:
+                    with release.pinned():
+                        entry = loaded[language] = self.build(language)
+        return entry
+
+    # Build every language (or the given ones) now instead of on the first request
+    def preload(self, languages=None):
+        for language in self.languages:
+            if languages is None or language in languages:
+                self[language]
+
+# Build every registry of the process and move the loaded objects out of the garbage collector's
+# generations. gunicorn calls this in the master before forking the workers (see gunicorn.conf.py),
+# the workers then share the pages of the loaded data instead of each holding a copy.
+def preload_all(languages=None):
+    for registry in DataRegistry.instances:
+        registry.preload(languages)
+    gc.collect()
+    gc.freeze()
+
+# Build the caches for every language ahead of time, e.g. during a deploy
+if __name__ == '__main__':
+    for language in file_paths:
+        print(f"{language}: {build_cache(language)}")
@@ -0,0 +1,45 @@
+import numpy as np
+
+# Columns the callbacks filter on. Regions are selected by code, the same in every language.
+index_columns = ['NOC Title', 'Economic Region Code']
+
+# Positions returned when nothing matches
+no_rows = np.array([], dtype=np.intp)
+
+# Map every value of a column to the sorted positions of its rows
+def build_lookup(df, column):
+    return df.groupby(column, observed=True, sort=False).indices
+
+# Build the title and region lookups for a DataFrame once, when the data is loaded
+def build_index(df):
+    return {column: build_lookup(df, column) for column in index_columns if column in df.columns}
+
+# Sorted row positions for a list of values of one column
+def lookup_positions(index, column, values):
+    lookup = index[column]
+    positions = [lookup[value] for value in values if value in lookup]
+    if not positions:
+        return no_rows
+    if len(positions) == 1:
+        return positions[0]
+    return np.sort(np.concatenate(positions))
+
+# Row positions matching the selected NOC Titles and region code, None skips that filter
+def select_positions(index, titles=None, region=None):
+    positions = None
+    if titles is not None:
+        positions = lookup_positions(index, 'NOC Title', titles)
+    if region is not None:
+        region_positions = lookup_positions(index, 'Economic Region Code', [region])
+        if positions is None:
+            positions = region_positions
+        else:
+            positions = np.intersect1d(positions, region_positions, assume_unique=True)
+    return positions
+
+# Rows of df matching the selected NOC Titles and region code, in their original order
+def select_rows(df, index, titles=None, region=None):
+    positions = select_positions(index, titles, region)
+    if positions is None:
+        return df
+    return df.take(positions)
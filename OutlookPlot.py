@@ -1,74 +1,107 @@
 import dash
-from dash import dcc, html
+from dash import dcc, html, callback, Input, Output, State, no_update
 import dash_leaflet as dl
 import geopandas as gpd
 import json
 import pandas as pd
+from OutlookData import DataRegistry
+from OutlookCore import outlook_frames, outlook_colors as language_colors
+from RegionGeometry import level_for_zoom, load_region_table, load_regions, resolutions
+from CallbackMetrics import instrumented
 
-# Load shapefile
-gdf = gpd.read_file("./data/ler_000b16a_e.shp")
-
-gdf = gdf.to_crs(epsg=4326)
-
-# Convert to GeoJSON
-geojson = json.loads(gdf.to_json())
-
-job_outlook_data = pd.read_excel('./data/20242026_outlook_n21_en_250117.xlsx')
-
-app = dash.Dash(__name__)
-
-# Define colors for each outlook
-outlook_colors = {
-    'very good': 'green',
-    'good': 'blue',
-    'fair': 'yellow',
-    'limited': 'orange',
-    'undetermined': 'red'
-}
-
-# Filter job_outlook_data based on Outlook values
-filtered_data = job_outlook_data[job_outlook_data['Outlook'].isin(outlook_colors.keys())]
-
-# Extract coordinates for each Economic Region Name
-region_coords = gdf[['ERNAME', 'geometry']].set_index('ERNAME').to_dict()['geometry']
-
-# Create markers for each region
-markers = []
-for _, row in filtered_data.iterrows():
-    region_name = row['Economic Region Name']
-    outlook = row['Outlook']
-    if region_name in region_coords:
-        coords = region_coords[region_name].centroid.coords[0]
-        markers.append(dl.Marker(position=[coords[1], coords[0]], children=dl.Tooltip(region_name), icon={
-            "iconUrl": f"http://maps.google.com/mapfiles/ms/icons/{outlook_colors[outlook]}-dot.png"
-        }))
-
-# Add shaded background for provinces/territories
-shaded_regions = []
-for region_name, geometry in region_coords.items():
-    shaded_regions.append(dl.GeoJSON(data=json.loads(gpd.GeoSeries([geometry]).to_json()), style={
-        "fillColor": "grey",
-        "fillOpacity": 0.2,
-        "color": "grey",
-        "weight": 1
-    }))
-
-# Create a legend manually
-legend = html.Div([
-    html.Div([html.Span(style={'backgroundColor': color, 'display': 'inline-block', 'width': '20px', 'height': '20px'}), html.Span(f' {outlook}')]) 
-    for outlook, color in outlook_colors.items()
-], style={'position': 'absolute', 'bottom': '10px', 'left': '10px', 'backgroundColor': 'white', 'padding': '10px', 'border': '1px solid black'})
-
-# Update the app layout to include the new markers, shaded regions, and legend
-app.layout = html.Div([
-    dl.Map([
-        dl.TileLayer(),
-        dl.LayerGroup(markers),
-        dl.LayerGroup(shaded_regions),
-        dl.GeoJSON(data=geojson, style={"color": "grey", "weight": 2}),
-    ], center=[gdf.geometry.centroid.y.mean(), gdf.geometry.centroid.x.mean()], zoom=5, style={"height": "600px"}),
-    legend
-])
+# The resolution of the region boundaries sent to the browser follows the map zoom
+initial_zoom = 5
 
+# Colors of the English outlooks, the marker icons exist in these colors
+outlook_colors = language_colors['English']
+
+# Number of NOC Titles with each outlook in each region, one row per region of the shapefile
+def count_outlooks(data, regions):
+    counts = pd.crosstab(data['Economic Region Name'].astype(str), data['Outlook'].astype(str))
+    return counts.reindex(index=regions['ERNAME'], columns=list(outlook_colors), fill_value=0)
+
+# Region properties shared by the boundary and marker layers: the most common outlook and a tooltip with the counts
+def region_properties(counts, regions):
+    properties = pd.DataFrame({'ERNAME': regions['ERNAME'].values})
+    properties['outlook'] = counts.idxmax(axis=1).where(counts.sum(axis=1) > 0).values
+    for outlook in outlook_colors:
+        properties[outlook] = counts[outlook].values
+    properties['tooltip'] = [
+        f"<b>{name}</b><br>" + '<br>'.join(f"{outlook}: {count}" for outlook, count in row.items())
+        for name, row in zip(properties['ERNAME'], counts.to_dict('records'))
+    ]
+    return properties
+
+# Outlook properties of every region, computed once per release on the first visit
+def build_outlook_properties(language):
+    job_outlook_data = outlook_frames[language]
+
+    # Filter job_outlook_data based on Outlook values
+    filtered_data = job_outlook_data[job_outlook_data['Outlook'].isin(outlook_colors.keys())]
+    regions = load_region_table('medium')
+    return region_properties(count_outlooks(filtered_data, regions), regions)
+
+outlook_properties = DataRegistry(build_outlook_properties, languages=('English',))
+
+# Feature collection of the region boundaries at a resolution level with the outlook properties
+def build_region_layer(level):
+    regions = load_regions(level)
+    return json.loads(gpd.GeoDataFrame(outlook_properties['English'], geometry=regions.geometry.values, crs=regions.crs).to_json())
+
+region_layers = DataRegistry(build_region_layer, languages=tuple(resolutions))
+
+# Feature collection of the region centroids with the outlook properties
+def build_marker_layer(level):
+    regions = load_region_table(level)
+    centroids = gpd.points_from_xy(regions['lon'], regions['lat'], crs='EPSG:4326')
+    return json.loads(gpd.GeoDataFrame(outlook_properties['English'], geometry=centroids).to_json())
+
+marker_layers = DataRegistry(build_marker_layer, languages=('medium',))
+
+# One feature collection for the region boundaries and one for the region markers,
+# colored in the browser by assets/outlook_map.js from the outlook property.
+def layout(**kwargs):
+    level = level_for_zoom(initial_zoom)
+    regions = region_layers[level]
+    markers = marker_layers['medium']
+    centers = load_region_table('medium')[['lat', 'lon']].mean()
+    hideout = {'colors': outlook_colors}
+
+    # Create a legend manually
+    legend = html.Div([
+        html.Div([html.Span(style={'backgroundColor': color, 'display': 'inline-block', 'width': '20px', 'height': '20px'}), html.Span(f' {outlook}')])
+        for outlook, color in outlook_colors.items()
+    ], style={'position': 'absolute', 'bottom': '10px', 'left': '10px', 'backgroundColor': 'white', 'padding': '10px', 'border': '1px solid black'})
+
+    return html.Div([
+        dl.Map([
+            dl.TileLayer(),
+            dl.GeoJSON(id='region-layer', data=regions, style={'variable': 'outlookMap.regionStyle'}, hideout=hideout),
+            dl.GeoJSON(data=markers, pointToLayer={'variable': 'outlookMap.regionMarker'}, hideout=hideout),
+        ], id='outlook-map', center=[centers['lat'], centers['lon']], zoom=initial_zoom, style={"height": "600px"}),
+        legend,
+
+        # Resolution level of the boundaries currently shown
+        dcc.Store(id='region-level', data=level)
+    ])
+
+# Send finer or coarser boundaries when the zoom crosses a resolution level
+@callback(
+    Output('region-layer', 'data'),
+    Output('region-level', 'data'),
+    Input('outlook-map', 'zoom'),
+    State('region-level', 'data'),
+    prevent_initial_call=True
+)
+@instrumented
+def update_region_resolution(zoom, current_level):
+    level = level_for_zoom(zoom)
+    if level == current_level:
+        return no_update, no_update
+    return region_layers[level], level
+
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == "__main__":
-    app.run_server(debug=True)
\ No newline at end of file
+    app = dash.Dash(__name__)
+    app.layout = layout
+    app.run_server(debug=True)
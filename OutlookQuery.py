@@ -0,0 +1,36 @@
+import math
+
+import numpy as np
+
+from OutlookIndex import select_positions
+
+# Number of rows the DataTable shows per page
+page_size = 25
+
+# Rank of every row's outlook on the outlook scale, unknown outlooks rank last.
+# Computed once per language from the outlook codes, so sorting by outlook is an integer sort.
+def outlook_ranks(df):
+    codes = df['Outlook'].cat.codes.to_numpy().astype(np.int16)
+    codes[codes < 0] = len(df['Outlook'].cat.categories)
+    return codes
+
+# Order the row positions by the DataTable sort_by, sorting by outlook rank when nothing is selected
+def sort_positions(df, positions, ranks, sort_by):
+    column = sort_by[0]['column_id'] if sort_by else 'Outlook'
+    ascending = sort_by[0]['direction'] == 'asc' if sort_by else True
+    if column == 'Outlook':
+        keys = ranks[positions] if ascending else -ranks[positions]
+        return positions[np.argsort(keys, kind='stable')]
+    keys = df[column].iloc[positions].reset_index(drop=True)
+    order = keys.sort_values(ascending=ascending, kind='stable', na_position='last').index.to_numpy()
+    return positions[order]
+
+# Filter, sort and slice the rows for one page of the DataTable, returns the page and the page count
+def query_page(df, index, ranks, titles=None, region=None, sort_by=None, page_current=0, size=page_size):
+    positions = select_positions(index, titles, region)
+    if positions is None:
+        positions = np.arange(len(df))
+    positions = sort_positions(df, positions, ranks, sort_by)
+    page_count = max(1, math.ceil(len(positions) / size))
+    start = page_current * size
+    return df.take(positions[start:start + size]), page_count
@@ -0,0 +1,337 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from openpyxl import load_workbook
+
+from OutlookData import (
+    activate_release, cache_dir, cache_path, categorical_columns, current_release_file, file_paths,
+    language_tags, load_outlook, read_cache, release_dir, write_table
+)
+from OutlookStore import key_columns
+
+try:
+    import fcntl
+except ImportError:  # Windows, the workers don't share an ingest lock there
+    fcntl = None
+
+# New outlook releases are picked up without a restart. Put the workbooks of a release in the release
+# directory (data/releases, or OUTLOOK_RELEASE_DIR) under the names Job Bank uses, e.g.
+# 20252027_outlook_n21_en_260115.xlsx and 20252027_outlook_n21_fr_260115.xlsx. Each worker scans the
+# directory every OUTLOOK_RELEASE_POLL seconds. Once both workbooks of the newest release stop changing,
+# they are streamed to the columnar cache (one worker does it, the others wait for the files), checked,
+# compared with the release being served by NOC and region code, and every DataRegistry is rebuilt
+# from them in the background before the app switches over (OutlookData.activate_release).
+# A report with the checks and the differences is written next to the workbooks as <release>.json.
+
+logger = logging.getLogger(__name__)
+
+# Watch the release directory, started in each worker by gunicorn.conf.py or by OutlookApp.py
+watch_releases = os.environ.get('OUTLOOK_WATCH_RELEASES') == '1'
+poll_seconds = float(os.environ.get('OUTLOOK_RELEASE_POLL', 30))
+
+release_pattern = re.compile(r'^(?P<prefix>.+)_(?P<tag>' + '|'.join(language_tags.values()) + r')_(?P<suffix>[^_]+)\.xlsx$')
+
+# Rows read from a workbook before they are converted to Arrow arrays, so only this many rows
+# are ever held as Python objects
+batch_rows = 10_000
+
+# Columns every release must have
+required_columns = ['NOC_Code', 'NOC Title', 'Outlook', 'Employment Trends', 'Economic Region Code', 'Economic Region Name']
+
+# A release with fewer rows than this share of the release being served is taken for a truncated file
+min_row_ratio = 0.5
+
+# Keys of the changed rows listed in the report for each kind of change
+example_count = 10
+
+class ReleaseError(ValueError):
+    def __init__(self, name, errors):
+        super().__init__(f"release {name} rejected: {'; '.join(errors)}")
+        self.errors = errors
+
+# Complete releases in a directory as {release name: {language: workbook path}}, the release name is
+# the workbook name without its language tag
+def find_releases(directory=release_dir):
+    releases = {}
+    tags = {tag: language for language, tag in language_tags.items()}
+    if not os.path.isdir(directory):
+        return releases
+    for entry in os.scandir(directory):
+        match = release_pattern.match(entry.name)
+        if match and not entry.name.startswith('~$'):
+            name = f"{match['prefix']}_{match['suffix']}"
+            releases.setdefault(name, {})[tags[match['tag']]] = entry.path
+    return {name: paths for name, paths in releases.items() if set(paths) == set(language_tags)}
+
+# Size and modification time of the workbooks, a release is ingested once they stop changing
+def release_signature(paths):
+    return [[os.stat(path).st_size, os.stat(path).st_mtime_ns] for _, path in sorted(paths.items())]
+
+# Arrow array of one column of a batch of rows, text as large_string and columns mixing text with
+# other values as text, as pd.read_excel would keep them in an object column
+def column_array(values):
+    try:
+        array = pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if value is None else str(value) for value in values], pa.large_string())
+    return array.cast(pa.large_string()) if pa.types.is_string(array.type) else array
+
+# One column from the arrays of every batch, cast to the type they have in common
+def combine_batches(arrays):
+    types = {array.type for array in arrays if not pa.types.is_null(array.type)}
+    if len(types) == 1:
+        target = types.pop()
+    elif types and all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        target = pa.float64()
+    else:
+        target = pa.large_string()
+    return pa.chunked_array([array.cast(target) for array in arrays], target)
+
+# Text column whose values are all numbers as numbers, e.g. the NOC codes stored as text with their
+# leading zeros, as pd.read_excel parses them
+def parse_numbers(column):
+    for number_type in (pa.int64(), pa.float64()):
+        try:
+            return column.cast(number_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            pass
+    return column
+
+# Text column as a dictionary array with the sorted categories and the code type pandas gives a
+# categorical of that many categories, the same column read_workbook writes to the cache
+def dictionary_column(column):
+    values = column.cast(pa.string()).combine_chunks()
+    categories = pc.unique(values).drop_null()
+    categories = categories.take(pc.sort_indices(categories))
+    code_dtype = pd.Categorical.from_codes([], categories=pd.RangeIndex(len(categories))).codes.dtype
+    codes = pc.index_in(values, value_set=categories).cast(pa.from_numpy_dtype(code_dtype))
+    return pa.DictionaryArray.from_arrays(codes, categories)
+
+# Stream the first sheet of a workbook to the columnar cache. openpyxl reads the rows one by one in
+# read-only mode and every batch_rows rows become Arrow arrays, instead of pd.read_excel holding every
+# cell as a Python object until the frame is built. Returns the number of rows.
+def stream_workbook(path, target):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = list(next(rows, ()))
+        while header and header[-1] is None:
+            header.pop()
+        header = [str(name) for name in header]
+        batches = {name: [] for name in header}
+
+        def flush(batch):
+            for name, values in zip(header, zip(*batch)):
+                batches[name].append(column_array(list(values)))
+
+        batch = []
+        for row in rows:
+            row = row[:len(header)] + (None,) * (len(header) - len(row))
+            if all(value is None for value in row):
+                continue
+            batch.append(row)
+            if len(batch) == batch_rows:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    finally:
+        workbook.close()
+
+    columns = {}
+    for name in header:
+        column = combine_batches(batches.pop(name) or [pa.array([], pa.large_string())])
+        if name in categorical_columns:
+            column = dictionary_column(column)
+        elif pa.types.is_large_string(column.type):
+            column = parse_numbers(column)
+        columns[name] = column
+    table = pa.table(columns)
+    write_table(table, target)
+    return table.num_rows
+
+# Only one worker streams a workbook, the others wait and read the file it wrote
+class IngestLock:
+    def __enter__(self):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.file = open(os.path.join(cache_dir, 'ingest.lock'), 'w')
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info):
+        if fcntl:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
+
+# Problems of a release that keep it from being served, and problems that are only reported
+def validate_release(frames, current_frames):
+    errors, warnings = [], []
+    for language, df in frames.items():
+        missing = [column for column in required_columns if column not in df.columns]
+        if missing:
+            errors.append(f"{language}: missing columns {missing}")
+            continue
+        if df.empty:
+            errors.append(f"{language}: no rows")
+            continue
+        null_keys = int(df[key_columns].isna().any(axis=1).sum())
+        if null_keys:
+            errors.append(f"{language}: {null_keys} rows without a NOC or region code")
+        current = current_frames.get(language)
+        if current is not None and len(df) < min_row_ratio * len(current):
+            errors.append(f"{language}: {len(df)} rows against {len(current)} in the release being served")
+        duplicated = int(df.duplicated(key_columns).sum())
+        if duplicated:
+            warnings.append(f"{language}: {duplicated} rows repeat the NOC and region codes of an earlier row")
+        unknown = int((df['Outlook'].cat.codes < 0).sum())
+        if unknown:
+            warnings.append(f"{language}: {unknown} rows with an unknown outlook")
+
+    if not errors:
+        keys = [pd.MultiIndex.from_frame(df[key_columns]) for df in frames.values()]
+        different = len(keys[0].symmetric_difference(keys[-1]))
+        if different:
+            warnings.append(f"{different} NOC and region codes are only in one language")
+    return errors, warnings
+
+# Row keys of a frame as 'NOC_Code-Economic Region Code'
+def key_strings(df):
+    return (df['NOC_Code'].astype(str) + '-' + df['Economic Region Code'].astype(str)).tolist()
+
+# Rows added, removed and changed between two frames of a language, matched by NOC and region code
+def diff_frames(new, old):
+    compared = ['Outlook', 'NOC Title', 'Economic Region Name', 'Employment Trends']
+    old = old.drop_duplicates(key_columns)[key_columns + compared]
+    new = new.drop_duplicates(key_columns)[key_columns + compared]
+    merged = old.merge(new, on=key_columns, how='outer', suffixes=(' old', ' new'), indicator=True)
+    both = merged[merged['_merge'] == 'both']
+    changes = {
+        'added': merged[merged['_merge'] == 'right_only'],
+        'removed': merged[merged['_merge'] == 'left_only'],
+    }
+    for column in compared:
+        changed = both[f"{column} old"].astype(str).to_numpy() != both[f"{column} new"].astype(str).to_numpy()
+        changes[f"{column} changed"] = both[changed]
+    return {
+        'rows': len(new),
+        'previous_rows': len(old),
+        **{kind: len(rows) for kind, rows in changes.items()},
+        'examples': {kind: key_strings(rows.head(example_count)) for kind, rows in changes.items() if len(rows)},
+    }
+
+# Write a JSON file atomically, every worker writes the same report
+def write_json(path, content):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(content, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def report_path(name, directory=release_dir):
+    return os.path.join(directory, f"{name}.json")
+
+# Stream, check and compare the workbooks of a release, then serve it. The report is returned and
+# written next to the workbooks, a release that fails the checks raises ReleaseError.
+def ingest_release(name, paths, directory=release_dir):
+    start = time.perf_counter()
+    report = {'release': name, 'file_paths': paths, 'signature': release_signature(paths), 'status': 'rejected'}
+
+    targets = {}
+    with IngestLock():
+        for language, path in paths.items():
+            target = cache_path(path)
+            if not os.path.exists(target):
+                stream_workbook(path, target)
+            targets[language] = target
+    report['ingest_seconds'] = time.perf_counter() - start
+
+    frames = {language: read_cache(target, language) for language, target in targets.items()}
+    current_frames = {language: load_outlook(language) for language in file_paths}
+    report['errors'], report['warnings'] = validate_release(frames, current_frames)
+    if not report['errors']:
+        report['diff'] = {language: diff_frames(frames[language], current_frames[language]) for language in frames}
+    del frames, current_frames
+    if report['errors']:
+        write_json(report_path(name, directory), report)
+        raise ReleaseError(name, report['errors'])
+
+    activate_release(paths)
+    report['status'] = 'served'
+    report['seconds'] = time.perf_counter() - start
+    write_json(report_path(name, directory), report)
+    write_json(current_release_file, {'release': name, 'file_paths': paths})
+    return report
+
+# Scan of the release directory, run every poll_seconds by the watcher thread
+class ReleaseWatcher:
+    def __init__(self, directory=release_dir):
+        self.directory = directory
+        # Signature of the newest release at the previous scan, and the releases already handled
+        self.pending = None
+        self.handled = {}
+
+    # Ingest the newest release once its workbooks stopped changing between two scans. Only the newest
+    # release is served, so an older one left in the directory never replaces it.
+    def poll(self, wait_for_stable=True):
+        releases = find_releases(self.directory)
+        if not releases:
+            return None
+        name, paths = max(releases.items(), key=lambda item: max(os.stat(path).st_mtime_ns for path in item[1].values()))
+        if paths == {language: file_paths[language] for language in paths}:
+            return None
+        signature = release_signature(paths)
+        if self.handled.get(name) == signature or self.rejected(name, signature):
+            return None
+        if wait_for_stable and self.pending != (name, signature):
+            self.pending = (name, signature)
+            return None
+
+        self.handled[name] = signature
+        try:
+            report = ingest_release(name, paths, self.directory)
+        except ReleaseError as error:
+            logger.warning(str(error))
+            return None
+        logger.info("serving release %s: %s", name, {language: {kind: count for kind, count in diff.items() if kind != 'examples'} for language, diff in report['diff'].items()})
+        return report
+
+    # Whether the report of an earlier scan, maybe in another process, rejected these workbooks
+    def rejected(self, name, signature):
+        try:
+            with open(report_path(name, self.directory)) as f:
+                report = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return False
+        return report.get('status') == 'rejected' and report.get('signature') == signature
+
+    def run(self, stop):
+        while not stop.wait(poll_seconds):
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("scan of the release directory failed")
+
+watcher_lock = threading.Lock()
+watcher_thread = None
+
+# Start watching the release directory in this process, once
+def start_watcher():
+    global watcher_thread
+    with watcher_lock:
+        if watcher_thread is None:
+            watcher_thread = threading.Thread(target=ReleaseWatcher().run, args=(threading.Event(),), name='release-watcher', daemon=True)
+            watcher_thread.start()
+    return watcher_thread
+
+# Check and serve the newest release in the directory now, e.g. during a deploy. Running servers
+# pick it up on their next scan, restarted ones from current.json.
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    report = ReleaseWatcher().poll(wait_for_stable=False)
+    print(json.dumps(report, indent=2, ensure_ascii=False) if report else "no new release")
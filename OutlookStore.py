@@ -0,0 +1,182 @@
+import threading
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Columns that identify a row, the same in every language
+key_columns = ['NOC_Code', 'Economic Region Code']
+
+# Language-specific text that only depends on the NOC code or on the region code,
+# stored once per code instead of once per row
+noc_columns = ['NOC Title']
+region_columns = ['Economic Region Name']
+
+# Outlook data of every language in one store. The rows, their keys and their outlook codes are
+# shared by the languages. Each language adds lookup tables from the NOC and region codes to its
+# titles and names, and the per-row text that only exists in that language (Employment Trends).
+# The frame of a language is the shared rows relabeled with its lookups, so the same row is at the
+# same position in every language and a selection of positions survives a language switch.
+# The rows and their outlooks always come from the reference language, loaded with load when another
+# language is added first, so the store doesn't depend on which language a worker was asked for first.
+class OutlookStore:
+    def __init__(self, load=None, reference='English'):
+        self.load = load
+        self.reference = reference
+        self.rows = None
+        self.languages = {}
+        self.lock = threading.Lock()
+
+    # Add the frame of a language as loaded by load_outlook and return it relabeled from the store.
+    # Without a load function, the first language added sets the rows of the store.
+    def add_language(self, language, df):
+        with self.lock:
+            if self.rows is None:
+                if language != self.reference and self.load is not None:
+                    reference_df = self.load(self.reference)
+                    self.rows = self.shared_rows(reference_df)
+                    self.languages[self.reference] = self.language_labels(self.reference, reference_df)
+                else:
+                    self.rows = self.shared_rows(df)
+            self.languages[language] = self.language_labels(language, df)
+            return self.frame(language)
+
+    # Keys and outlook code of every row, and the distinct NOC and region codes. The key columns of
+    # the reference language are used as they are, they point into its memory-mapped cache.
+    def shared_rows(self, df):
+        duplicated = df.duplicated(key_columns)
+        if duplicated.any():
+            warnings.warn(f"{duplicated.sum()} outlook rows have the NOC and region codes of an earlier row and are ignored")
+            df = df[~duplicated]
+        return {
+            'NOC_Code': df['NOC_Code'].to_numpy(),
+            'Economic Region Code': df['Economic Region Code'].to_numpy(),
+            'outlook_codes': df['Outlook'].cat.codes.to_numpy(),
+            'noc_codes': np.unique(df['NOC_Code'].to_numpy()),
+            'region_codes': np.unique(df['Economic Region Code'].to_numpy()),
+        }
+
+    # Position of the NOC code and of the region code of every row in the distinct codes
+    def code_positions(self):
+        rows = self.rows
+        return np.searchsorted(rows['noc_codes'], rows['NOC_Code']), np.searchsorted(rows['region_codes'], rows['Economic Region Code'])
+
+    # Position in the store of every row of df, -1 for rows whose codes are not in the store.
+    # The NOC and region positions are combined into one integer key and looked up in the sorted keys.
+    def store_positions(self, df):
+        rows = self.rows
+        region_count = len(rows['region_codes'])
+        noc_positions, region_positions = self.code_positions()
+        store_keys = noc_positions.astype(np.int64) * region_count + region_positions
+        order = np.argsort(store_keys, kind='stable')
+        sorted_keys = store_keys[order]
+
+        noc_positions, noc_known = code_positions(rows['noc_codes'], df['NOC_Code'].to_numpy())
+        region_positions, region_known = code_positions(rows['region_codes'], df['Economic Region Code'].to_numpy())
+        keys = noc_positions.astype(np.int64) * region_count + region_positions
+        found = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+        known = noc_known & region_known & (sorted_keys[found] == keys)
+        return np.where(known, order[found], -1)
+
+    # Lookups of a language from the codes to its text, and its per-row columns in the order of the store
+    def language_labels(self, language, df):
+        rows = self.rows
+        positions = self.store_positions(df)
+        known = positions >= 0
+        if not known.all():
+            warnings.warn(f"{(~known).sum()} {language} outlook rows have NOC and region codes that are not in the store and are ignored")
+
+        # Row of df for every row of the store, -1 where the language has no row
+        source_rows = np.full(len(rows['NOC_Code']), -1, dtype=np.intp)
+        source_rows[positions[known]] = np.flatnonzero(known)
+        missing = source_rows < 0
+        if missing.any():
+            warnings.warn(f"{missing.sum()} outlook rows have no {language} text")
+
+        # The outlooks come from the reference language, report the rows where this one disagrees
+        disagreeing = df['Outlook'].cat.codes.to_numpy()[known] != rows['outlook_codes'][positions[known]]
+        if disagreeing.any():
+            warnings.warn(f"{disagreeing.sum()} {language} outlook rows have another outlook than the {self.reference} rows")
+
+        # The text columns keep pointing into the memory-mapped cache when the rows are already in order
+        in_order = len(df) == len(source_rows) and not missing.any() and (source_rows == np.arange(len(df))).all()
+        shared = set(key_columns + noc_columns + region_columns + ['Outlook'])
+        row_columns = {
+            column: df[column].array if in_order else df[column].array.take(source_rows, allow_fill=True)
+            for column in df.columns if column not in shared
+        }
+
+        noc = {column: code_lookup(df, 'NOC_Code', column, rows['noc_codes']) for column in noc_columns if column in df.columns}
+        region = {column: code_lookup(df, 'Economic Region Code', column, rows['region_codes']) for column in region_columns if column in df.columns}
+
+        # A title or name column of rows in order with the categories of its lookup already has the codes
+        # the relabeling would compute, keep it so its codes stay in the memory-mapped cache too
+        if in_order:
+            for column, lookup in {**noc, **region}.items():
+                if isinstance(df[column].dtype, pd.CategoricalDtype) and df[column].cat.categories.equals(lookup.categories):
+                    row_columns[column] = df[column].array
+
+        return {
+            'columns': list(df.columns),
+            'outlook_categories': df['Outlook'].cat.categories,
+            'noc': noc,
+            'region': region,
+            'row_columns': row_columns,
+        }
+
+    # Frame of a language with the columns of its workbook, built from the shared rows and its lookups.
+    # The key columns and the outlook codes are the arrays of the store, shared by every language.
+    def frame(self, language):
+        rows, labels = self.rows, self.languages[language]
+        noc_positions, region_positions = self.code_positions()
+        columns = {}
+        for column in labels['columns']:
+            if column in key_columns:
+                columns[column] = rows[column]
+            elif column == 'Outlook':
+                columns[column] = pd.Categorical.from_codes(
+                    rows['outlook_codes'], dtype=pd.CategoricalDtype(labels['outlook_categories'], ordered=True), validate=False
+                )
+            elif column in labels['row_columns']:
+                columns[column] = labels['row_columns'][column]
+            elif column in labels['noc']:
+                columns[column] = labels['noc'][column].relabel(noc_positions)
+            else:
+                columns[column] = labels['region'][column].relabel(region_positions)
+        return pd.DataFrame(columns, copy=False)
+
+    # Text of a NOC or region column of a language for each code, e.g. the NOC Titles by NOC_Code
+    def labels(self, language, column):
+        labels = self.languages[language]
+        if column in labels['noc']:
+            return pd.Series(labels['noc'][column].values(), index=self.rows['noc_codes'], name=column)
+        return pd.Series(labels['region'][column].values(), index=self.rows['region_codes'], name=column)
+
+# Text of one column for every code of a key column, kept as the categories of a categorical
+# in sorted order (the order the categoricals of the workbook have) and the category of each code
+class CodeLookup:
+    def __init__(self, categories, category_codes):
+        self.categories = categories
+        self.category_codes = category_codes
+
+    # Categorical of the text of each row, from the code position of each row
+    def relabel(self, code_positions):
+        return pd.Categorical.from_codes(self.category_codes[code_positions], categories=self.categories, validate=False)
+
+    # Text of each code, None for codes without text
+    def values(self):
+        categories = np.asarray(self.categories, dtype=object)
+        return np.where(self.category_codes >= 0, categories[self.category_codes], None)
+
+# Lookup of a column that only depends on a key column, the first row of each code gives its text
+def code_lookup(df, key_column, column, codes):
+    first = df.drop_duplicates(key_column).set_index(key_column)[column].reindex(codes)
+    categories = pd.Index(first.dropna().unique()).sort_values()
+    # Category codes in the integer type pandas uses for that many categories, so relabeling doesn't convert them
+    code_dtype = pd.Categorical.from_codes([], categories=categories).codes.dtype
+    return CodeLookup(categories, categories.get_indexer(first).astype(code_dtype))
+
+# Position of every value in the sorted codes, and whether the value is one of the codes
+def code_positions(codes, values):
+    positions = np.minimum(np.searchsorted(codes, values), len(codes) - 1)
+    return positions, codes[positions] == values
@@ -0,0 +1,129 @@
+import numpy as np
+
+from OutlookCategories import outlook_orders
+
+# Broad occupational categories of NOC 2021, the first digit of the five-digit NOC code
+broad_categories = {
+    'English': [
+        'Legislative and senior management occupations',
+        'Business, finance and administration occupations',
+        'Natural and applied sciences and related occupations',
+        'Health occupations',
+        'Occupations in education, law and social, community and government services',
+        'Occupations in art, culture, recreation and sport',
+        'Sales and service occupations',
+        'Trades, transport and equipment operators and related occupations',
+        'Natural resources, agriculture and related production occupations',
+        'Occupations in manufacturing and utilities',
+    ],
+    'French': [
+        'Membres des corps législatifs et cadres supérieurs de la gestion',
+        'Affaires, finance et administration',
+        'Sciences naturelles et appliquées et domaines apparentés',
+        'Secteur de la santé',
+        'Enseignement, droit et services sociaux, communautaires et gouvernementaux',
+        'Arts, culture, sports et loisirs',
+        'Vente et services',
+        'Métiers, transport, machinerie et domaines apparentés',
+        'Ressources naturelles, agriculture et production connexe',
+        "Fabrication et services d'utilité publique",
+    ]
+}
+
+# Outlook summaries of the regions and NOCs of a language, counted once from the rows of the store
+# so each lookup is an index into dense arrays instead of a filter and group-by of the frame:
+#   region_counts[region, outlook]              rows of each outlook in each region
+#   category_counts[category, region, outlook]  the same for each broad category
+#   ranked_regions[noc_starts[noc]:noc_starts[noc + 1]]  regions of a NOC, best outlook first
+# The last outlook column counts the rows whose outlook is not on the scale.
+class OutlookSummary:
+    def __init__(self, store, language):
+        rows = store.rows
+        self.outlook_order = outlook_orders[language]
+        self.categories = broad_categories[language]
+        self.noc_codes = rows['noc_codes']
+        self.region_codes = rows['region_codes']
+        self.titles = store.labels(language, 'NOC Title').to_numpy()
+        self.region_names = store.labels(language, 'Economic Region Name').to_numpy()
+
+        noc_positions, region_positions = store.code_positions()
+        outlooks = len(self.outlook_order) + 1
+        ranks = rows['outlook_codes'].astype(np.intp)
+        ranks[ranks < 0] = outlooks - 1
+        category_codes = np.clip(rows['NOC_Code'].astype(np.int64) // 10000, 0, len(self.categories) - 1)
+
+        regions = len(self.region_codes)
+        cells = region_positions * outlooks + ranks
+        self.region_counts = np.bincount(cells, minlength=regions * outlooks).reshape(regions, outlooks)
+        self.category_counts = np.bincount(
+            category_codes * regions * outlooks + cells, minlength=len(self.categories) * regions * outlooks
+        ).reshape(len(self.categories), regions, outlooks)
+
+        # Rows grouped by NOC and sorted by outlook, ties in region code order
+        order = np.lexsort((region_positions, ranks, noc_positions))
+        self.ranked_regions = region_positions[order]
+        self.ranked_outlooks = ranks[order]
+        self.noc_starts = np.searchsorted(noc_positions[order], np.arange(len(self.noc_codes) + 1))
+
+    # Position of a code in the sorted codes, None when it isn't one of them. The code can be text,
+    # e.g. from a URL or a row key, it is converted to the type of the codes.
+    def position(self, codes, code):
+        try:
+            code = codes.dtype.type(code)
+        except (TypeError, ValueError):
+            return None
+        position = np.searchsorted(codes, code)
+        if position < len(codes) and codes[position] == code:
+            return int(position)
+        return None
+
+    # Outlook labels with their counts, the rows with an outlook that is not on the scale under 'unknown'
+    def outlook_counts(self, counts):
+        labeled = dict(zip(self.outlook_order, counts[:-1].tolist()))
+        if counts[-1]:
+            labeled['unknown'] = int(counts[-1])
+        return labeled
+
+    # Outlook counts of a region and of each broad category in it, every region when region_code is None.
+    # None for a region code that isn't in the data.
+    def region_summary(self, region_code=None):
+        if region_code is None:
+            name = None
+            counts = self.region_counts.sum(axis=0)
+            category_counts = self.category_counts.sum(axis=1)
+        else:
+            region = self.position(self.region_codes, region_code)
+            if region is None:
+                return None
+            region_code, name = self.region_codes[region].item(), self.region_names[region]
+            counts = self.region_counts[region]
+            category_counts = self.category_counts[:, region]
+        return {
+            'region': region_code,
+            'name': name,
+            'rows': int(counts.sum()),
+            'outlooks': self.outlook_counts(counts),
+            'categories': [
+                {'category': category, 'name': self.categories[category], 'outlooks': self.outlook_counts(category_counts[category])}
+                for category in np.flatnonzero(category_counts.sum(axis=1)).tolist()
+            ],
+        }
+
+    # Regions of a NOC from the best outlook to the worst, None for a NOC code that isn't in the data
+    def noc_regions(self, noc_code, limit=None):
+        noc = self.position(self.noc_codes, noc_code)
+        if noc is None:
+            return None
+        start, end = self.noc_starts[noc], self.noc_starts[noc + 1]
+        if limit is not None:
+            end = min(end, start + limit)
+        regions, ranks = self.ranked_regions[start:end], self.ranked_outlooks[start:end]
+        outlooks = np.array(self.outlook_order + [None], dtype=object)[ranks]
+        return {
+            'noc': self.noc_codes[noc].item(),
+            'title': self.titles[noc],
+            'regions': [
+                {'region': code, 'name': name, 'outlook': outlook}
+                for code, name, outlook in zip(self.region_codes[regions].tolist(), self.region_names[regions].tolist(), outlooks.tolist())
+            ],
+        }
@@ -0,0 +1,109 @@
+import glob
+import json
+import os
+from functools import lru_cache
+
+import geopandas as gpd
+import pandas as pd
+
+from OutlookData import cache_dir, source_digest
+
+# Shapefile of the economic regions from Statistics Canada
+shapefile_path = "./data/ler_000b16a_e.shp"
+
+# Simplification tolerance in degrees for each resolution level, from the coarsest to the finest.
+# Coverage simplification removes fewer vertices than simplify() for the same tolerance,
+# medium keeps about as many vertices as the simplify(tolerance=0.01) the apps used before.
+resolutions = {
+    'low': 0.1,
+    'medium': 0.02,
+    'high': 0.005
+}
+
+# Highest map zoom each resolution level is served at, the finest level is used above them
+zoom_limits = {
+    'low': 4,
+    'medium': 7
+}
+
+# Resolution level to send to the browser for a map zoom
+def level_for_zoom(zoom):
+    if zoom is None:
+        return 'medium'
+    for level, max_zoom in zoom_limits.items():
+        if zoom <= max_zoom:
+            return level
+    return 'high'
+
+# Path of the preprocessed boundaries for a resolution level
+def geometry_path(level):
+    stem = os.path.splitext(os.path.basename(shapefile_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{source_digest(shapefile_path)}-{level}.parquet")
+
+# Simplify the regions as one coverage so neighbouring regions keep sharing their edges,
+# older geopandas versions fall back to simplifying each region on its own
+def simplify_boundaries(geometry, tolerance):
+    if hasattr(geometry, 'simplify_coverage'):
+        return geometry.simplify_coverage(tolerance)
+    return geometry.simplify(tolerance, preserve_topology=True)
+
+# Offline build step: reproject the shapefile to WGS84, compute the centroids and write
+# the simplified boundaries of every resolution level as GeoParquet
+def build_geometry():
+    paths = {level: geometry_path(level) for level in resolutions}
+    if all(os.path.exists(path) for path in paths.values()):
+        return paths
+
+    os.makedirs(cache_dir, exist_ok=True)
+    gdf = gpd.read_file(shapefile_path)
+
+    # Centroids are computed in the projected CRS of the shapefile, centroids in degrees are skewed
+    centroids = gdf.geometry.centroid.to_crs(epsg=4326)
+    gdf = gdf.to_crs(epsg=4326)
+    gdf['lat'] = centroids.y
+    gdf['lon'] = centroids.x
+
+    for level, tolerance in resolutions.items():
+        simplified = gdf.copy()
+        simplified['geometry'] = simplify_boundaries(gdf.geometry, tolerance)
+
+        # Write to a temporary file first so concurrent workers never read a partial file
+        tmp_path = f"{paths[level]}.{os.getpid()}.tmp"
+        simplified.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, paths[level])
+
+    # Remove files left over from an older version of the shapefile
+    stem = os.path.splitext(os.path.basename(shapefile_path))[0]
+    for stale in glob.glob(os.path.join(cache_dir, f"{stem}-*.parquet")):
+        if stale not in paths.values():
+            os.remove(stale)
+    return paths
+
+# Region boundaries in WGS84 with ERUID, ERNAME, PRUID, PRNAME and the centroid lat/lon
+@lru_cache(maxsize=None)
+def load_regions(level='medium'):
+    return gpd.read_parquet(build_geometry()[level])
+
+# Region attributes and centroids without the boundaries, for the apps that only need the coordinates
+@lru_cache(maxsize=None)
+def load_region_table(level='medium'):
+    return pd.read_parquet(build_geometry()[level], columns=['ERUID', 'ERNAME', 'PRUID', 'PRNAME', 'lat', 'lon'])
+
+# Region boundaries of a resolution level as GeoJSON text, served as a file to the browser
+@lru_cache(maxsize=None)
+def regions_geojson_text(level='medium'):
+    return load_regions(level).to_json()
+
+# Region boundaries of a resolution level as a GeoJSON dict, for dash-leaflet and Plotly
+@lru_cache(maxsize=None)
+def regions_geojson(level='medium'):
+    return json.loads(regions_geojson_text(level))
+
+# Identifier of the boundaries, it changes whenever the shapefile changes
+def geometry_version():
+    return source_digest(shapefile_path)
+
+# Build the boundaries ahead of time, e.g. during a deploy
+if __name__ == '__main__':
+    for level, path in build_geometry().items():
+        print(f"{level}: {path}")
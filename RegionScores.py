@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+# Region x NOC matrix of ordinal outlook scores, built once per language.
+# scored_order is the start of the outlook scale (best first) that gets a score, from 0 for its worst
+# outlook to len(scored_order) - 1 for the best. The other outlooks (e.g. undetermined), missing or
+# unknown outlooks and missing region/NOC pairs are NaN, so aggregating any NOC selection is a
+# reduction over a few matrix columns.
+class RegionScores:
+    def __init__(self, df, regions, scored_order, good_count=2):
+        self.regions = regions[['ERUID', 'ERNAME']].reset_index(drop=True)
+        titles = df['NOC Title'].cat.categories
+        self.noc_ids = {title: noc_id for noc_id, title in enumerate(titles)}
+        self.max_score = len(scored_order) - 1
+        self.good_score = len(scored_order) - good_count
+
+        rows = pd.Index(self.regions['ERUID'].astype(int)).get_indexer(df['Economic Region Code'])
+        columns = df['NOC Title'].cat.codes.to_numpy()
+        codes = df['Outlook'].cat.codes.to_numpy()
+        scores = np.where((codes >= 0) & (codes < len(scored_order)), self.max_score - codes, -1)
+        valid = (rows >= 0) & (columns >= 0) & (scores >= 0)
+        self.matrix = np.full((len(self.regions), len(titles)), np.nan, dtype=np.float32)
+        self.matrix[rows[valid], columns[valid]] = scores[valid]
+
+    # Score of every region for the selected NOC Titles, between 0 and 1 or NaN when no NOC has a score there.
+    # 'share' is the share of NOCs with a good outlook, 'mean' the mean score scaled to 0-1.
+    def aggregate(self, selected_nocs, measure='share'):
+        noc_ids = [self.noc_ids[title] for title in selected_nocs if title in self.noc_ids]
+        selected = self.matrix[:, noc_ids]
+        counts = np.count_nonzero(~np.isnan(selected), axis=1)
+        if measure == 'share':
+            totals = np.count_nonzero(selected >= self.good_score, axis=1)
+        else:
+            totals = np.nansum(selected, axis=1) / max(self.max_score, 1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            scores = np.where(counts > 0, totals / counts, np.nan)
+        return self.regions.assign(score=scores, nocs=counts)
@@ -0,0 +1,169 @@
+import argparse
+import gzip
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html import escape
+
+import brotli
+import numpy as np
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs
+
+import app
+import JobOutlookApp
+from EmploymentTrends import row_keys
+from OutlookCore import data, indexes, outlook_store
+from OutlookData import data_version, file_paths
+from OutlookIndex import select_positions, select_rows
+from OutlookQuery import sort_positions
+
+# Pre-render the views of every NOC and every economic region to static files, so a CDN or any static
+# file server can serve the lookups without Python:
+#   python StaticExport.py --out build/static --workers 4 --html
+# For each language the output has index.json (the NOCs and regions with the path of their file),
+# noc/<NOC_Code>.json (the overview map and scatter plot and the table rows with their Employment
+# Trends) and region/<Economic Region Code>.json (the table rows of the region). Every file is also
+# written precompressed as .gz and .br for servers that serve precompressed files (gzip_static).
+# With --html each NOC also gets a standalone noc/<NOC_Code>.html page.
+
+# Default output directory
+default_out = "./build/static"
+
+# Brotli quality of the precompressed files, 10 is within a few percent of 11 at a quarter of the time
+default_brotli_quality = 10
+
+# Options of the rendering, set in every worker process by init_worker
+options = {}
+
+# Write a file with its gzip and brotli variants, return the sizes of the three
+def write_compressed(path, content):
+    gz = gzip.compress(content, compresslevel=9, mtime=0)
+    br = brotli.compress(content, quality=options.get('brotli_quality', default_brotli_quality))
+    for suffix, body in (('', content), ('.gz', gz), ('.br', br)):
+        with open(path + suffix, 'wb') as f:
+            f.write(body)
+    return np.array([len(content), len(gz), len(br)])
+
+# Table rows of the given positions sorted by outlook, with the visible columns of JobOutlookApp
+def table_rows(language, positions):
+    df = JobOutlookApp.data_frames[language]
+    positions = sort_positions(df, positions, JobOutlookApp.ranks[language], [])
+    rows = df.take(positions)
+    columns = [column for column in df.columns if column not in JobOutlookApp.hidden_columns]
+    return rows[columns].assign(row_key=row_keys(rows)).to_dict('records'), rows
+
+# Overview figures of one NOC and its table rows with the parsed Employment Trends
+def noc_view(language, title):
+    sorted_df, outlook_order, outlook_colors = data[language]
+    map_fig = app.build_map_figure(app.select_map_rows(language, [title]), outlook_order, outlook_colors)
+    scatter_fig = app.build_scatter_figure(select_rows(sorted_df, indexes[language], titles=[title]), outlook_order, outlook_colors)
+    records, _ = table_rows(language, select_positions(JobOutlookApp.indexes[language], titles=[title]))
+    trends = JobOutlookApp.trend_stores[language]
+    for record in records:
+        record['Employment Trends'] = trends.details(record['row_key'])['Employment Trends']
+    return {'title': title, 'map': map_fig, 'scatter': scatter_fig, 'rows': records}
+
+# Table rows of one economic region
+def region_view(language, code, name):
+    records, _ = table_rows(language, select_positions(JobOutlookApp.indexes[language], region=code))
+    return {'name': name, 'rows': records}
+
+# Standalone page of a NOC view, the plotly.js bundle is shared by every page of the export.
+# The titles, names and cell values are escaped, they can contain < or &.
+def noc_page(view, language):
+    header = ''.join(f"<th>{escape(str(column))}</th>" for column in view['rows'][0] if column not in ('row_key', 'Employment Trends')) if view['rows'] else ''
+    body = ''.join(
+        '<tr>' + ''.join(f"<td>{escape(str(value))}</td>" for column, value in row.items() if column not in ('row_key', 'Employment Trends')) + '</tr>'
+        for row in view['rows']
+    )
+    figures = ''.join(pio.to_html(view[kind], full_html=False, include_plotlyjs=False) for kind in ('map', 'scatter'))
+    title = escape(str(view['title']))
+    return (
+        f"<!DOCTYPE html><html lang=\"{language[:2].lower()}\"><head><meta charset=\"utf-8\"><title>{title}</title>"
+        f"<script src=\"../../plotly.min.js\"></script></head><body><h1>{title}</h1>{figures}"
+        f"<table><thead><tr>{header}</tr></thead><tbody>{body}</tbody></table></body></html>"
+    )
+
+def init_worker(worker_options):
+    options.update(worker_options)
+
+# Render and write one view, return the sizes of the files written
+def render_view(task):
+    language, kind, code, label = task
+    directory = os.path.join(options['out'], language, kind)
+    if kind == 'noc':
+        view = noc_view(language, label)
+    else:
+        view = region_view(language, code, label)
+    sizes = write_compressed(os.path.join(directory, f"{code}.json"), to_json_plotly(view).encode())
+    if kind == 'noc' and options['html']:
+        sizes += write_compressed(os.path.join(directory, f"{code}.html"), noc_page(view, language).encode())
+    return sizes
+
+# Every view of a language as (language, kind, code, title or name) and the index of the language
+def language_tasks(language):
+    JobOutlookApp.data_frames[language]
+    titles = outlook_store().labels(language, 'NOC Title').dropna()
+    regions = outlook_store().labels(language, 'Economic Region Name').dropna()
+    tasks = [(language, 'noc', code, title) for code, title in titles.items()]
+    tasks += [(language, 'region', code, name) for code, name in regions.items()]
+    index = {
+        'version': data_version(),
+        'nocs': [{'code': code, 'title': title, 'path': f"noc/{code}.json"} for code, title in titles.sort_values().items()],
+        'regions': [{'code': code, 'name': name, 'path': f"region/{code}.json"} for code, name in regions.sort_values().items()],
+    }
+    return tasks, index
+
+# Render every view into out with a pool of worker processes. The export is written next to out
+# and swapped in when it is complete, so a server never sees a partial export.
+def export(out=default_out, workers=None, html=False, languages=tuple(file_paths), brotli_quality=default_brotli_quality):
+    start = time.perf_counter()
+    worker_options = {'out': f"{out}.partial", 'html': html, 'brotli_quality': brotli_quality}
+    init_worker(worker_options)
+    partial = worker_options['out']
+    shutil.rmtree(partial, ignore_errors=True)
+
+    # Load the data before starting the workers, forked workers share it
+    tasks = []
+    sizes = np.zeros(3, dtype=np.int64)
+    for language in languages:
+        language_task_list, index = language_tasks(language)
+        tasks += language_task_list
+        for kind in ('noc', 'region'):
+            os.makedirs(os.path.join(partial, language, kind))
+        sizes += write_compressed(os.path.join(partial, language, 'index.json'), to_json_plotly(index).encode())
+    if html:
+        sizes += write_compressed(os.path.join(partial, 'plotly.min.js'), get_plotlyjs().encode())
+
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        sizes += sum(map(render_view, tasks))
+    else:
+        context = multiprocessing.get_context('fork') if 'fork' in multiprocessing.get_all_start_methods() else None
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=init_worker, initargs=(worker_options,)) as pool:
+            sizes += sum(pool.map(render_view, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+
+    # The previous export is moved aside before the new one takes its place and only removed after
+    shutil.rmtree(f"{out}.old", ignore_errors=True)
+    if os.path.exists(out):
+        os.replace(out, f"{out}.old")
+    os.replace(partial, out)
+    shutil.rmtree(f"{out}.old", ignore_errors=True)
+    return {'views': len(tasks), 'seconds': time.perf_counter() - start, 'workers': workers,
+            'raw': int(sizes[0]), 'gzip': int(sizes[1]), 'brotli': int(sizes[2])}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Pre-render every NOC and region view to static files")
+    parser.add_argument('--out', default=default_out)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes, the number of cores by default")
+    parser.add_argument('--html', action='store_true', help="also write a standalone HTML page per NOC")
+    parser.add_argument('--language', action='append', choices=list(file_paths), help="only export these languages")
+    parser.add_argument('--brotli-quality', type=int, default=default_brotli_quality, choices=range(12))
+    args = parser.parse_args()
+    result = export(args.out, args.workers, args.html, tuple(args.language or file_paths), args.brotli_quality)
+    print(f"{result['views']} views in {result['seconds']:.1f} s with {result['workers']} workers: "
+          f"{result['raw'] / 2**20:.1f} MB, {result['gzip'] / 2**20:.1f} MB gzip, {result['brotli'] / 2**20:.1f} MB brotli")
@@ -1,60 +1,50 @@
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, callback, Input, Output
 import plotly.express as px
-import pandas as pd
+from OutlookIndex import select_rows
+from OutlookCore import data, indexes, figure_cache
+from FigureCache import figure_key
+from CallbackMetrics import instrumented
+from BackgroundCallbacks import background_options
 
-# Load the Excel file
-file_paths = {
-    'English': "./data/20242026_outlook_n21_en_250117.xlsx",
-    'French': "./data/20242026_outlook_n21_fr_250117.xlsx"
-}
-
-# Open the English xlsx file
-english_df = pd.read_excel(file_paths['English'])
-
-# Define the custom order and color scale for the 'Outlook' column
-outlook_order = ['very good', 'good', 'moderate', 'limited', 'undetermined']
-outlook_colors = {
-    'very good': 'green',
-    'good': 'blue',
-    'moderate': 'yellow',
-    'limited': 'orange',
-    'undetermined': 'red'
-}
-
-# Sort the DataFrame based on the custom order
-english_df['Outlook'] = pd.Categorical(english_df['Outlook'], categories=outlook_order, ordered=True)
-sorted_df = english_df.sort_values(by=['NOC Title', 'Economic Region Name', 'Outlook'])
-
-# Initialize the Dash app
-app = dash.Dash(__name__)
-
-# App layout
-app.layout = html.Div([
-    dcc.Dropdown(
-        id='noc-dropdown',
-        options=[{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()],
-        value=[sorted_df['NOC Title'].iloc[0]],  # Default value
-        multi=True,  # Allow multiple selections
-        clearable=False
-    ),
-    dcc.Input(
-        id='region-search',
-        type='text',
-        placeholder='Search for a region...',
-        style={'margin-top': '10px', 'margin-bottom': '10px'}
-    ),
-    dcc.Graph(id='scatter-plot')
-])
+# Page layout, the NOC Title options come from the English data loaded on the first visit.
+def layout(**kwargs):
+    sorted_df = data['English'][0]
+    return html.Div([
+        dcc.Dropdown(
+            id='visualize-noc-dropdown',
+            options=[{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()],
+            value=[sorted_df['NOC Title'].iloc[0]],  # Default value
+            multi=True,  # Allow multiple selections
+            clearable=False
+        ),
+        dcc.Input(
+            id='visualize-region-search',
+            type='text',
+            placeholder='Search for a region...',
+            style={'margin-top': '10px', 'margin-bottom': '10px'}
+        ),
+        dcc.Graph(id='visualize-scatter-plot')
+    ])
 
 # Callback to update the scatter plot based on dropdown selection and search query
-@app.callback(
-    Output('scatter-plot', 'figure'),
-    [Input('noc-dropdown', 'value'),
-     Input('region-search', 'value')]
+@callback(
+    Output('visualize-scatter-plot', 'figure'),
+    [Input('visualize-noc-dropdown', 'value'),
+     Input('visualize-region-search', 'value')],
+    **background_options()
 )
+@instrumented
 def update_scatter(selected_nocs, search_query):
-    filtered_df = sorted_df[sorted_df['NOC Title'].isin(selected_nocs)]
+    return figure_cache.get_or_build(
+        figure_key('VisualizeOutlook.scatter', 'English', selected_nocs, search_query),
+        lambda: build_scatter(selected_nocs, search_query)
+    )
+
+# Build the scatter plot for the selected NOC Titles and region search query
+def build_scatter(selected_nocs, search_query):
+    sorted_df, outlook_order, outlook_colors = data['English']
+    filtered_df = select_rows(sorted_df, indexes['English'], titles=selected_nocs)
     
     if search_query:
         filtered_df = filtered_df[filtered_df['Economic Region Name'].str.contains(search_query, case=False, na=False)]
@@ -70,6 +60,8 @@ def update_scatter(selected_nocs, search_query):
     
     return fig
 
-# Run the app
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == '__main__':
-    app.run_server(debug=True)
\ No newline at end of file
+    app = dash.Dash(__name__)
+    app.layout = layout
+    app.run_server(debug=True)
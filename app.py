@@ -1,106 +1,48 @@
 import dash
-from dash import dcc, html, Input, Output, State
+import flask
+from dash import dcc, html, callback, clientside_callback, ClientsideFunction, Input, Output, State, Patch
 import plotly.express as px
-import pandas as pd
-import geopandas as gpd
+from OutlookData import DataRegistry
+from OutlookIndex import select_rows
+from OutlookCore import data, indexes, map_data, figure_cache, outlook_frames, outlook_store, outlook_orders, outlook_colors
+from FigureCache import figure_key
+from CallbackMetrics import instrumented, stage
+from BackgroundCallbacks import background_options
+from FigurePatch import outlook_figure, patch_selection, selection_counts, selection_points
+from RegionGeometry import geometry_version, load_region_table, regions_geojson_text, resolutions
+from RegionScores import RegionScores
 
-# Load the Excel files
-file_paths = {
-    'English': "./data/20242026_outlook_n21_en_250117.xlsx",
-    'French': "./data/20242026_outlook_n21_fr_250117.xlsx"
+# Region x NOC outlook scores for the choropleth mode, the last outlook (undetermined) has no score
+region_scores = DataRegistry(lambda language: RegionScores(data[language][0], load_region_table('medium'), data[language][1][:-1]))
+
+# URL of the region boundaries used by the choropleth, the browser downloads and caches them
+# once instead of receiving them inside every figure
+region_boundaries_url = f"/regions/medium.geojson?v={geometry_version()}"
+
+# Labels of the choropleth measures
+region_measures = {
+    'share': 'Share of NOCs with a good or very good outlook',
+    'mean': 'Mean outlook score (0 = worst, 1 = best)'
 }
 
-# Function to load and process data
-def load_data(language):
-    df = pd.read_excel(file_paths[language])
-    if language == 'English':
-        outlook_order = ['very good', 'good', 'moderate', 'limited', 'undetermined']
-        outlook_colors = {
-            'very good': 'green',
-            'good': 'blue',
-            'moderate': 'yellow',
-            'limited': 'orange',
-            'undetermined': 'red'
-        }
-    else:  # French
-        outlook_order = ['très bonnes', 'bonnes', 'modérées', 'limitées', 'indéterminées']
-        outlook_colors = {
-            'très bonnes': 'green',
-            'bonnes': 'blue',
-            'modérées': 'yellow',
-            'limitées': 'orange',
-            'indéterminées': 'red'
-        }
-    df['Outlook'] = pd.Categorical(df['Outlook'], categories=outlook_order, ordered=True)
-    sorted_df = df.sort_values(by=['NOC Title', 'Economic Region Name', 'Outlook'])
-    return sorted_df, outlook_order, outlook_colors
-
-# Load and process data for both languages at the start
-data = {
-    'English': load_data('English'),
-    'French': load_data('French')
+# Colors of the outlooks by position in the outlook order, switched in the browser
+color_schemes = {
+    'default': [outlook_colors['English'][outlook] for outlook in outlook_orders['English']],
+    'colorblind': ['#009E73', '#56B4E9', '#F0E442', '#E69F00', '#CC79A7', '#D55E00']  # Okabe-Ito
 }
 
-# Load the shapefile
-gdf = gpd.read_file("./data/ler_000b16a_e.shp")
-gdf = gdf.to_crs(epsg=4326)  # Ensure the coordinate reference system is WGS84
-gdf['geometry'] = gdf['geometry'].simplify(tolerance=0.01, preserve_topology=True)
-gdf['centroid'] = gdf.geometry.centroid
-
-# Initialize the Dash app
-app = dash.Dash(__name__)
-
-# App layout
-app.layout = html.Div([
-    html.H1("Career Outlook for Canadian Economic Regions 2024-2026", style={'textAlign': 'center'}),
-    dcc.Dropdown(
-        id='noc-dropdown',
-        multi=True,  # Allow multiple selections
-        clearable=False
-    ),
-    dcc.Graph(id='map-plot', style={"width": "100vw", "height": "65vh"}),
-    dcc.Graph(id='scatter-plot', style={"width": "100vw", "height": "25"}),  # Adjust the height of the scatter plot
-    html.Div([
-        dcc.Dropdown(
-            id='language-dropdown',
-            options=[
-                {'label': 'English', 'value': 'English'},
-                {'label': 'French', 'value': 'French'}
-            ],
-            value='English',  # Default value
-            clearable=False
-        ),
-        html.Button('Go to Job Outlook Table', id='job-outlook-button', n_clicks=0)
-    ], style={"position": "absolute", "top": "10px", "right": "10px", "width": "200px"})
-], style={"width": "100vw", "height": "100vh", "margin": "0", "padding": "0"})
-
-# Combined callback to update the dropdown options and plots based on language selection and NOC Titles
-@app.callback(
-    [Output('noc-dropdown', 'options'),
-     Output('noc-dropdown', 'value'),
-     Output('map-plot', 'figure'),
-     Output('scatter-plot', 'figure')],
-    [Input('language-dropdown', 'value'),
-     Input('noc-dropdown', 'value')]
-)
-def update_content(language, selected_nocs):
-    sorted_df, outlook_order, outlook_colors = data[language]
-    options = [{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()]
-    if not selected_nocs:
-        selected_nocs = [sorted_df['NOC Title'].iloc[0]]  # Default value
-    merged_df = gdf[['ERNAME', 'centroid']].merge(sorted_df, left_on='ERNAME', right_on='Economic Region Name')
-    merged_df['lat'] = merged_df['centroid'].apply(lambda point: point.y)
-    merged_df['lon'] = merged_df['centroid'].apply(lambda point: point.x)
-    filtered_df = merged_df[merged_df['NOC Title'].isin(selected_nocs)]
-    
-    map_fig = px.scatter_mapbox(
-        filtered_df, lat='lat', lon='lon', color='Outlook', size_max=15, zoom=3,
-        mapbox_style="carto-positron", center={"lat": 56.1304, "lon": -106.3468},
-        category_orders={'Outlook': outlook_order},
-        color_discrete_map=outlook_colors,
-        hover_name='Economic Region Name'
-    )
-    map_fig.update_layout(
+# Look up the rows of the joined table for the selected NOC Titles
+def select_map_rows(language, selected_nocs):
+    merged_df, merged_index = map_data[language]
+    return select_rows(merged_df, merged_index, titles=selected_nocs)
+
+# Map of the region centroids colored by outlook, one trace per outlook with the points grouped
+# by NOC Title in sorted order, the order of the figure cache key
+def build_map_figure(filtered_df, outlook_order, outlook_colors):
+    selected_nocs = sorted(set(filtered_df['NOC Title']))
+    return outlook_figure(
+        'map', selection_points(filtered_df, selected_nocs, outlook_order, 'map'), outlook_order, outlook_colors,
+        mapbox=dict(style="carto-positron", center={"lat": 56.1304, "lon": -106.3468}, zoom=3),
         autosize=True,
         margin={"r":0,"t":0,"l":0,"b":0},
         showlegend=True,  # Show legend for the map plot
@@ -112,17 +54,31 @@ def update_content(language, selected_nocs):
             x=0
         )
     )
-    
-    filtered_df = sorted_df[sorted_df['NOC Title'].isin(selected_nocs)]
-    scatter_fig = px.scatter(
-        filtered_df, x='Economic Region Name', y='NOC Title', color='Outlook',
-        category_orders={'Outlook': outlook_order},
-        color_discrete_map=outlook_colors,
-        title='Scatter Plot of Economic Regions vs NOC Titles',
-        labels={'Economic Region Name': 'Economic Region', 'NOC Title': 'NOC Title'},
-        opacity=0.7
+
+# Map of the economic regions filled by the aggregated outlook of the selected NOC Titles
+def build_choropleth_figure(language, selected_nocs, measure):
+    with stage('aggregate'):
+        scores = region_scores[language].aggregate(selected_nocs, measure)
+    map_fig = px.choropleth_mapbox(
+        scores, geojson=region_boundaries_url, locations='ERUID', featureidkey='properties.ERUID',
+        color='score', range_color=(0, 1), color_continuous_scale='RdYlGn', opacity=0.7,
+        zoom=3, mapbox_style="carto-positron", center={"lat": 56.1304, "lon": -106.3468},
+        hover_name='ERNAME', hover_data={'ERUID': False, 'score': ':.2f', 'nocs': True},
+        labels={'score': region_measures[measure], 'nocs': 'NOCs with an outlook'}
+    )
+    map_fig.update_layout(
+        autosize=True,
+        margin={"r":0,"t":0,"l":0,"b":0},
+        coloraxis_colorbar=dict(title='', orientation='h', yanchor='bottom', y=0, xanchor='left', x=0, len=0.5, thickness=15)
     )
-    scatter_fig.update_layout(
+    return map_fig
+
+# Scatter plot of the economic regions against the NOC Titles, laid out like the map
+def build_scatter_figure(filtered_df, outlook_order, outlook_colors):
+    selected_nocs = sorted(set(filtered_df['NOC Title']))
+    scatter_fig = outlook_figure(
+        'scatter', selection_points(filtered_df, selected_nocs, outlook_order, 'scatter'), outlook_order, outlook_colors,
+        title='Scatter Plot of Economic Regions vs NOC Titles',
         showlegend=True,  # Show legend for the scatter plot
         legend=dict(
             orientation="h",
@@ -131,12 +87,191 @@ def update_content(language, selected_nocs):
             xanchor="left",
             x=0
         ),
-        xaxis=dict(showgrid=True),
-        yaxis=dict(showgrid=True)
+        xaxis=dict(showgrid=True, title='Economic Region'),
+        yaxis=dict(showgrid=True, title='NOC Title')
     )
-    
-    return options, selected_nocs, map_fig, scatter_fig
+    scatter_fig.update_traces(opacity=0.7)
+    return scatter_fig
+
+# Builders and row lookups of the figures that are patched when the selection changes
+figure_builders = {'map': build_map_figure, 'scatter': build_scatter_figure}
+
+def selection_rows(language, kind):
+    if kind == 'map':
+        return lambda nocs: select_map_rows(language, nocs)
+    return lambda nocs: select_rows(data[language][0], indexes[language], titles=nocs)
+
+# Cached figure of the selected NOC Titles, with the selection it shows: the NOC Titles in the
+# order of their points and the number of points of each NOC Title in each outlook
+def outlook_figure_selection(kind, language, selected_nocs):
+    _, outlook_order, outlook_colors = data[language]
+    nocs = sorted(selected_nocs)
+    with stage('filter'):
+        rows = selection_rows(language, kind)(nocs)
+    with stage('build'):
+        figure = figure_cache.get_or_build(
+            figure_key(f'app.{kind}.points', language, nocs),
+            lambda: figure_builders[kind](rows, outlook_order, outlook_colors)
+        )
+    return figure, {'nocs': nocs, 'counts': selection_counts(rows, nocs, outlook_order)}
+
+# Serve the region boundaries for the choropleth, registered on the Flask server by OutlookApp.py
+def region_boundaries(level):
+    if level not in resolutions:
+        flask.abort(404)
+    response = flask.Response(regions_geojson_text(level), mimetype='application/geo+json')
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response
+
+# NOC Titles of a language in alphabetical order with the NOC code of each, so the browser can
+# find the title of a selected NOC in the other language
+def noc_options(language):
+    titles = list(outlook_frames[language]['NOC Title'].cat.categories)
+    store = outlook_store()
+    codes = dict(zip(store.labels(language, 'NOC Title'), store.rows['noc_codes'].tolist()))
+    return {'titles': titles, 'codes': [codes[title] for title in titles]}
+
+# Page layout. The NOC Titles of both languages and the outlook settings are sent once with the page,
+# so switching the language, filtering the outlooks and changing the colors run in the browser
+# (assets/outlook_clientside.js).
+def layout(**kwargs):
+    return html.Div([
+        dcc.Store(id='noc-options', data={language: noc_options(language) for language in outlook_orders}),
+        dcc.Store(id='outlook-settings', data={'orders': outlook_orders, 'schemes': color_schemes}),
+
+        # Figures built by the server for the selected NOC Titles, before the filter and colors are applied
+        dcc.Store(id='figure-store'),
+
+        # NOC Titles of the figures in figure-store in the order of their points, for the patches
+        dcc.Store(id='figure-selection'),
+
+        html.H1("Career Outlook for Canadian Economic Regions 2024-2026", style={'textAlign': 'center'}),
+        dcc.Dropdown(
+            id='noc-dropdown',
+            multi=True,  # Allow multiple selections
+            clearable=False
+        ),
+        dcc.Graph(id='map-plot', style={"width": "100vw", "height": "65vh"}),
+        dcc.Graph(id='scatter-plot', style={"width": "100vw", "height": "25"}),  # Adjust the height of the scatter plot
+        html.Div([
+            dcc.Dropdown(
+                id='language-dropdown',
+                options=[
+                    {'label': 'English', 'value': 'English'},
+                    {'label': 'French', 'value': 'French'}
+                ],
+                value='English',  # Default value
+                clearable=False
+            ),
+            dcc.Link(html.Button('Go to Job Outlook Table', id='job-outlook-button', n_clicks=0), href='/table'),
+
+            # Show one point per region and NOC, or fill the regions by the outlook of the selected NOCs
+            dcc.RadioItems(
+                id='map-mode',
+                options=[
+                    {'label': 'Points', 'value': 'points'},
+                    {'label': 'Regions', 'value': 'regions'}
+                ],
+                value='points',
+                inline=True
+            ),
+            dcc.Dropdown(
+                id='region-measure',
+                options=[{'label': label, 'value': measure} for measure, label in region_measures.items()],
+                value='share',
+                clearable=False
+            ),
+
+            # Outlooks shown on the plots, by position in the outlook order so the filter
+            # is kept when the language changes
+            dcc.Checklist(
+                id='outlook-filter',
+                value=list(range(len(outlook_orders['English'])))
+            ),
+            dcc.RadioItems(
+                id='color-scheme',
+                options=[
+                    {'label': 'Default colors', 'value': 'default'},
+                    {'label': 'Colorblind safe', 'value': 'colorblind'}
+                ],
+                value='default'
+            )
+        ], style={"position": "absolute", "top": "10px", "right": "10px", "width": "200px"})
+    ], style={"width": "100vw", "height": "100vh", "margin": "0", "padding": "0"})
+
+# Switch the NOC Title and outlook options to the selected language in the browser
+clientside_callback(
+    ClientsideFunction(namespace='outlook', function_name='switchLanguage'),
+    Output('noc-dropdown', 'options'),
+    Output('noc-dropdown', 'value'),
+    Output('outlook-filter', 'options'),
+    Input('language-dropdown', 'value'),
+    State('noc-options', 'data'),
+    State('outlook-settings', 'data'),
+    State('noc-dropdown', 'value')
+)
+
+# Build the plots of the selected NOC Titles on the server. The first plots of the page and of a
+# language are sent whole, after that adding or removing NOC Titles sends a Patch with only the
+# points that changed, based on the selection the browser holds in figure-selection.
+@callback(
+    Output('figure-store', 'data'),
+    Output('figure-selection', 'data'),
+    [Input('noc-dropdown', 'value'),
+     Input('map-mode', 'value'),
+     Input('region-measure', 'value')],
+    State('language-dropdown', 'value'),
+    State('figure-selection', 'data'),
+    # In a job process of its own with OUTLOOK_BACKGROUND=1, see BackgroundCallbacks.py
+    **background_options()
+)
+@instrumented
+def update_figures(selected_nocs, map_mode='points', region_measure='share', language='English', selection=None):
+    sorted_df, outlook_order, outlook_colors = data[language]
+    if not selected_nocs:
+        selected_nocs = [sorted_df['NOC Title'].iloc[0]]  # Default value
+    if not selection or selection['language'] != language:
+        selection = {'language': language, 'map': None, 'scatter': None}
+        figures = {'language': language}
+    else:
+        selection = dict(selection)
+        figures = Patch()
+
+    for kind in ('map', 'scatter'):
+        if kind == 'map' and map_mode == 'regions':
+            with stage('build'):
+                figures['map'] = figure_cache.get_or_build(
+                    figure_key(f'app.regions.{region_measure}', language, selected_nocs),
+                    lambda: build_choropleth_figure(language, selected_nocs, region_measure)
+                )
+            selection['map'] = None
+        elif selection[kind] is None:
+            figures[kind], selection[kind] = outlook_figure_selection(kind, language, selected_nocs)
+        else:
+            with stage('patch'):
+                nocs, counts = patch_selection(
+                    figures[kind], selection_rows(language, kind), outlook_order, kind,
+                    selection[kind]['nocs'], selection[kind]['counts'], selected_nocs
+                )
+            selection[kind] = {'nocs': nocs, 'counts': counts}
+
+    return figures, selection
+
+# Show the outlooks checked in the filter with the selected colors in the browser
+clientside_callback(
+    ClientsideFunction(namespace='outlook', function_name='renderFigures'),
+    Output('map-plot', 'figure'),
+    Output('scatter-plot', 'figure'),
+    Input('figure-store', 'data'),
+    Input('outlook-filter', 'value'),
+    Input('color-scheme', 'value'),
+    State('outlook-settings', 'data')
+)
 
-# Run the app
+# Run this page on its own, the full app is OutlookApp.py
 if __name__ == '__main__':
+    app = dash.Dash(__name__)
+    app.server.add_url_rule('/regions/<level>.geojson', view_func=region_boundaries)
+    app.layout = layout
     app.run_server(debug=True)
\ No newline at end of file
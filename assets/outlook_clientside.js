@@ -0,0 +1,58 @@
+// Clientside callbacks of the overview page (app.py), they run in the browser without a server round trip
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    outlook: {
+        // NOC Title and outlook options of a language. The selected NOCs are kept by NOC code with
+        // their titles in the language, the first NOC Title is selected when none is left.
+        switchLanguage: function(language, nocOptions, settings, selected) {
+            const titles = (nocOptions[language] || {}).titles || [];
+            const codeOf = {};
+            const titleOf = {};
+            Object.entries(nocOptions).forEach(([name, options]) => {
+                options.titles.forEach((title, i) => {
+                    codeOf[title] = options.codes[i];
+                    if (name === language) {
+                        titleOf[options.codes[i]] = title;
+                    }
+                });
+            });
+            const kept = [...new Set((selected || []).map(title => titleOf[codeOf[title]]).filter(Boolean))];
+            const outlooks = settings.orders[language].map((outlook, i) => ({label: outlook, value: i}));
+            return [
+                titles.map(title => ({label: title, value: title})),
+                kept.length ? kept : titles.slice(0, 1),
+                outlooks
+            ];
+        },
+
+        // Copy of the figures built by the server with the outlooks outside the filter hidden
+        // (still in the legend) and the outlook colors of the selected scheme
+        renderFigures: function(figures, shown, scheme, settings) {
+            if (!figures) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            const order = settings.orders[figures.language];
+            const colors = settings.schemes[scheme];
+            const visible = new Set(shown || []);
+
+            function render(figure) {
+                const data = figure.data.map(trace => {
+                    const position = order.indexOf(trace.name);
+                    if (position < 0) {
+                        return trace;
+                    }
+                    return Object.assign({}, trace, {
+                        visible: visible.has(position) ? true : 'legendonly',
+                        marker: Object.assign({}, trace.marker, {color: colors[position]})
+                    });
+                });
+                const layout = Object.assign({}, figure.layout);
+                if (layout.coloraxis && scheme === 'colorblind') {
+                    layout.coloraxis = Object.assign({}, layout.coloraxis, {colorscale: 'Cividis'});
+                }
+                return Object.assign({}, figure, {data: data, layout: layout});
+            }
+
+            return [render(figures.map), render(figures.scatter)];
+        }
+    }
+});
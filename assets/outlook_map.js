@@ -0,0 +1,21 @@
+// Styling functions for the dash-leaflet GeoJSON layers in OutlookPlot.py.
+// The layers reference them as {'variable': 'outlookMap.<name>'} and pass the outlook colors in hideout.
+window.outlookMap = Object.assign({}, window.outlookMap, {
+    // Shade each region with the color of its most common outlook
+    regionStyle: function(feature, context) {
+        const colors = context.hideout.colors;
+        return {
+            fillColor: colors[feature.properties.outlook] || 'grey',
+            fillOpacity: 0.2,
+            color: 'grey',
+            weight: 1
+        };
+    },
+    // Marker at the region centroid in the color of its most common outlook
+    regionMarker: function(feature, latlng, context) {
+        const color = context.hideout.colors[feature.properties.outlook] || 'grey';
+        return L.marker(latlng, {
+            icon: L.icon({iconUrl: `http://maps.google.com/mapfiles/ms/icons/${color}-dot.png`})
+        });
+    }
+});
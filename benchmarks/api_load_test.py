@@ -0,0 +1,115 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+import numpy as np
+
+from load_test import callback_payload
+
+# Throughput of the JSON API (OutlookApi.py) against the Dash callback of the table page for the
+# same queries, the rows of one NOC in one region, on a running OutlookApp, e.g. started with gunicorn:
+#   gunicorn &
+#   python benchmarks/api_load_test.py --url http://127.0.0.1:8050 --threads 8 --seconds 30
+# 'api' sends each query once, 'api revalidate' sends it with the ETag of an earlier response as a
+# client cache would, and 'dash table' searches the NOC Title in the region on the table page.
+
+
+# Table page callback showing the rows of a NOC Title in a region
+def table_payload(title, region):
+    return callback_payload(
+        ['datatable.data', 'datatable.columns', 'datatable.page_count', 'datatable.page_current',
+         'datatable.selected_rows', 'region-dropdown.options', 'region-dropdown.value'],
+        [('table-language-dropdown', 'value', 'English'), ('region-dropdown', 'value', region),
+         ('search-input', 'value', title), ('datatable', 'page_current', 0), ('datatable', 'sort_by', [])],
+        [('datatable', 'page_size', 25)]
+    )
+
+
+class Client:
+    def __init__(self, url, encoding):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+        self.headers = {'Accept-Encoding': encoding}
+        self.etags = {}
+
+    # Send a request and return the response and the size of its body as received
+    def send(self, method, path, body=None, headers=None):
+        self.connection.request(method, path, body, {**self.headers, **(headers or {})})
+        response = self.connection.getresponse()
+        body = response.read()
+        if response.status not in (200, 204, 304):
+            raise RuntimeError(f"HTTP {response.status}: {body[:200]!r}")
+        return response, len(body)
+
+    def api(self, noc, region, revalidate=False):
+        path = '/api/outlook?' + urlencode({'noc': noc, 'region': region, 'limit': 25})
+        etag = self.etags.get(path) if revalidate else None
+        response, size = self.send('GET', path, headers={'If-None-Match': etag} if etag else None)
+        self.etags[path] = response.getheader('ETag')
+        return size
+
+    def dash(self, title, region):
+        return self.send('POST', '/_dash-update-component', json.dumps(table_payload(title, region)),
+                         {'Content-Type': 'application/json'})[1]
+
+
+# NOC codes with their English titles and the region codes, from the API
+def fetch_codes(url):
+    connection = Client(url, 'identity').connection
+
+    def get(path):
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+
+    return get('/api/nocs'), [region['region'] for region in get('/api/regions')]
+
+
+def worker(url, encoding, scenario, queries, deadline, seed, results):
+    rng = np.random.default_rng(seed)
+    client = Client(url, encoding)
+    while time.perf_counter() < deadline:
+        noc, region = queries[rng.integers(len(queries))]
+        start = time.perf_counter()
+        if scenario == 'dash table':
+            size = client.dash(noc['name'], region)
+        else:
+            size = client.api(noc['noc'], region, revalidate=scenario == 'api revalidate')
+        results.append(((time.perf_counter() - start) * 1000, size))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=30, help="seconds of each scenario")
+    parser.add_argument('--encoding', default='br, gzip', help="Accept-Encoding header, e.g. 'identity' to compare")
+    parser.add_argument('--queries', type=int, default=50, help="distinct NOC and region pairs, each thread revalidates the ones it sent")
+    args = parser.parse_args()
+
+    nocs, regions = fetch_codes(args.url)
+    rng = np.random.default_rng(0)
+    queries = [(nocs[rng.integers(len(nocs))], regions[rng.integers(len(regions))]) for _ in range(args.queries)]
+
+    print(f"{args.threads} threads, {args.seconds:.0f} s per scenario, Accept-Encoding: {args.encoding}")
+    print(f"{'scenario':<16}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KB':>9}")
+    for scenario in ('api', 'api revalidate', 'dash table'):
+        results = []
+        start = time.perf_counter()
+        deadline = start + args.seconds
+        threads = [
+            threading.Thread(target=worker, args=(args.url, args.encoding, scenario, queries, deadline, seed, results))
+            for seed in range(args.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        latencies = np.array([row[0] for row in results])
+        sizes = np.array([row[1] for row in results])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{scenario:<16}{len(results):>10}{len(results) / elapsed:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{sizes.mean() / 1024:>9.1f}")
@@ -0,0 +1,121 @@
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from load_test import Client, fetch_titles, overview_request, table_request
+
+# Simulated users editing the NOC selection of the overview page, against a running OutlookApp started
+# with and without background callbacks (BackgroundCallbacks.py), e.g.
+#   OUTLOOK_PRELOAD=1 OUTLOOK_BACKGROUND=1 gunicorn &
+#   python benchmarks/background_load_test.py --url http://127.0.0.1:8050 --users 8 --seconds 60
+# Each user selects dozens of NOC Titles and edits the selection --edits times, --edit-gap ms apart,
+# as someone picking titles in the dropdown, then waits --think seconds. Like the browser, a user sends
+# every edit without waiting for the previous figures. Without background callbacks every edit is
+# built by the server and the stale responses are thrown away; with them each edit cancels the job of
+# the previous one and the user polls for the result of the last. Reported: the time from the last edit
+# of a burst to its figures, and the latency of a light user paging the table page meanwhile.
+
+
+# Send a callback request and return the decoded response
+def post(client, payload, query=''):
+    client.connection.request('POST', '/_dash-update-component' + query, json.dumps(payload), client.headers)
+    response = client.connection.getresponse()
+    body = response.read()
+    if response.status not in (200, 204):
+        raise RuntimeError(f"HTTP {response.status}: {body[:200]!r}")
+    return json.loads(body) if body else {}
+
+# Result of a background job, polled every interval seconds
+def poll(client, payload, job, interval):
+    while True:
+        body = post(client, payload, f"?cacheKey={job['cacheKey']}&job={job['job']}")
+        if 'response' in body:
+            return body
+        time.sleep(interval)
+
+# Overview request for a selection of NOC Titles, the full figures in points mode
+def edit_payload(titles, selection, rng):
+    payload = overview_request(titles, rng)
+    payload['inputs'][0]['value'] = selection
+    payload['inputs'][1]['value'] = 'points'
+    return payload
+
+def heavy_user(url, titles, background, args, deadline, seed, results):
+    rng = np.random.default_rng(seed)
+    clients = [Client(url, 'identity') for _ in range(args.edits)]
+    while time.perf_counter() < deadline:
+        # A dropdown never selects a title twice, each edit adds one not selected yet
+        picked = [str(title) for title in rng.choice(titles, size=args.nocs + args.edits, replace=False)]
+        payloads = [edit_payload(titles, picked[:args.nocs + i + 1], rng) for i in range(args.edits)]
+
+        if background:
+            # Each edit starts a job and cancels the one of the previous edit
+            job = None
+            for i, payload in enumerate(payloads):
+                if i:
+                    time.sleep(args.edit_gap / 1000)
+                last_sent = time.perf_counter()
+                job = post(clients[0], payload, f"?oldJob={job['job']}" if job else '')
+            poll(clients[0], payloads[-1], job, args.poll_interval / 1000)
+            results.append((time.perf_counter() - last_sent) * 1000)
+        else:
+            # Each edit holds a request until its figures are built
+            threads = []
+            for i, payload in enumerate(payloads):
+                if i:
+                    time.sleep(args.edit_gap / 1000)
+                last_sent = time.perf_counter()
+                threads.append(threading.Thread(target=post, args=(clients[i], payload)))
+                threads[-1].start()
+            threads[-1].join()
+            results.append((time.perf_counter() - last_sent) * 1000)
+            for thread in threads:
+                thread.join()
+        time.sleep(args.think)
+
+def light_user(url, titles, args, deadline, results):
+    rng = np.random.default_rng(1000)
+    client = Client(url, 'identity')
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        post(client, table_request(titles, rng))
+        results.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--users', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=60)
+    parser.add_argument('--nocs', type=int, default=30, help="NOC Titles selected before the edits")
+    parser.add_argument('--edits', type=int, default=4, help="edits of the selection in a burst")
+    parser.add_argument('--edit-gap', type=float, default=150, help="milliseconds between the edits of a burst")
+    parser.add_argument('--think', type=float, default=1.0, help="seconds between the bursts of a user")
+    parser.add_argument('--poll-interval', type=float, default=100, help="milliseconds between the polls of a job, as OUTLOOK_BACKGROUND_INTERVAL")
+    args = parser.parse_args()
+
+    titles = fetch_titles(args.url)
+    probe = post(Client(args.url, 'identity'), edit_payload(titles, titles[:2], np.random.default_rng(0)))
+    background = 'cacheKey' in probe
+
+    bursts, light = [], []
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    threads = [threading.Thread(target=heavy_user, args=(args.url, titles, background, args, deadline, seed, bursts)) for seed in range(args.users)]
+    threads.append(threading.Thread(target=light_user, args=(args.url, titles, args, deadline, light)))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"figures built {'in background jobs' if background else 'on the request threads'}, {args.users} users, {args.nocs}+ NOC Titles, {args.edits} edits {args.edit_gap:.0f} ms apart, {elapsed:.0f} s")
+    print(f"{'':<16}{'count':>8}{'per s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, rows in (('edit bursts', bursts), ('table requests', light)):
+        if rows:
+            p50, p95, p99 = np.percentile(rows, [50, 95, 99])
+            print(f"{name:<16}{len(rows):>8}{len(rows) / elapsed:>8.2f}{p50:>9.0f}{p95:>9.0f}{p99:>9.0f}")
@@ -0,0 +1,20 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+# Make the app modules importable when a benchmark is run as a script from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Call fn repeatedly and return the p50 and p99 latency in milliseconds
+def time_calls(fn, repeats=50, warmup=2):
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 99)
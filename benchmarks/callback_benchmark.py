@@ -0,0 +1,39 @@
+import geopandas as gpd
+
+from bench_utils import time_calls
+
+import app
+from FigureCache import FigureCache
+from RegionGeometry import load_region_table
+
+# Latency of the app.py figure callback (update_figures, update_content before) with the old per-request GeoDataFrame merge
+# and with the join precomputed at startup.
+# Run from the repository root: python benchmarks/callback_benchmark.py
+
+
+# update_content as it was before the join was precomputed
+def legacy_update_content(language, selected_nocs):
+    sorted_df, outlook_order, outlook_colors = app.data[language]
+    options = [{'label': title, 'value': title} for title in sorted_df['NOC Title'].unique()]
+    regions = load_region_table('medium')
+    gdf = regions.assign(centroid=gpd.points_from_xy(regions['lon'], regions['lat']))
+    merged_df = gdf[['ERNAME', 'centroid']].merge(sorted_df, left_on='ERNAME', right_on='Economic Region Name')
+    merged_df['lat'] = merged_df['centroid'].apply(lambda point: point.y)
+    merged_df['lon'] = merged_df['centroid'].apply(lambda point: point.x)
+    filtered_df = merged_df[merged_df['NOC Title'].isin(selected_nocs)]
+    map_fig = app.build_map_figure(filtered_df, outlook_order, outlook_colors)
+    filtered_df = sorted_df[sorted_df['NOC Title'].isin(selected_nocs)]
+    scatter_fig = app.build_scatter_figure(filtered_df, outlook_order, outlook_colors)
+    return options, selected_nocs, map_fig, scatter_fig
+
+
+if __name__ == '__main__':
+    # Measure the data path and figure construction, not the figure cache
+    app.figure_cache = FigureCache(maxsize=0, directory=None)
+    titles = list(app.data['English'][0]['NOC Title'].unique())
+    print(f"{'NOCs':>5}{'before p50':>12}{'before p99':>12}{'after p50':>12}{'after p99':>12}  (ms)")
+    for count in [1, 10, 50]:
+        selected = titles[:count]
+        before = time_calls(lambda: legacy_update_content('English', selected), repeats=30)
+        after = time_calls(lambda: app.update_figures(selected, language='English'), repeats=30)
+        print(f"{count:>5}{before[0]:>12.1f}{before[1]:>12.1f}{after[0]:>12.1f}{after[1]:>12.1f}")
@@ -0,0 +1,33 @@
+from plotly.io.json import to_json_plotly
+
+from bench_utils import time_calls
+
+import app
+
+# Map figure for 100+ selected NOC Titles in app.py: one scatter point per region and NOC
+# against the choropleth filled from the region x NOC score matrix.
+# Run from the repository root: python benchmarks/choropleth_benchmark.py
+
+
+def scatter_map(selected):
+    sorted_df, outlook_order, outlook_colors = app.data['English']
+    return app.build_map_figure(app.select_map_rows('English', selected), outlook_order, outlook_colors)
+
+
+def choropleth_map(selected):
+    return app.build_choropleth_figure('English', selected, 'share')
+
+
+if __name__ == '__main__':
+    titles = list(app.data['English'][0]['NOC Title'].unique())
+    scores = app.region_scores['English']
+    print(f"{'NOCs':>5}{'mode':>12}{'aggregate ms':>14}{'figure p50 ms':>15}{'figure p99 ms':>15}{'JSON KB':>9}{'points':>8}")
+    for count in [100, 250, len(titles)]:
+        selected = titles[:count]
+        aggregate_ms = time_calls(lambda: scores.aggregate(selected), repeats=50)[0]
+        for mode, build in [('scatter', scatter_map), ('choropleth', choropleth_map)]:
+            p50, p99 = time_calls(lambda: to_json_plotly(build(selected)), repeats=10)
+            figure = build(selected)
+            points = sum(len(trace.lat) if mode == 'scatter' else len(trace.locations) for trace in figure.data)
+            size = len(to_json_plotly(figure).encode()) / 1024
+            print(f"{count:>5}{mode:>12}{aggregate_ms if mode == 'choropleth' else float('nan'):>14.2f}{p50:>15.1f}{p99:>15.1f}{size:>9.0f}{points:>8}")
@@ -0,0 +1,29 @@
+import argparse
+import os
+import tempfile
+
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+import StaticExport
+
+# Build time and output size of the static export (StaticExport.py) with 1 to N worker processes.
+# The data is loaded once before the first build, so the times only cover the rendering.
+# Run from the repository root: python benchmarks/export_benchmark.py --workers 1 2 4
+
+
+if __name__ == '__main__':
+    cores = os.cpu_count()
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))))
+    parser.add_argument('--html', action='store_true')
+    args = parser.parse_args()
+
+    for language in StaticExport.file_paths:
+        StaticExport.language_tasks(language)
+
+    print(f"{cores} cores")
+    print(f"{'workers':>8}{'views':>7}{'seconds':>9}{'views/s':>9}{'raw MB':>8}{'gzip MB':>9}{'brotli MB':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in args.workers:
+            result = StaticExport.export(os.path.join(directory, 'static'), workers, args.html)
+            print(f"{workers:>8}{result['views']:>7}{result['seconds']:>9.1f}{result['views'] / result['seconds']:>9.1f}"
+                  f"{result['raw'] / 2**20:>8.1f}{result['gzip'] / 2**20:>9.1f}{result['brotli'] / 2**20:>11.1f}")
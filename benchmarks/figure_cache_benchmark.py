@@ -0,0 +1,58 @@
+import tempfile
+import time
+
+import numpy as np
+
+import bench_utils
+
+import app
+from FigureCache import FigureCache
+
+# Replay a Zipf-distributed stream of NOC selections through app.update_figures with
+# no figure cache, with the in-memory LRU cache, and with a second worker that starts
+# empty but shares the disk backend of the first one.
+# Run from the repository root: python benchmarks/figure_cache_benchmark.py
+
+
+# Selections of 1 to 3 NOC Titles, the title popularity follows a Zipf distribution
+def zipf_selections(titles, count, exponent=1.2, seed=0):
+    rng = np.random.default_rng(seed)
+    selections = []
+    for _ in range(count):
+        size = rng.integers(1, 4)
+        ranks = np.minimum(rng.zipf(exponent, size), len(titles)) - 1
+        selections.append(sorted({titles[rank] for rank in ranks}))
+    return selections
+
+
+def replay(cache, selections):
+    app.figure_cache = cache
+    timings = []
+    for selected in selections:
+        start = time.perf_counter()
+        app.update_figures(selected, language='English')
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings, cache):
+    stats = cache.stats()
+    print(f"{name:<22}{sum(timings) / 1000:>9.2f}{np.percentile(timings, 50):>9.1f}{np.percentile(timings, 99):>9.1f}{stats['hit_ratio']:>11.2f}")
+
+
+if __name__ == '__main__':
+    titles = list(app.data['English'][0]['NOC Title'].unique())
+    selections = zipf_selections(titles, 300)
+    print(f"{'cache':<22}{'total s':>9}{'p50 ms':>9}{'p99 ms':>9}{'hit ratio':>11}")
+
+    no_cache = FigureCache(maxsize=0, directory=None)
+    report('none', replay(no_cache, selections), no_cache)
+
+    memory = FigureCache(maxsize=128, directory=None)
+    report('memory LRU (128)', replay(memory, selections), memory)
+
+    with tempfile.TemporaryDirectory() as directory:
+        first_worker = FigureCache(maxsize=128, directory=directory)
+        replay(first_worker, selections)
+        second_worker = FigureCache(maxsize=128, directory=directory)
+        report('second worker, disk', replay(second_worker, selections), second_worker)
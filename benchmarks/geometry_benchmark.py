@@ -0,0 +1,48 @@
+import json
+import time
+
+import geopandas as gpd
+
+import bench_utils
+
+import RegionGeometry
+
+# GeoJSON size and load time of the economic region boundaries: the old startup path
+# (read the shapefile, reproject, simplify) against each preprocessed resolution level.
+# Run from the repository root: python benchmarks/geometry_benchmark.py
+
+
+def geojson_kb(gdf):
+    return len(json.dumps(json.loads(gdf.to_json())).encode()) / 1024
+
+
+# Read, reproject and simplify the shapefile the way every app did at startup
+def legacy_load(tolerance=0.01):
+    gdf = gpd.read_file(RegionGeometry.shapefile_path)
+    gdf = gdf.to_crs(epsg=4326)
+    if tolerance:
+        gdf['geometry'] = gdf['geometry'].simplify(tolerance=tolerance, preserve_topology=True)
+    gdf['centroid'] = gdf.geometry.centroid
+    return gdf.drop(columns='centroid')
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+if __name__ == '__main__':
+    _, build_ms = timed(RegionGeometry.build_geometry)
+    print(f"offline build: {build_ms:.0f} ms (0 when the files already exist)")
+    print(f"{'source':<24}{'load ms':>9}{'GeoJSON KB':>12}{'vertices':>10}")
+
+    for name, tolerance in [('shapefile, full', None), ('shapefile + simplify', 0.01)]:
+        gdf, load_ms = timed(lambda: legacy_load(tolerance))
+        vertices = gdf.geometry.count_coordinates().sum()
+        print(f"{name:<24}{load_ms:>9.0f}{geojson_kb(gdf):>12.0f}{vertices:>10}")
+
+    for level in RegionGeometry.resolutions:
+        gdf, load_ms = timed(lambda: gpd.read_parquet(RegionGeometry.geometry_path(level)))
+        vertices = gdf.geometry.count_coordinates().sum()
+        print(f"{'cache, ' + level:<24}{load_ms:>9.0f}{geojson_kb(gdf):>12.0f}{vertices:>10}")
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from bench_utils import time_calls
+
+from OutlookData import load_outlook
+from OutlookIndex import build_index, select_rows
+
+# Micro-benchmark of the boolean mask filters against the title/region index.
+# The frame is grown by repeating it with new NOC Titles while the selection stays the same,
+# so the mask cost grows with the frame and the index cost only with the selected rows.
+# Run from the repository root: python benchmarks/index_benchmark.py
+
+
+# Repeat the frame with distinct NOC Titles so every copy adds new titles
+def scaled_frame(df, copies):
+    parts = []
+    for copy in range(copies):
+        part = df.copy()
+        part['NOC Title'] = part['NOC Title'].astype(str) + ('' if copy == 0 else f' ({copy})')
+        parts.append(part)
+    scaled = pd.concat(parts, ignore_index=True)
+    scaled['NOC Title'] = scaled['NOC Title'].astype('category')
+    return scaled
+
+
+if __name__ == '__main__':
+    base = load_outlook('English')
+    titles = list(base['NOC Title'].cat.categories[:10])
+    region = base['Economic Region Code'].iloc[0]
+
+    print(f"{'rows':>9}{'selected':>10}{'isin p50':>10}{'index p50':>11}{'region+NOC mask':>17}{'region+NOC index':>18}  (ms)")
+    for copies in [1, 4, 16]:
+        df = scaled_frame(base, copies)
+        index = build_index(df)
+        selected = len(select_rows(df, index, titles=titles))
+        mask = time_calls(lambda: df[df['NOC Title'].isin(titles)], repeats=100)
+        indexed = time_calls(lambda: select_rows(df, index, titles=titles), repeats=100)
+        combined_mask = time_calls(lambda: df[df['NOC Title'].isin(titles) & (df['Economic Region Code'] == region)], repeats=100)
+        combined_index = time_calls(lambda: select_rows(df, index, titles=titles, region=region), repeats=100)
+        print(f"{len(df):>9}{selected:>10}{mask[0]:>10.3f}{indexed[0]:>11.3f}{combined_mask[0]:>17.3f}{combined_index[0]:>18.3f}")
@@ -0,0 +1,68 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+import synthetic_data
+from OutlookData import read_cache, read_workbook, write_cache
+from OutlookRelease import stream_workbook
+
+# Peak memory and time of converting a workbook to the columnar cache, with pd.read_excel as the
+# app does on its first start (OutlookData.build_cache) and streamed by openpyxl in read-only mode as
+# new releases are (OutlookRelease.stream_workbook), on synthetic workbooks of 1x and more the rows
+# of the real release. Each conversion runs in a fresh process, the peak is its maximum resident
+# size (VmHWM, Linux only) minus the size after the imports. ru_maxrss would keep the peak of the
+# parent, Linux carries it over exec.
+# Run from the repository root: python benchmarks/ingest_benchmark.py --scales 1 3
+
+def convert_excel(path, target):
+    write_cache(read_workbook(path), target)
+
+methods = {'pd.read_excel': convert_excel, 'stream_workbook': stream_workbook}
+
+# Peak resident size of this process in MB
+def peak_rss():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+def peak_memory(method, path, target, results):
+    before = peak_rss()
+    start = time.perf_counter()
+    methods[method](path, target)
+    seconds = time.perf_counter() - start
+    results.put((seconds, peak_rss() - before))
+
+def run(method, path, target):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=peak_memory, args=(method, path, target, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 3])
+    args = parser.parse_args()
+
+    print(f"{'scale':>6}{'rows':>9}{'MB xlsx':>9}  {'method':<17}{'seconds':>9}{'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in args.scales:
+            df = synthetic_data.outlook_frame('English', synthetic_data.base_nocs * scale)
+            path = os.path.join(directory, f"outlook-{scale}.xlsx")
+            df.to_excel(path, index=False)
+            targets = {}
+            for method in methods:
+                targets[method] = os.path.join(directory, f"outlook-{scale}-{method}.arrow")
+                seconds, peak = run(method, path, targets[method])
+                print(f"{scale:>6}{len(df):>9}{os.path.getsize(path) / 2**20:>9.1f}  {method:<17}{seconds:>9.1f}{peak:>9.0f}", flush=True)
+            # Both caches must hold the same frame
+            frames = [read_cache(target, 'English') for target in targets.values()]
+            pd.testing.assert_frame_equal(*frames)
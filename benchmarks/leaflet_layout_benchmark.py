@@ -0,0 +1,66 @@
+import json
+import time
+
+import dash_leaflet as dl
+import geopandas as gpd
+import plotly
+
+import bench_utils
+
+import OutlookPlot
+
+# Size and build time of the OutlookPlot.py leaflet layout with one dl.Marker per outlook row and
+# one dl.GeoJSON per region, against the two feature-collection layers styled in the browser.
+# The serialized layout is what the browser downloads and turns into React components before the
+# first render, so its size and component count stand in for time-to-first-render here.
+# Both layouts use the simplified boundaries, so the gain from simplifying is not counted.
+# Run from the repository root: python benchmarks/leaflet_layout_benchmark.py
+
+
+# The map layers as they were built before the feature-collection layers
+def legacy_build_layout():
+    gdf = OutlookPlot.gdf
+    region_coords = gdf[['ERNAME', 'geometry']].set_index('ERNAME').to_dict()['geometry']
+    markers = []
+    for _, row in OutlookPlot.filtered_data.iterrows():
+        region_name = row['Economic Region Name']
+        if region_name in region_coords:
+            coords = region_coords[region_name].centroid.coords[0]
+            markers.append(dl.Marker(position=[coords[1], coords[0]], children=dl.Tooltip(region_name), icon={
+                "iconUrl": f"http://maps.google.com/mapfiles/ms/icons/{OutlookPlot.outlook_colors[row['Outlook']]}-dot.png"
+            }))
+    shaded_regions = [
+        dl.GeoJSON(data=json.loads(gpd.GeoSeries([geometry]).to_json()), style={"fillColor": "grey", "fillOpacity": 0.2, "color": "grey", "weight": 1})
+        for geometry in region_coords.values()
+    ]
+    return dl.Map([
+        dl.TileLayer(),
+        dl.LayerGroup(markers),
+        dl.LayerGroup(shaded_regions),
+        dl.GeoJSON(data=json.loads(gdf.to_json()), style={"color": "grey", "weight": 2}),
+    ], zoom=5)
+
+
+# The current layout, without the per-level results cached at import time
+def feature_layers_layout():
+    OutlookPlot.outlook_properties.loaded.clear()
+    OutlookPlot.region_layers.loaded.clear()
+    return OutlookPlot.build_layout()
+
+
+def measure(build):
+    start = time.perf_counter()
+    layout = build()
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    payload = json.dumps(layout, cls=plotly.utils.PlotlyJSONEncoder)
+    serialize_ms = (time.perf_counter() - start) * 1000
+    components = 1 + sum(1 for _ in layout._traverse())
+    return build_ms, serialize_ms, len(payload.encode()), components
+
+
+if __name__ == '__main__':
+    print(f"{'layout':<18}{'build ms':>10}{'serialize ms':>14}{'layout KB':>11}{'components':>12}")
+    for name, build in [('before', legacy_build_layout), ('feature layers', feature_layers_layout)]:
+        build_ms, serialize_ms, size, components = measure(build)
+        print(f"{name:<18}{build_ms:>10.0f}{serialize_ms:>14.0f}{size / 1024:>11.0f}{components:>12}")
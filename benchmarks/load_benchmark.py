@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OutlookData import build_cache, file_paths, load_outlook, read_workbook
+
+# Startup benchmark: load every workbook from xlsx and from the columnar cache.
+# Each mode runs in a fresh interpreter so the resident memory numbers do not leak between runs.
+# Run from the repository root: python benchmarks/load_benchmark.py
+
+
+# Current and peak resident memory of this process in MB (Linux only)
+def memory_mb():
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values
+
+
+# Load all languages in the current process and report time and memory as JSON
+def measure(mode):
+    rss_before = memory_mb()['VmRSS']
+    start = time.perf_counter()
+    frames = {}
+    for language, path in file_paths.items():
+        frames[language] = read_workbook(path) if mode == 'xlsx' else load_outlook(language)
+    elapsed = time.perf_counter() - start
+    memory = memory_mb()
+    return {
+        'mode': mode,
+        'seconds': elapsed,
+        'peak_rss_mb': memory['VmHWM'],
+        'rss_growth_mb': memory['VmRSS'] - rss_before,
+        'frame_mb': sum(df.memory_usage(deep=True).sum() for df in frames.values()) / 2**20,
+    }
+
+
+def run_child(mode):
+    output = subprocess.run([sys.executable, __file__, '--child', mode], check=True, capture_output=True, text=True)
+    return json.loads(output.stdout)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        print(json.dumps(measure(sys.argv[2])))
+        sys.exit(0)
+
+    # Make sure the caches exist so the cache run measures a warm start
+    for language in file_paths:
+        build_cache(language)
+
+    repeats = 3
+    print(f"{'mode':<8}{'seconds':>10}{'peak RSS MB':>14}{'RSS growth MB':>16}{'frames MB':>12}")
+    for mode in ['xlsx', 'cache']:
+        runs = [run_child(mode) for _ in range(repeats)]
+        best = min(runs, key=lambda run: run['seconds'])
+        print(f"{mode:<8}{best['seconds']:>10.3f}{best['peak_rss_mb']:>14.1f}{best['rss_growth_mb']:>16.1f}{best['frame_mb']:>12.1f}")
@@ -0,0 +1,161 @@
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+# Load test of the main callbacks of a running OutlookApp, e.g. started with gunicorn:
+#   gunicorn &
+#   python benchmarks/load_test.py --url http://127.0.0.1:8050 --threads 8 --seconds 30
+# Each thread keeps one connection open and sends the callback requests a browser would send,
+# with the NOC Titles picked from a Zipf distribution so popular titles come back often.
+# Reports requests/sec, latency percentiles and the response size on the wire per callback.
+
+
+# Body of a Dash callback request
+def callback_payload(outputs, inputs, state=()):
+    specs = [dict(zip(('id', 'property'), output.split('.'))) for output in outputs]
+    return {
+        # A callback with a single output is sent without the list around it
+        'output': outputs[0] if len(outputs) == 1 else '..' + '...'.join(outputs) + '..',
+        'outputs': specs[0] if len(outputs) == 1 else specs,
+        'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in inputs],
+        'state': [{'id': id, 'property': prop, 'value': value} for id, prop, value in state],
+        'changedPropIds': [f'{inputs[0][0]}.{inputs[0][1]}'],
+    }
+
+
+# Overview page: map and scatter plot of the selected NOC Titles
+def overview_request(titles, rng):
+    selected = list(rng.choice(titles, size=rng.integers(1, 4), replace=False))
+    mode = 'regions' if rng.random() < 0.3 else 'points'
+    return callback_payload(
+        ['figure-store.data', 'figure-selection.data'],
+        [('noc-dropdown', 'value', selected), ('map-mode', 'value', mode), ('region-measure', 'value', 'share')],
+        [('language-dropdown', 'value', 'English'), ('figure-selection', 'data', None)]
+    )
+
+
+# Table page: one page of the DataTable for a search
+def table_request(titles, rng):
+    search = str(rng.choice(titles)).split()[0][:5] if rng.random() < 0.5 else None
+    return callback_payload(
+        ['datatable.data', 'datatable.columns', 'datatable.page_count', 'datatable.page_current',
+         'datatable.selected_rows', 'region-dropdown.options', 'region-dropdown.value'],
+        [('table-language-dropdown', 'value', 'English'), ('region-dropdown', 'value', 'All Regions'),
+         ('search-input', 'value', search), ('datatable', 'page_current', 0), ('datatable', 'sort_by', [])],
+        [('datatable', 'page_size', 25)]
+    )
+
+
+# Scatter page: scatter plot of the selected NOC Titles
+def scatter_request(titles, rng):
+    selected = list(rng.choice(titles, size=rng.integers(1, 4), replace=False))
+    return callback_payload(
+        ['visualize-scatter-plot.figure'],
+        [('visualize-noc-dropdown', 'value', selected), ('visualize-region-search', 'value', None)]
+    )
+
+
+scenarios = {
+    'overview': overview_request,
+    'table': table_request,
+    'scatter': scatter_request,
+}
+
+
+class Client:
+    def __init__(self, url, encoding):
+        parts = urlsplit(url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+        self.headers = {'Content-Type': 'application/json', 'Accept-Encoding': encoding}
+
+    # Send a callback request and return the size of the response body as received
+    def post(self, payload):
+        self.connection.request('POST', '/_dash-update-component', json.dumps(payload), self.headers)
+        response = self.connection.getresponse()
+        body = response.read()
+        if response.status not in (200, 204):
+            raise RuntimeError(f"HTTP {response.status}: {body[:200]!r}")
+        return len(body)
+
+
+# Find a component by id in a layout sent by Dash
+def find_component(node, id):
+    if isinstance(node, dict):
+        if node.get('props', {}).get('id') == id:
+            return node
+        children = node.get('props', {}).get('children')
+        return find_component(children, id) if children is not None else None
+    if isinstance(node, list):
+        for child in node:
+            found = find_component(child, id)
+            if found:
+                return found
+    return None
+
+
+# English NOC Titles sent with the overview page, most popular first in the Zipf draw
+def fetch_titles(url):
+    payload = callback_payload(
+        ['_pages_content.children', '_pages_store.data'],
+        [('_pages_location', 'pathname', '/'), ('_pages_location', 'search', '')]
+    )
+    client = Client(url, 'identity')
+    client.connection.request('POST', '/_dash-update-component', json.dumps(payload), client.headers)
+    response = json.loads(client.connection.getresponse().read())
+    store = find_component(response['response']['_pages_content']['children'], 'noc-options')
+    return store['props']['data']['English']['titles']
+
+
+def worker(url, encoding, titles, weights, deadline, seed, results):
+    rng = np.random.default_rng(seed)
+    client = Client(url, encoding)
+    names = list(scenarios)
+    while time.perf_counter() < deadline:
+        name = names[rng.integers(len(names))]
+        picked = rng.choice(len(titles), size=8, p=weights)
+        payload = scenarios[name]([titles[i] for i in picked], rng)
+        start = time.perf_counter()
+        size = client.post(payload)
+        results.append((name, (time.perf_counter() - start) * 1000, size))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8050')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--encoding', default='br, gzip', help="Accept-Encoding header, e.g. 'identity' to compare")
+    args = parser.parse_args()
+
+    titles = fetch_titles(args.url)
+    ranks = np.arange(1, len(titles) + 1)
+    weights = (1 / ranks) / (1 / ranks).sum()
+
+    results = []
+    start = time.perf_counter()
+    deadline = start + args.seconds
+    threads = [
+        threading.Thread(target=worker, args=(args.url, args.encoding, titles, weights, deadline, seed, results))
+        for seed in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.threads} threads, {elapsed:.1f} s, Accept-Encoding: {args.encoding}")
+    print(f"{'callback':<12}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'KB':>9}")
+    for name in list(scenarios) + ['all']:
+        rows = [row for row in results if name in ('all', row[0])]
+        if not rows:
+            continue
+        latencies = np.array([row[1] for row in rows])
+        sizes = np.array([row[2] for row in rows])
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        print(f"{name:<12}{len(rows):>10}{len(rows) / elapsed:>9.1f}{p50:>9.1f}{p95:>9.1f}{p99:>9.1f}{sizes.mean() / 1024:>9.1f}")
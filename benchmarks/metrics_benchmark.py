@@ -0,0 +1,33 @@
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+from bench_utils import time_calls
+
+import CallbackMetrics
+import app
+import JobOutlookApp
+from OutlookCore import data
+
+# Overhead of the callback instrumentation (CallbackMetrics.py): each callback called directly as
+# the plain function, wrapped with the metrics off (the default) and wrapped with the metrics on.
+# The cheapest callback shows the fixed cost of the wrapper, the figure callback a typical one.
+# Run from the repository root: python benchmarks/metrics_benchmark.py
+
+
+if __name__ == '__main__':
+    titles = list(data['English'][0]['NOC Title'].cat.categories[:3])
+    row = {'row_key': 0}
+    cases = [
+        ('update_selected_row_data', JobOutlookApp.update_selected_row_data, ([0], [row]), 5000),
+        ('update_figures (cached)', app.update_figures, (titles,), 200),
+    ]
+
+    # The three variants are timed in turns so a slower period of the machine affects them alike
+    print(f"{'callback':<28}{'plain us':>10}{'off us':>9}{'on us':>9}{'off +us':>9}{'on +us':>8}")
+    for name, callback, args, repeats in cases:
+        plain = callback.__wrapped__
+        timings = {'plain': [], 'off': [], 'on': []}
+        for _ in range(5):
+            for variant, fn, flag in (('plain', plain, False), ('off', callback, False), ('on', callback, True)):
+                CallbackMetrics.enabled = flag
+                timings[variant].append(time_calls(lambda: fn(*args), repeats=repeats, warmup=20)[0] * 1000)
+        before, off, on = (min(timings[variant]) for variant in ('plain', 'off', 'on'))
+        print(f"{name:<28}{before:>10.2f}{off:>9.2f}{on:>9.2f}{off - before:>9.2f}{on - before:>8.2f}")
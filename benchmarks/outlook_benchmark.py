@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from bench_utils import time_calls
+
+from OutlookCore import outlook_frames, outlook_orders
+from OutlookQuery import outlook_ranks, sort_positions
+
+# Sorting and filtering by outlook with the outlooks as text, where each callback built its own
+# pd.Categorical, against the int8 outlook codes assigned once at load time (OutlookCategories.py).
+# Run from the repository root: python benchmarks/outlook_benchmark.py
+
+
+# The outlook column as it was loaded before the outlook codes, a categorical in workbook order
+def legacy_frame(language):
+    df = outlook_frames[language]
+    return df.assign(Outlook=pd.Categorical(df['Outlook'].astype(object)))
+
+
+def legacy_sort(df, outlook_order):
+    df = df.copy()
+    df['Outlook'] = pd.Categorical(df['Outlook'], categories=outlook_order, ordered=True)
+    return df.sort_values('Outlook')
+
+
+def coded_sort(df, ranks):
+    return df.take(sort_positions(df, np.arange(len(df)), ranks, []))
+
+
+def legacy_filter(df, outlooks):
+    return df[df['Outlook'].isin(outlooks)]
+
+
+def coded_filter(df, best_code):
+    return df[df['Outlook'].cat.codes.to_numpy() <= best_code]
+
+
+if __name__ == '__main__':
+    print(f"{'language':<10}{'case':<30}{'before ms':>11}{'after ms':>10}")
+    for language, order in outlook_orders.items():
+        coded = outlook_frames[language]
+        legacy = legacy_frame(language)
+        ranks = outlook_ranks(coded)
+        cases = [
+            ('sort the table by outlook', lambda: legacy_sort(legacy, order), lambda: coded_sort(coded, ranks)),
+            ('sort the plot data', lambda: legacy_sort(legacy, order).sort_values(['NOC Title', 'Economic Region Name', 'Outlook']),
+             lambda: coded.sort_values(['NOC Title', 'Economic Region Name', 'Outlook'])),
+            ('keep good or very good', lambda: legacy_filter(legacy, order[:2]), lambda: coded_filter(coded, 1)),
+        ]
+        for name, before, after in cases:
+            print(f"{language:<10}{name:<30}{time_calls(before, repeats=20)[0]:>11.2f}{time_calls(after, repeats=20)[0]:>10.2f}")
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Startup time and memory of the six views run as separate scripts, one process each, against
+# OutlookApp serving all of them as pages of one process. Every process loads the data its
+# views use, as on their first requests, for English only and for both languages.
+# Run from the repository root: python benchmarks/pages_benchmark.py
+
+views = ['app', 'JobOutlookApp', 'MapPlot', 'VisualizeOutlook', 'OutlookPlot', 'JobOutlookAppWITHGraph']
+
+
+# Current and peak resident memory of this process in MB (Linux only)
+def memory_mb():
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values
+
+
+# Start one view on its own like its __main__ block does, or every view through OutlookApp,
+# load the data and report the memory as JSON
+def measure(module, languages):
+    import importlib
+    import dash
+    from OutlookData import preload_all
+
+    view = importlib.import_module(module)
+    if module != 'OutlookApp':
+        app = dash.Dash(module)
+        app.layout = view.layout
+    preload_all(languages)
+    memory = memory_mb()
+    return {'rss_mb': memory['VmRSS'], 'peak_rss_mb': memory['VmHWM']}
+
+
+# Run a module in a fresh interpreter, the time includes the interpreter and library imports
+def run_child(module, languages):
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-W', 'ignore', __file__, '--child', module, ','.join(languages)],
+                            check=True, capture_output=True, text=True)
+    run = json.loads(output.stdout.splitlines()[-1])
+    run['seconds'] = time.perf_counter() - start
+    return run
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        print(json.dumps(measure(sys.argv[2], sys.argv[3].split(','))))
+        sys.exit(0)
+
+    # Make sure the caches exist so every run measures a warm start
+    from OutlookData import build_cache, file_paths
+    from RegionGeometry import build_geometry
+    for language in file_paths:
+        build_cache(language)
+    build_geometry()
+
+    print(f"{'setup':<24}{'languages':<18}{'processes':>10}{'startup s':>11}{'total RSS MB':>14}{'peak RSS MB':>13}")
+    for languages in [['English'], list(file_paths)]:
+        separate = [run_child(module, languages) for module in views]
+        unified = run_child('OutlookApp', languages)
+        for name, runs in [('separate scripts', separate), ('OutlookApp', [unified])]:
+            print(f"{name:<24}{'+'.join(languages):<18}{len(runs):>10}{sum(run['seconds'] for run in runs):>11.2f}"
+                  f"{sum(run['rss_mb'] for run in runs):>14.1f}{sum(run['peak_rss_mb'] for run in runs):>13.1f}")
@@ -0,0 +1,83 @@
+import time
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+import app
+from FigureCache import FigureCache
+
+# Bytes sent and callback time of the overview figure callback (app.update_figures) when a
+# selection grows from 1 to 50 NOC Titles one at a time: the whole figures every time, as before,
+# against a Patch with the added points. The patched figures are checked against the whole ones.
+# Run from the repository root: python benchmarks/patch_benchmark.py
+
+
+# Apply the operations of a Patch to a figure dict, as the Dash renderer does in the browser
+def apply_patch(target, patch):
+    for operation in patch.to_plotly_json()['operations']:
+        *path, last = operation['location']
+        node = target
+        for key in path:
+            node = node[key]
+        if operation['operation'] == 'Assign':
+            node[last] = operation['params']['value']
+        elif operation['operation'] == 'Extend':
+            node[last] = list(node.get(last) or []) + list(operation['params']['value'])
+        elif operation['operation'] == 'Delete':
+            del node[last]
+        else:
+            raise ValueError(operation['operation'])
+
+
+# Points of each trace of a figure, to compare a patched figure with a whole one
+def figure_points(figure):
+    return [sorted(zip(*(trace.get(prop) or [] for prop in ('lat', 'lon', 'hovertext', 'x', 'y'))), key=str)
+            for trace in figure['data']]
+
+
+def grow(titles, patched):
+    selection = None
+    store = None
+    sizes, timings = [], []
+    for count in range(1, len(titles) + 1):
+        start = time.perf_counter()
+        figures, new_selection = app.update_figures(titles[:count], language='English', selection=selection)
+        timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(to_json_plotly(figures).encode()))
+        if isinstance(figures, dict):
+            store = figures
+        else:
+            apply_patch(store, figures)
+        if patched:
+            selection = new_selection
+    return store, selection, sizes, timings
+
+
+if __name__ == '__main__':
+    # Measure the callback work, not the figure cache
+    app.figure_cache = FigureCache(maxsize=0, directory=None)
+    titles = list(app.data['English'][0]['NOC Title'].cat.categories)[:50]
+
+    whole, _, whole_sizes, whole_timings = grow(titles, patched=False)
+    patched, selection, patch_sizes, patch_timings = grow(titles, patched=True)
+    for kind in ('map', 'scatter'):
+        assert figure_points(patched[kind]) == figure_points(whole[kind]), kind
+
+    # Removing NOC Titles from the middle of the selection
+    remaining = titles[::2]
+    figures, _ = app.update_figures(remaining, language='English', selection=selection)
+    apply_patch(patched, figures)
+    reference, _ = app.update_figures(remaining, language='English')
+    for kind in ('map', 'scatter'):
+        assert figure_points(patched[kind]) == figure_points(reference[kind]), kind
+    removal_size = len(to_json_plotly(figures).encode())
+
+    print(f"{'NOCs':>5}{'whole KB':>10}{'patch KB':>10}{'whole ms':>10}{'patch ms':>10}")
+    for count in (1, 2, 5, 10, 20, 30, 40, 50):
+        i = count - 1
+        print(f"{count:>5}{whole_sizes[i] / 1024:>10.1f}{patch_sizes[i] / 1024:>10.1f}{whole_timings[i]:>10.1f}{patch_timings[i]:>10.1f}")
+    print(f"{'total':>5}{sum(whole_sizes) / 1024:>10.0f}{sum(patch_sizes) / 1024:>10.0f}"
+          f"{sum(whole_timings):>10.0f}{sum(patch_timings):>10.0f}")
+    print(f"median ms per step: whole {np.median(whole_timings):.1f}, patch {np.median(patch_timings):.1f}")
+    print(f"removing {len(titles) - len(remaining)} of {len(titles)} NOC Titles: {removal_size / 1024:.1f} KB")
@@ -0,0 +1,57 @@
+import time
+
+from bench_utils import time_calls
+
+from OutlookData import load_outlook
+from OutlookIndex import build_index, select_rows
+from NocSearch import TitleSearch
+
+# Replay typed queries one keystroke at a time through the old str.contains filter
+# and through the trigram search engine.
+# Run from the repository root: python benchmarks/search_benchmark.py
+
+typed_queries = {
+    'English': ['teachers', 'engineer', 'managers in', 'technician'],
+    'French': ['enseignants', 'ingenieur', 'gestionnaires', 'infirmieres'],
+}
+
+
+# Every prefix of a query, as the search box sends them while typing
+def keystrokes(query):
+    return [query[:end] for end in range(1, len(query) + 1)]
+
+
+def replay_contains(df, queries):
+    for query in queries:
+        for prefix in keystrokes(query):
+            df[df['NOC Title'].str.contains(prefix, case=False, na=False)]
+
+
+def replay_search(df, index, search, queries):
+    search.cache.clear()
+    for query in queries:
+        for prefix in keystrokes(query):
+            select_rows(df, index, titles=search.matching_titles(prefix))
+
+
+# Only the title matching, without taking the rows
+def replay_titles(search, queries):
+    search.cache.clear()
+    for query in queries:
+        for prefix in keystrokes(query):
+            search.matching_titles(prefix)
+
+
+if __name__ == '__main__':
+    print(f"{'language':<10}{'keystrokes':>11}{'str.contains p50':>18}{'search p50':>12}{'titles only p50':>17}{'build ms':>10}  (ms per sequence)")
+    for language, queries in typed_queries.items():
+        df = load_outlook(language)
+        index = build_index(df)
+        start = time.perf_counter()
+        search = TitleSearch(df['NOC Title'].cat.categories)
+        build_ms = (time.perf_counter() - start) * 1000
+        count = sum(len(query) for query in queries)
+        before = time_calls(lambda: replay_contains(df, queries), repeats=10)
+        after = time_calls(lambda: replay_search(df, index, search, queries), repeats=10)
+        titles_only = time_calls(lambda: replay_titles(search, queries), repeats=10)
+        print(f"{language:<10}{count:>11}{before[0]:>18.1f}{after[0]:>12.1f}{titles_only[0]:>17.2f}{build_ms:>10.1f}")
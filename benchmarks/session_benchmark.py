@@ -0,0 +1,84 @@
+import dash
+
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+import app  # noqa: F401, registers the callbacks of the overview page
+
+# Server callbacks fired by a recorded session on the overview page (app.py), with every control
+# handled by one server callback as before, and with the language switch, outlook filter and
+# colors handled by clientside callbacks. Follows the Dash renderer: a change fires every callback
+# that has the property as an input, and the outputs of those callbacks fire the next ones.
+# Run from the repository root: python benchmarks/session_benchmark.py
+
+# The recorded session: the property each interaction changes, None for the page load
+session = [
+    ('open the page', None),
+    ('add a NOC Title', 'noc-dropdown.value'),
+    ('add a NOC Title', 'noc-dropdown.value'),
+    ('hide limited', 'outlook-filter.value'),
+    ('hide undetermined', 'outlook-filter.value'),
+    ('colorblind colors', 'color-scheme.value'),
+    ('regions mode', 'map-mode.value'),
+    ('mean score', 'region-measure.value'),
+    ('points mode', 'map-mode.value'),
+    ('switch to French', 'language-dropdown.value'),
+    ('show all outlooks', 'outlook-filter.value'),
+    ('default colors', 'color-scheme.value'),
+    ('switch to English', 'language-dropdown.value'),
+    ('remove a NOC Title', 'noc-dropdown.value'),
+]
+
+# Callbacks of the page before the clientside callbacks: update_content did everything
+legacy_callbacks = [{
+    'inputs': {'language-dropdown.value', 'noc-dropdown.value', 'map-mode.value', 'region-measure.value',
+               'outlook-filter.value', 'color-scheme.value'},
+    'outputs': {'noc-dropdown.options', 'noc-dropdown.value', 'map-plot.figure', 'scatter-plot.figure'},
+    'clientside': False,
+    'initial': True,
+}]
+
+
+# Inputs, outputs and kind of the callbacks registered by app.py
+def current_callbacks():
+    callbacks = []
+    for callback in dash._callback.GLOBAL_CALLBACK_LIST:
+        output = callback['output'].strip('.')
+        callbacks.append({
+            'inputs': {f"{item['id']}.{item['property']}" for item in callback['inputs']},
+            'outputs': set(output.split('...')),
+            'clientside': callback['clientside_function'] is not None,
+            'initial': not callback['prevent_initial_call'],
+        })
+    return callbacks
+
+
+# Number of server and clientside callbacks fired by a change, or by the page load
+def fire(callbacks, changed):
+    if changed is None:
+        fired = [callback for callback in callbacks if callback['initial']]
+        changed = set().union(*(callback['outputs'] for callback in fired))
+    else:
+        fired, changed = [], {changed}
+    while True:
+        triggered = [callback for callback in callbacks
+                     if callback not in fired and callback['inputs'] & changed]
+        if not triggered:
+            break
+        for callback in triggered:
+            fired.append(callback)
+            changed |= callback['outputs']
+    server = sum(not callback['clientside'] for callback in fired)
+    return server, len(fired) - server
+
+
+if __name__ == '__main__':
+    callbacks = {'before': legacy_callbacks, 'after': current_callbacks()}
+    totals = {name: [0, 0] for name in callbacks}
+    print(f"{'interaction':<22}{'server before':>15}{'server after':>14}{'clientside after':>18}")
+    for interaction, changed in session:
+        counts = {}
+        for name, graph in callbacks.items():
+            counts[name] = fire(graph, changed)
+            totals[name][0] += counts[name][0]
+            totals[name][1] += counts[name][1]
+        print(f"{interaction:<22}{counts['before'][0]:>15}{counts['after'][0]:>14}{counts['after'][1]:>18}")
+    print(f"{'session':<22}{totals['before'][0]:>15}{totals['after'][0]:>14}{totals['after'][1]:>18}")
@@ -0,0 +1,119 @@
+import json
+import subprocess
+import sys
+
+from bench_utils import time_calls
+
+# Memory of the English and French outlook data loaded as two independent frames, as before,
+# against the store shared by the languages (OutlookStore.py), each measured in a fresh process:
+# the bytes of the column buffers, counted once when the frames share them, on the heap or in the
+# memory-mapped cache, and the growth of the resident memory of the process. The resident memory
+# also counts the pandas code run for the first time and the temporary arrays of the load.
+# Then the time to show the table page of the selected region after a language switch: filtering
+# the new language by the translated region name, as before, against relabeling the same positions.
+# Run from the repository root: python benchmarks/store_benchmark.py
+
+
+# Resident anonymous and file-backed memory of this process in KB
+def rss():
+    with open('/proc/self/status') as f:
+        fields = dict(line.split(':', 1) for line in f)
+    return {name: int(fields[name].split()[0]) for name in ('RssAnon', 'RssFile')}
+
+
+# Address ranges of the memory-mapped cache files
+def mapped_ranges():
+    ranges = []
+    with open('/proc/self/maps') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 6 and parts[5].endswith('.arrow'):
+                ranges.append(tuple(int(address, 16) for address in parts[0].split('-')))
+    return ranges
+
+
+# Address and size of the buffers holding the values of a column
+def column_buffers(series):
+    values = series.array
+    if hasattr(values, 'codes'):
+        arrays = [values.codes]
+    elif hasattr(values, '__arrow_array__'):
+        chunks = values.__arrow_array__().chunks
+        return [(buffer.address, buffer.size) for chunk in chunks for buffer in chunk.buffers() if buffer is not None]
+    else:
+        arrays = [series.to_numpy()]
+    return [(array.__array_interface__['data'][0], array.nbytes) for array in arrays]
+
+
+# Bytes of the column buffers of the frames, each buffer counted once, on the heap and in the mapped files
+def buffer_bytes(frames):
+    ranges = mapped_ranges()
+    buffers = {}
+    for df in frames:
+        for column in df.columns:
+            for address, size in column_buffers(df[column]):
+                buffers[address] = size
+    mapped = sum(size for address, size in buffers.items() if any(start <= address < end for start, end in ranges))
+    return sum(buffers.values()) - mapped, mapped
+
+
+# Load both languages in this process and print the memory they hold
+def measure(mode):
+    from OutlookData import load_outlook
+    from OutlookCore import outlook_frames
+
+    before = rss()
+    if mode == 'frames':
+        frames = [load_outlook(language) for language in ('English', 'French')]
+    else:
+        frames = [outlook_frames[language] for language in ('English', 'French')]
+    after = rss()
+    heap, mapped = buffer_bytes(frames)
+    print(json.dumps({
+        'heap': heap / 1024,
+        'mapped': mapped / 1024,
+        'anon': after['RssAnon'] - before['RssAnon'],
+        'file': after['RssFile'] - before['RssFile'],
+    }))
+
+
+def switch_latency():
+    import numpy as np
+    from OutlookCore import outlook_frames
+    from OutlookIndex import select_positions
+    import JobOutlookApp
+
+    english, french = outlook_frames['English'], outlook_frames['French']
+    region = english['Economic Region Name'].iloc[0]
+    ranks = JobOutlookApp.ranks['French']
+
+    # Before: the selected region is an English name, find the French name of the same region and filter by it
+    def refilter():
+        code = english.loc[english['Economic Region Name'] == region, 'Economic Region Code'].iloc[0]
+        name = french.loc[french['Economic Region Code'] == code, 'Economic Region Name'].iloc[0]
+        rows = french[french['Economic Region Name'] == name]
+        return rows.iloc[np.argsort(ranks[rows.index.to_numpy()], kind='stable')[:25]]
+
+    # After: the region is selected by code and the rows are at the same positions in both languages
+    code = english.loc[english['Economic Region Name'] == region, 'Economic Region Code'].iloc[0]
+    positions = select_positions(JobOutlookApp.indexes['English'], region=code)
+
+    def relabel():
+        return french.take(positions[np.argsort(ranks[positions], kind='stable')[:25]])
+
+    return time_calls(refilter, repeats=100), time_calls(relabel, repeats=100)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        measure(sys.argv[1])
+        sys.exit()
+
+    print(f"{'both languages':<22}{'heap KB':>10}{'mapped KB':>11}{'RssAnon KB':>12}{'RssFile KB':>12}")
+    for mode, name in (('frames', 'two frames (before)'), ('store', 'shared store')):
+        output = subprocess.run([sys.executable, '-W', 'ignore', __file__, mode], capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f"{name:<22}{result['heap']:>10.0f}{result['mapped']:>11.0f}{result['anon']:>12}{result['file']:>12}")
+
+    (before, _), (after, _) = switch_latency()
+    print(f"language switch, region page: refilter {before:.2f} ms, relabel {after:.2f} ms (p50)")
@@ -0,0 +1,215 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.express as px
+
+import bench_utils
+import synthetic_data
+
+from FigurePatch import outlook_figure, selection_points
+from NocSearch import TitleSearch
+from OutlookCategories import outlook_orders
+from OutlookData import read_cache, write_cache
+from OutlookIndex import build_index, select_rows
+from OutlookQuery import outlook_ranks, query_page
+from RegionGeometry import resolutions, simplify_boundaries
+
+# Benchmark suite of the load, filter, figure and serialization paths on synthetic data
+# (synthetic_data.py) at several data scales, offline, without the real workbooks and shapefile.
+# Scale n has n times the NOCs of the real release and n times the vertices per region boundary.
+# Each stage is run until it used about --budget seconds, the p50 and p99 are saved as JSON with
+# the commit, so two commits can be compared:
+#   python benchmarks/suite.py --scales 1 10 100
+#   python benchmarks/suite.py --compare benchmarks/results/<older commit>.json
+# Excel sheets stop at 1,048,576 rows, so pd.read_excel and sending every row of the table as the
+# apps did with the workbooks are only timed at the scales that fit.
+
+# The data registries of OutlookCore.py and the pages load the workbooks of the release on the first
+# request for a language, so the suite calls the functions of the data paths on the generated frames
+# instead and builds the figures with the outlook traces of FigurePatch.py
+outlook_colors = dict(zip(outlook_orders['English'], px.colors.qualitative.Plotly))
+
+results_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+excel_max_rows = 1_048_575
+
+# Commit of the working tree and whether it has uncommitted changes
+def git_commit():
+    root = os.path.dirname(results_dir)
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root, capture_output=True, text=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit, dirty
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+# p50 and p99 of fn in milliseconds. The first call is a warmup (Plotly Express initializes itself on
+# its first figure) unless it took more than 5 budgets, the next one sets the number of repeats that
+# fit in the budget. Stages slower than the budget are timed once.
+def measure(fn, budget):
+    elapsed = timed(fn)
+    if elapsed <= 5 * budget:
+        elapsed = timed(fn)
+    repeats = int(min(50, budget / elapsed)) if elapsed > 0 else 50
+    if repeats < 2:
+        return {'p50_ms': elapsed * 1000, 'p99_ms': elapsed * 1000, 'repeats': 1}
+    p50, p99 = bench_utils.time_calls(fn, repeats=repeats, warmup=0)
+    return {'p50_ms': p50, 'p99_ms': p99, 'repeats': repeats}
+
+# Run every stage at one scale, files are written to directory
+def run_scale(scale, directory, args, record):
+    language = 'English'
+    order, colors = outlook_orders[language], outlook_colors
+    english = synthetic_data.outlook_frame(language, synthetic_data.base_nocs * scale, seed=args.seed)
+    rows = len(english)
+
+    # Load: the workbook as the apps read it before the cache, then the memory-mapped cache
+    if rows <= excel_max_rows and scale <= args.excel_max_scale:
+        xlsx = os.path.join(directory, f"outlook-{scale}.xlsx")
+        english.to_excel(xlsx, index=False)
+        record('load', 'pd.read_excel', scale, rows, lambda: pd.read_excel(xlsx, sheet_name=0))
+    cache = os.path.join(directory, f"outlook-{scale}.arrow")
+    write_cache(synthetic_data.workbook_frame(english), cache)
+    record('load', 'arrow cache', scale, rows, lambda: read_cache(cache, language))
+
+    # Load: the boundaries read and simplified at startup as before, then the preprocessed GeoParquet
+    polygons = synthetic_data.region_polygons(synthetic_data.base_edge_vertices * scale, seed=args.seed)
+    vertices = int(polygons.geometry.count_coordinates().sum())
+    shapefile = os.path.join(directory, f"regions-{scale}.shp")
+    polygons.to_file(shapefile)
+    record('load', 'gpd.read_file', scale, vertices, lambda: gpd.read_file(shapefile))
+    wgs84 = polygons.to_crs(epsg=4326)
+    record('load', 'simplify', scale, vertices, lambda: wgs84.geometry.simplify(0.01, preserve_topology=True))
+    record('load', 'simplify_coverage', scale, vertices, lambda: simplify_boundaries(wgs84.geometry, resolutions['medium']))
+    parquet = os.path.join(directory, f"regions-{scale}.parquet")
+    wgs84.assign(geometry=simplify_boundaries(wgs84.geometry, resolutions['medium'])).to_parquet(parquet, index=False)
+    record('load', 'gpd.read_parquet', scale, vertices, lambda: gpd.read_parquet(parquet))
+
+    # The frames of the apps: the table rows, the sorted plot rows and the rows joined with the centroids
+    df = read_cache(cache, language)
+    sorted_df = df.drop(columns=['Employment Trends']).sort_values(by=['NOC Title', 'Economic Region Name', 'Outlook'])
+    index = build_index(sorted_df)
+    centroids = polygons.geometry.centroid.to_crs(epsg=4326)
+    region_coords = pd.DataFrame({'ERUID': polygons['ERUID'].astype(int), 'lat': centroids.y, 'lon': centroids.x})
+    merged_df = region_coords.merge(sorted_df, left_on='ERUID', right_on='Economic Region Code')
+    merged_index = build_index(merged_df)
+
+    # A selection of 1% of the NOC Titles, so the figures grow with the data
+    all_titles = list(sorted_df['NOC Title'].cat.categories)
+    titles = all_titles[::100]
+    selected = select_rows(sorted_df, index, titles=titles)
+    map_rows = select_rows(merged_df, merged_index, titles=titles)
+    query = 'engineers'
+
+    # Filter
+    record('filter', 'isin', scale, rows, lambda: sorted_df[sorted_df['NOC Title'].isin(titles)])
+    record('filter', 'title index', scale, rows, lambda: select_rows(sorted_df, index, titles=titles))
+    record('filter', 'str.contains', scale, rows, lambda: sorted_df[sorted_df['NOC Title'].str.contains(query, case=False, na=False)])
+    search = TitleSearch(all_titles, cache_size=0)
+    record('filter', 'TitleSearch', scale, len(all_titles), lambda: search.matching_titles(query))
+    ranks = outlook_ranks(df)
+    table_index = build_index(df)
+    record('filter', 'table page', scale, rows, lambda: query_page(df, table_index, ranks, titles=titles))
+
+    # Figure build, Plotly Express as before and the outlook traces of FigurePatch.py
+    record('figure', 'px.scatter_mapbox', scale, len(map_rows), lambda: px.scatter_mapbox(
+        map_rows, lat='lat', lon='lon', color='Outlook', hover_name='NOC Title',
+        category_orders={'Outlook': order}, color_discrete_map=colors
+    ))
+    record('figure', 'outlook_figure map', scale, len(map_rows), lambda: outlook_figure(
+        'map', selection_points(map_rows, titles, order, 'map'), order, colors
+    ))
+    record('figure', 'px.scatter', scale, len(selected), lambda: px.scatter(
+        selected, x='Economic Region Name', y='NOC Title', color='Outlook',
+        category_orders={'Outlook': order}, color_discrete_map=colors
+    ))
+    record('figure', 'outlook_figure scatter', scale, len(selected), lambda: outlook_figure(
+        'scatter', selection_points(selected, titles, order, 'scatter'), order, colors
+    ))
+
+    # Serialization
+    if rows <= excel_max_rows:
+        record('serialize', "to_dict('records') all rows", scale, rows, lambda: df.to_dict('records'))
+    record('serialize', "to_dict('records') selection", scale, len(selected), lambda: selected.to_dict('records'))
+    map_fig = outlook_figure('map', selection_points(map_rows, titles, order, 'map'), order, colors)
+    scatter_fig = outlook_figure('scatter', selection_points(selected, titles, order, 'scatter'), order, colors)
+    record('serialize', 'map to_json', scale, len(map_rows), map_fig.to_json)
+    record('serialize', 'scatter to_json', scale, len(selected), scatter_fig.to_json)
+
+# p50 of a previous run next to this one for every stage both have
+def compare(base, current):
+    previous = {(r['stage'], r['case'], r['scale']): r for r in base['results']}
+    print(f"\ncompared with {base.get('commit') or 'unknown commit'}")
+    print(f"{'stage':<10}{'case':<32}{'scale':>6}{'base ms':>11}{'ms':>11}{'ratio':>8}")
+    for result in current['results']:
+        old = previous.get((result['stage'], result['case'], result['scale']))
+        if old is None:
+            continue
+        ratio = result['p50_ms'] / old['p50_ms'] if old['p50_ms'] else float('nan')
+        print(f"{result['stage']:<10}{result['case']:<32}{result['scale']:>6}{old['p50_ms']:>11.2f}{result['p50_ms']:>11.2f}{ratio:>8.2f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the load, filter, figure and serialization paths on synthetic data")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds to spend on each stage")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--excel-max-scale', type=int, default=10, help="largest scale pd.read_excel is timed at, it takes minutes at 10")
+    parser.add_argument('--output', help="JSON file of the results, benchmarks/results/<commit>.json by default")
+    parser.add_argument('--compare', help="JSON file of an earlier run to compare with")
+    parser.add_argument('--results', help="compare this JSON file instead of running the suite")
+    args = parser.parse_args()
+
+    if args.results:
+        with open(args.results) as f:
+            report = json.load(f)
+    else:
+        commit, dirty = git_commit()
+        report = {
+            'commit': commit,
+            'dirty': dirty,
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'packages': {module.__name__: module.__version__ for module in (pd, np, plotly, gpd)},
+            'config': {
+                'scales': args.scales, 'budget': args.budget, 'seed': args.seed, 'excel_max_scale': args.excel_max_scale,
+                'base_nocs': synthetic_data.base_nocs, 'regions': synthetic_data.region_count,
+                'base_edge_vertices': synthetic_data.base_edge_vertices,
+            },
+            'results': [],
+        }
+
+        def record(stage, case, scale, size, fn):
+            result = {'stage': stage, 'case': case, 'scale': scale, 'size': size, **measure(fn, args.budget)}
+            report['results'].append(result)
+            print(f"{stage:<10}{case:<32}{scale:>6}{size:>10}{result['p50_ms']:>11.2f}{result['p99_ms']:>11.2f}{result['repeats']:>6}", flush=True)
+
+        print(f"{'stage':<10}{'case':<32}{'scale':>6}{'size':>10}{'p50 ms':>11}{'p99 ms':>11}{'runs':>6}")
+        with tempfile.TemporaryDirectory() as directory:
+            for scale in args.scales:
+                run_scale(scale, directory, args, record)
+
+        output = args.output or os.path.join(results_dir, f"{(commit or 'unknown')[:12]}{'-dirty' if dirty else ''}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
@@ -0,0 +1,66 @@
+import argparse
+import time
+
+import numpy as np
+
+from bench_utils import time_calls
+import synthetic_data
+from OutlookCategories import normalize_outlooks
+from OutlookStore import OutlookStore
+from OutlookSummary import OutlookSummary
+
+# Time of the summary queries of the table page and of /api/summary: the outlook counts of a region,
+# the counts of each broad category in it and the regions of a NOC ranked by outlook, answered by a
+# filter and group-by of the frame on every request, as before, against the lookups of the
+# aggregates computed once at load (OutlookSummary.py). Runs on synthetic data at 1x and more the
+# NOCs of the real release, so it doesn't need the workbooks.
+# Run from the repository root: python benchmarks/summary_benchmark.py --scales 1 10
+
+
+def region_groupby(df, region):
+    rows = df[df['Economic Region Code'] == region]
+    return {outlook: int(count) for outlook, count in rows['Outlook'].value_counts(sort=False).items()}
+
+def category_groupby(df, region):
+    rows = df[df['Economic Region Code'] == region]
+    counts = rows.groupby([rows['NOC_Code'] // 10000, 'Outlook'], observed=False).size().unstack()
+    return {category: counts.loc[category].to_dict() for category in counts.index}
+
+def noc_groupby(df, noc):
+    rows = df[df['NOC_Code'] == noc].sort_values(['Outlook', 'Economic Region Code'])
+    return list(zip(rows['Economic Region Code'].tolist(), rows['Economic Region Name'].tolist(), rows['Outlook'].tolist()))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    language = 'English'
+    print(f"{'scale':>6}{'rows':>9}  {'query':<22}{'groupby ms':>12}{'summary ms':>12}{'speedup':>9}")
+    for scale in args.scales:
+        df = synthetic_data.workbook_frame(synthetic_data.outlook_frame(language, synthetic_data.base_nocs * scale))
+        df['Outlook'] = normalize_outlooks(df['Outlook'], language)
+        store = OutlookStore()
+        df = store.add_language(language, df)
+
+        start = time.perf_counter()
+        summary = OutlookSummary(store, language)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        rng = np.random.default_rng(0)
+        regions = rng.choice(store.rows['region_codes'], args.repeats)
+        nocs = rng.choice(store.rows['noc_codes'], args.repeats)
+        queries = {
+            'region outlooks': (lambda i: region_groupby(df, regions[i]), lambda i: summary.region_summary(regions[i])['outlooks']),
+            'region categories': (lambda i: category_groupby(df, regions[i]), lambda i: summary.region_summary(regions[i])['categories']),
+            'ranked regions of NOC': (lambda i: noc_groupby(df, nocs[i]), lambda i: summary.noc_regions(nocs[i])),
+        }
+        for name, (groupby, lookup) in queries.items():
+            timings = []
+            for query in (groupby, lookup):
+                calls = iter(range(args.repeats + 2))
+                timings.append(time_calls(lambda: query(next(calls) % args.repeats), repeats=args.repeats)[0])
+            print(f"{scale:>6}{len(df):>9}  {name:<22}{timings[0]:>12.3f}{timings[1]:>12.3f}{timings[0] / timings[1]:>8.0f}x")
+        print(f"{scale:>6}{len(df):>9}  {'build aggregates':<22}{'':>12}{build_ms:>12.1f}")
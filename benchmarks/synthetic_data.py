@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import Polygon
+
+import bench_utils  # noqa: F401, puts the repository root on sys.path
+from OutlookCategories import outlook_orders
+from OutlookData import categorical_columns
+
+# Synthetic outlook workbooks and economic region boundaries shaped like the Job Bank and Statistics
+# Canada files, so the benchmarks run without the real data. The same seed gives the same rows in
+# both languages. The size grows with the number of NOCs and with the vertices of the boundaries.
+
+# Rows of the real 2024-2026 release: about 500 NOCs in the 76 economic regions
+base_nocs = 500
+region_count = 76
+
+# Vertices of each side of a region boundary at scale 1, the real shapefile is much finer
+base_edge_vertices = 100
+
+# Share of the NOC and region pairs that have an outlook, and the share of each outlook
+coverage = 0.8
+outlook_weights = [0.1, 0.25, 0.3, 0.2, 0.05, 0.1]
+
+# Province codes and names of the Statistics Canada standard geographical classification
+provinces = {
+    10: ('Newfoundland and Labrador', 'Terre-Neuve-et-Labrador'), 11: ('Prince Edward Island', 'Île-du-Prince-Édouard'),
+    12: ('Nova Scotia', 'Nouvelle-Écosse'), 13: ('New Brunswick', 'Nouveau-Brunswick'), 24: ('Quebec', 'Québec'),
+    35: ('Ontario', 'Ontario'), 46: ('Manitoba', 'Manitoba'), 47: ('Saskatchewan', 'Saskatchewan'),
+    48: ('Alberta', 'Alberta'), 59: ('British Columbia', 'Colombie-Britannique'), 60: ('Yukon', 'Yukon'),
+    61: ('Northwest Territories', 'Territoires du Nord-Ouest'), 62: ('Nunavut', 'Nunavut'),
+}
+
+# Words the titles and region names are made of, so text searches match a realistic share of them
+title_words = {
+    'English': (
+        ['senior', 'junior', 'assistant', 'technical', 'industrial', 'retail', 'public', 'health', 'software', 'civil',
+         'mechanical', 'financial', 'legal', 'social', 'food', 'transport', 'construction', 'forestry', 'mining', 'marine'],
+        ['managers', 'engineers', 'technicians', 'clerks', 'supervisors', 'analysts', 'operators', 'workers',
+         'officers', 'specialists', 'inspectors', 'assistants', 'installers', 'teachers', 'designers'],
+    ),
+    'French': (
+        ['principaux', 'adjoints', 'techniques', 'industriels', 'du commerce', 'publics', 'de la santé', 'en logiciel', 'civils',
+         'mécaniciens', 'financiers', 'juridiques', 'sociaux', 'alimentaires', 'du transport', 'de la construction',
+         'forestiers', 'miniers', 'maritimes', 'généraux'],
+        ['directeurs', 'ingénieurs', 'techniciens', 'commis', 'superviseurs', 'analystes', 'opérateurs', 'travailleurs',
+         'agents', 'spécialistes', 'inspecteurs', 'assistants', 'installateurs', 'enseignants', 'concepteurs'],
+    ),
+}
+place_words = ['North', 'South', 'East', 'West', 'Central', 'Lake', 'River', 'Valley', 'Coast', 'Bay', 'Highlands', 'Plains']
+
+trend_sentences = {
+    'English': [
+        "Employment in this occupation is expected to grow over the next three years.",
+        "Several positions will become available due to retirements.",
+        "The number of unemployed workers with experience in this occupation is low.",
+        "Employers report difficulties filling vacancies in the region.",
+    ],
+    'French': [
+        "L'emploi dans cette profession devrait croître au cours des trois prochaines années.",
+        "Plusieurs postes deviendront disponibles en raison des départs à la retraite.",
+        "Le nombre de chômeurs ayant de l'expérience dans cette profession est faible.",
+        "Les employeurs signalent des difficultés à pourvoir les postes vacants dans la région.",
+    ],
+}
+
+language_codes = {'English': 'EN', 'French': 'FR'}
+
+# Title of the NOC at a position, unique for any number of NOCs
+def noc_title(language, position):
+    qualifiers, nouns = title_words[language]
+    combinations = len(qualifiers) * len(nouns)
+    title = f"{nouns[position // len(qualifiers) % len(nouns)]} {qualifiers[position % len(qualifiers)]}" if language == 'French' \
+        else f"{qualifiers[position % len(qualifiers)]} {nouns[position // len(qualifiers) % len(nouns)]}"
+    return title if position < combinations else f"{title} {position // combinations}"
+
+# Code, name, province code and province name of every region, in the order of the grid cells
+def region_table(language='English', regions=region_count):
+    rows = []
+    codes = list(provinces)
+    for position in range(regions):
+        province = codes[position % len(codes)]
+        name = f"{place_words[position % len(place_words)]} {provinces[province][0]} {position // len(place_words) + 1}"
+        if language == 'French':
+            name = f"Région {name}"
+        rows.append((province * 100 + 10 * (position // len(codes) + 1), name, province, provinces[province][language == 'French']))
+    return pd.DataFrame(rows, columns=['Economic Region Code', 'Economic Region Name', 'PRUID', 'Province'])
+
+# Outlook rows of a language with the columns of the workbook, nocs NOCs in the given regions
+def outlook_frame(language, nocs=base_nocs, regions=region_count, seed=0):
+    rng = np.random.default_rng(seed)
+    noc_positions, region_positions = np.nonzero(rng.random((nocs, regions)) < coverage)
+    outlook_codes = rng.choice(len(outlook_weights), size=len(noc_positions), p=outlook_weights)
+    trend_choices = rng.integers(0, len(trend_sentences[language]), size=(2, len(noc_positions)))
+
+    titles = np.array([noc_title(language, position) for position in range(nocs)], dtype=object)
+    table = region_table(language, regions)
+    sentences = np.array(trend_sentences[language], dtype=object)
+    trends = '<p>' + sentences[trend_choices[0]] + '</p><ul><li>' + sentences[trend_choices[1]] + '</li></ul>'
+
+    df = pd.DataFrame({
+        'NOC_Code': noc_positions * 10 + 10010,
+        'NOC Title': titles[noc_positions],
+        'Outlook': np.array(outlook_orders[language], dtype=object)[outlook_codes],
+        'Employment Trends': trends,
+        'Release Date': '2025-01-17',
+        'Province': table['Province'].to_numpy()[region_positions],
+        'Economic Region Code': table['Economic Region Code'].to_numpy()[region_positions],
+        'Economic Region Name': table['Economic Region Name'].to_numpy()[region_positions],
+        'LANG': language_codes[language],
+    })
+    return df
+
+# Frame as read_workbook returns it, with the categorical columns
+def workbook_frame(df):
+    return df.astype({column: 'category' for column in categorical_columns})
+
+# Points along one side of a grid cell from start to end. The side bends away from the straight line
+# less and less towards its ends, so the sides of a cell never cross and both cells sharing a side
+# get the same points.
+def edge_points(start, end, vertices, rng):
+    t = np.linspace(0, 1, vertices + 1)
+    direction = np.subtract(end, start)
+    normal = np.array([-direction[1], direction[0]])
+    offsets = rng.uniform(-0.08, 0.08, size=len(t)) * np.sin(np.pi * t)
+    return np.asarray(start) + t[:, None] * direction + offsets[:, None] * normal
+
+# Region boundaries in the Statistics Canada Lambert projection (EPSG:3347) with the columns of the
+# shapefile, a grid of 100 km cells whose sides have edge_vertices vertices each
+def region_polygons(edge_vertices=base_edge_vertices, regions=region_count, seed=0, cell=100_000):
+    rng = np.random.default_rng(seed)
+    columns = int(np.ceil(np.sqrt(regions)))
+    rows = int(np.ceil(regions / columns))
+    origin = np.array([3_500_000, 1_000_000])
+    corner = lambda i, j: origin + cell * np.array([i, j])
+
+    # Each side is generated once, from its left or bottom corner, and reversed by the cell above or to the right
+    horizontal = {(i, j): edge_points(corner(i, j), corner(i + 1, j), edge_vertices, rng) for i in range(columns) for j in range(rows + 1)}
+    vertical = {(i, j): edge_points(corner(i, j), corner(i, j + 1), edge_vertices, rng) for i in range(columns + 1) for j in range(rows)}
+
+    polygons = []
+    for position in range(regions):
+        i, j = position % columns, position // columns
+        ring = np.concatenate([
+            horizontal[i, j][:-1], vertical[i + 1, j][:-1], horizontal[i, j + 1][::-1][:-1], vertical[i, j][::-1][:-1],
+        ])
+        polygons.append(Polygon(ring))
+
+    table = region_table('English', regions)
+    return gpd.GeoDataFrame({
+        'ERUID': table['Economic Region Code'].astype(str),
+        'ERNAME': table['Economic Region Name'],
+        'PRUID': table['PRUID'].astype(str),
+        'PRNAME': table['Province'],
+    }, geometry=polygons, crs='EPSG:3347')
@@ -0,0 +1,58 @@
+import pandas as pd
+from plotly.io.json import to_json_plotly
+
+from bench_utils import time_calls
+
+import JobOutlookApp
+from OutlookQuery import query_page
+
+# Payload size and callback time of the JobOutlookApp DataTable when the whole filtered table
+# is sent to the browser, against the server-side paging that only sends the visible page.
+# Run from the repository root: python benchmarks/table_benchmark.py
+
+
+# Outlook order of the table before the outlook scale of OutlookCategories.py
+legacy_outlook_orders = {
+    'English': ['very good', 'good', 'fair', 'limited', 'undetermined'],
+    'French': ['très bonnes', 'bonnes', 'modérées', 'indéterminées', 'limitées', 'très limitées']
+}
+
+
+# The data output of update_table before server-side paging
+def legacy_table_data(language, region):
+    df = JobOutlookApp.data_frames[language]
+    if region:
+        df = df.loc[df['Economic Region Name'] == region].copy()
+    else:
+        df = df.copy()
+    df['Outlook'] = pd.Categorical(df['Outlook'], categories=legacy_outlook_orders[language], ordered=True)
+    return df.sort_values('Outlook').to_dict('records')
+
+
+# The data output of update_table for one page
+def paged_table_data(language, region, page_current, sort_by):
+    df_page, _ = query_page(
+        JobOutlookApp.data_frames[language], JobOutlookApp.indexes[language], JobOutlookApp.ranks[language],
+        region=region, sort_by=sort_by, page_current=page_current
+    )
+    return df_page.to_dict('records')
+
+
+if __name__ == '__main__':
+    language = 'English'
+    df = JobOutlookApp.data_frames[language]
+    region = sorted(df['Economic Region Name'].unique())[0]
+    region_code = df.loc[df['Economic Region Name'] == region, 'Economic Region Code'].iloc[0]
+    sort_by = [{'column_id': 'NOC Title', 'direction': 'asc'}]
+    print(f"{'case':<28}{'payload KB':>12}{'p50 ms':>9}{'p99 ms':>9}")
+    cases = [
+        ('all regions, before', lambda: legacy_table_data(language, None)),
+        ('all regions, page 3', lambda: paged_table_data(language, None, 3, [])),
+        ('all regions, sorted page 3', lambda: paged_table_data(language, None, 3, sort_by)),
+        ('one region, before', lambda: legacy_table_data(language, region)),
+        ('one region, page 3', lambda: paged_table_data(language, region_code, 3, [])),
+    ]
+    for name, fn in cases:
+        payload = len(to_json_plotly(fn()).encode())
+        p50, p99 = time_calls(lambda: to_json_plotly(fn()), repeats=20)
+        print(f"{name:<28}{payload / 1024:>12.1f}{p50:>9.1f}{p99:>9.1f}")
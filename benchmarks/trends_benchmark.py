@@ -0,0 +1,54 @@
+from bs4 import BeautifulSoup
+from dash import html
+from plotly.io.json import to_json_plotly
+
+from bench_utils import time_calls
+
+import JobOutlookApp
+from EmploymentTrends import TrendStore, row_keys
+from OutlookQuery import query_page
+
+# Payload size of one DataTable page with and without the Employment Trends HTML, and the time
+# of the row details callback when the HTML is parsed on every click against the cached lookup.
+# Run from the repository root: python benchmarks/trends_benchmark.py
+
+
+# display_row_details before the trends were kept on the server: parse the HTML sent with the row
+def legacy_row_details(row_data):
+    soup = BeautifulSoup(row_data.get('Employment Trends', ''), 'html.parser')
+    children = []
+    for element in soup.children:
+        if element.name == 'p':
+            children.append(html.P(element.text))
+        elif element.name == 'ul':
+            children.append(html.Ul([html.Li(li.text) for li in element.find_all('li')]))
+    return html.Div([
+        html.H3("Detailed Information"),
+        html.P(f"Economic Region Name: {row_data.get('Economic Region Name', '')}"),
+        html.P(f"Outlook: {row_data.get('Outlook', '')}"),
+        html.Div(children)
+    ])
+
+
+if __name__ == '__main__':
+    language = 'English'
+    df_page, _ = query_page(
+        JobOutlookApp.data_frames[language], JobOutlookApp.indexes[language], JobOutlookApp.ranks[language]
+    )
+    columns = [col for col in df_page.columns if col not in JobOutlookApp.hidden_columns]
+    legacy_records = df_page.to_dict('records')
+    records = df_page[columns].assign(row_key=row_keys(df_page)).to_dict('records')
+
+    print(f"{'page payload':<28}{'KB':>12}")
+    print(f"{'with trends HTML':<28}{len(to_json_plotly(legacy_records).encode()) / 1024:>12.1f}")
+    print(f"{'row key only':<28}{len(to_json_plotly(records).encode()) / 1024:>12.1f}")
+
+    print(f"\n{'row details':<28}{'p50 ms':>12}{'p99 ms':>9}")
+    p50, p99 = time_calls(lambda: [legacy_row_details(row) for row in legacy_records], repeats=20)
+    print(f"{'parse per click':<28}{p50 / len(records):>12.3f}{p99 / len(records):>9.3f}")
+
+    # A fresh store so the first pass pays for the parse and later passes hit the memo
+    store = TrendStore(JobOutlookApp.data_frames[language])
+    JobOutlookApp.trend_stores.loaded[language] = store
+    p50, p99 = time_calls(lambda: [JobOutlookApp.display_row_details(row, language) for row in records], repeats=20, warmup=0)
+    print(f"{'cached lookup':<28}{p50 / len(records):>12.3f}{p99 / len(records):>9.3f}")
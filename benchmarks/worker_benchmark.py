@@ -0,0 +1,121 @@
+import gc
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Memory and startup time of OutlookApp behind N forked workers, the way gunicorn runs it
+# with preload_app: the master imports the app, forks the workers and each worker serves a table request.
+#   eager:   every worker loads both languages, as the app did at import before the registry
+#   lazy:    every worker loads English on its first (English) request
+#   preload: the master loads both languages and freezes the GC before forking (OUTLOOK_PRELOAD=1)
+# PSS splits the shared pages between the processes mapping them, so its sum over the workers
+# is what they really cost. Linux only.
+# Run from the repository root: python benchmarks/worker_benchmark.py
+
+
+# Resident, proportional and private (copied on write) set size of a process in MB
+def memory_mb(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Pss', 'Private_Dirty'):
+                values[key] = int(value.split()[0]) / 1024
+    return values
+
+
+# Request the first DataTable page in English, through the Dash callback endpoint
+def first_request(app):
+    outputs = ['datatable.data', 'datatable.columns', 'datatable.page_count', 'datatable.page_current',
+               'datatable.selected_rows', 'region-dropdown.options', 'region-dropdown.value']
+    inputs = [('table-language-dropdown', 'value', 'English'), ('region-dropdown', 'value', 'All Regions'),
+              ('search-input', 'value', None), ('datatable', 'page_current', 0), ('datatable', 'sort_by', [])]
+    payload = {
+        'output': '..' + '...'.join(outputs) + '..',
+        'outputs': [{'id': output.split('.')[0], 'property': output.split('.')[1]} for output in outputs],
+        'inputs': [{'id': id, 'property': prop, 'value': value} for id, prop, value in inputs],
+        'state': [{'id': 'datatable', 'property': 'page_size', 'value': 25}],
+        'changedPropIds': ['table-language-dropdown.value'],
+    }
+    response = app.server.test_client().post('/_dash-update-component', json=payload)
+    assert response.status_code == 200, response.status_code
+
+
+# Start the master and the workers of one mode in this process and report as JSON
+def measure(mode, workers):
+    start = time.perf_counter()
+    import OutlookApp
+    import JobOutlookApp
+    from OutlookData import preload_all
+
+    # What gunicorn.conf.py does in the master before forking
+    if mode == 'preload':
+        preload_all()
+    else:
+        gc.freeze()
+
+    pids, ready = [], []
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            if mode == 'eager':
+                for language in JobOutlookApp.file_paths:
+                    JobOutlookApp.trend_stores[language]
+            first_request(OutlookApp.app)
+            # A long-running worker goes through full collections, they touch every tracked object
+            gc.collect()
+            os.write(write_end, b'1')
+            signal.pause()
+            os._exit(0)
+        os.close(write_end)
+        pids.append(pid)
+        ready.append(read_end)
+
+    for read_end in ready:
+        os.read(read_end, 1)
+    seconds = time.perf_counter() - start
+
+    memory = [memory_mb(pid) for pid in pids]
+    master = memory_mb(os.getpid())
+    for pid in pids:
+        os.kill(pid, 9)
+        os.waitpid(pid, 0)
+    return {
+        'seconds': seconds,
+        'master_rss_mb': master['Rss'],
+        'worker_rss_mb': sum(m['Rss'] for m in memory) / workers,
+        'worker_pss_mb': sum(m['Pss'] for m in memory) / workers,
+        'worker_private_mb': sum(m['Private_Dirty'] for m in memory) / workers,
+        'total_pss_mb': master['Pss'] + sum(m['Pss'] for m in memory),
+    }
+
+
+def run_child(mode, workers):
+    output = subprocess.run([sys.executable, '-W', 'ignore', __file__, '--child', mode, str(workers)],
+                            check=True, capture_output=True, text=True)
+    return json.loads(output.stdout.splitlines()[-1])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        print(json.dumps(measure(sys.argv[2], int(sys.argv[3]))))
+        sys.exit(0)
+
+    # Make sure the caches exist so every mode measures a warm start
+    from OutlookData import build_cache, file_paths
+    for language in file_paths:
+        build_cache(language)
+
+    print(f"{'mode':<9}{'workers':>8}{'startup s':>11}{'master RSS':>12}{'worker RSS':>12}{'worker PSS':>12}{'private':>9}{'total PSS':>11}  (MB)")
+    for workers in [1, 4, 16]:
+        for mode in ['eager', 'lazy', 'preload']:
+            run = run_child(mode, workers)
+            print(f"{mode:<9}{workers:>8}{run['seconds']:>11.2f}{run['master_rss_mb']:>12.1f}"
+                  f"{run['worker_rss_mb']:>12.1f}{run['worker_pss_mb']:>12.1f}{run['worker_private_mb']:>9.1f}{run['total_pss_mb']:>11.1f}")
@@ -0,0 +1,41 @@
+import gc
+import os
+
+# gunicorn settings for OutlookApp, the app with every page. Run with: gunicorn
+# The number of workers comes from WEB_CONCURRENCY, as on most hosts
+bind = os.environ.get('BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+
+# Threads per worker, the callbacks spend most of their time in pandas and plotly
+# which release the GIL only in parts, so keep this small
+threads = int(os.environ.get('WEB_THREADS', 2))
+
+# Background callbacks fork their jobs from the worker, a lock held by another request thread at that
+# moment (the figure cache, the metrics) would stay held in the job forever. One thread per worker then,
+# the builds run in the jobs and the worker thread only starts and polls them.
+if os.environ.get('OUTLOOK_BACKGROUND') == '1':
+    threads = 1
+
+# Import the app once in the master. With OUTLOOK_PRELOAD=1 the data of every language is also
+# loaded there and shared by the forked workers, otherwise each worker loads a language on its
+# first request for it.
+preload_app = True
+wsgi_app = 'OutlookApp:server'
+preload_data = os.environ.get('OUTLOOK_PRELOAD') == '1'
+
+# Called in the master after the app is imported and before the workers are forked.
+# Freezing the GC keeps the workers' collections from copying the pages of the imported objects.
+def when_ready(server):
+    if preload_data:
+        # Imported here, the app directory is only on sys.path once gunicorn loads the app
+        from OutlookData import preload_all
+        preload_all()
+    else:
+        gc.freeze()
+
+# Called in each worker after it is forked. Threads don't survive the fork, so every worker watches
+# the release directory itself (OUTLOOK_WATCH_RELEASES=1, see OutlookRelease.py).
+def post_fork(server, worker):
+    from OutlookRelease import start_watcher, watch_releases
+    if watch_releases:
+        start_watcher()
@@ -0,0 +1,55 @@
+import os
+import sys
+import warnings
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OutlookCategories import normalize_outlooks
+from OutlookStore import OutlookStore
+
+
+def outlook_frame(language, rows):
+    df = pd.DataFrame(rows, columns=['NOC_Code', 'NOC Title', 'Economic Region Code', 'Economic Region Name', 'Outlook', 'Employment Trends'])
+    df['NOC Title'] = df['NOC Title'].astype('category')
+    df['Economic Region Name'] = df['Economic Region Name'].astype('category')
+    df['Outlook'] = normalize_outlooks(df['Outlook'], language)
+    return df
+
+# French has no row for one English key, a row English doesn't have and another outlook for one row
+frames = {
+    'English': outlook_frame('English', [
+        (21231, 'Software engineers', 1010, 'Avalon Peninsula', 'good', 'Growing'),
+        (21231, 'Software engineers', 3530, 'Toronto', 'very good', 'Growing fast'),
+        (31301, 'Registered nurses', 1010, 'Avalon Peninsula', 'moderate', 'Stable'),
+    ]),
+    'French': outlook_frame('French', [
+        (21231, 'Ingénieurs logiciels', 1010, 'Péninsule d\'Avalon', 'bonnes', 'En croissance'),
+        (31301, 'Infirmiers autorisés', 1010, 'Péninsule d\'Avalon', 'limitées', 'Stable'),
+        (31301, 'Infirmiers autorisés', 3530, 'Toronto', 'bonnes', 'Stable'),
+    ]),
+}
+
+
+def loaded_store(order):
+    store = OutlookStore(load=lambda language: frames[language].copy())
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return store, {language: store.add_language(language, frames[language].copy()) for language in order}
+
+
+# The rows and outlooks of the store don't depend on the language loaded first
+def test_store_is_independent_of_load_order():
+    english_first, english_first_frames = loaded_store(['English', 'French'])
+    french_first, french_first_frames = loaded_store(['French', 'English'])
+
+    for column in english_first.rows:
+        assert (english_first.rows[column] == french_first.rows[column]).all()
+    for language in frames:
+        pd.testing.assert_frame_equal(english_first_frames[language], french_first_frames[language])
+        pd.testing.assert_frame_equal(english_first.frame(language), french_first.frame(language))
+
+    # The English keys and outlooks are served in both languages
+    assert len(english_first.rows['NOC_Code']) == 3
+    assert french_first_frames['French']['Outlook'].cat.codes.tolist() == frames['English']['Outlook'].cat.codes.tolist()
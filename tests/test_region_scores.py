@@ -0,0 +1,34 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OutlookCategories import normalize_outlooks, outlook_orders
+from RegionScores import RegionScores
+
+
+def scores_for(outlooks):
+    df = pd.DataFrame({
+        'NOC Title': pd.Categorical([f"NOC {i}" for i in range(len(outlooks))]),
+        'Economic Region Code': 1010,
+        'Outlook': normalize_outlooks(outlooks, 'English'),
+    })
+    regions = pd.DataFrame({'ERUID': ['1010'], 'ERNAME': ['Avalon Peninsula']})
+    return RegionScores(df, regions, outlook_orders['English'][:-1])
+
+
+# Missing, unknown and undetermined outlooks have no score, they don't count as good
+def test_unscored_outlooks_are_excluded():
+    scores = scores_for(['limited', None, 'not an outlook', 'undetermined'])
+    assert np.nanmax(scores.matrix) <= scores.max_score
+    assert np.count_nonzero(~np.isnan(scores.matrix)) == 1
+
+    nocs = [f"NOC {i}" for i in range(4)]
+    share = scores.aggregate(nocs, 'share')
+    mean = scores.aggregate(nocs, 'mean')
+    assert share['nocs'][0] == 1
+    assert share['score'][0] == 0
+    assert mean['score'][0] == 0.25